@@ -1,4 +1,8 @@
+import hashlib
+import logging
 from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
 
 from botocore.exceptions import (  # type: ignore
     ClientError,
@@ -6,6 +10,16 @@ from botocore.exceptions import (  # type: ignore
     PartialCredentialsError,
 )
 from botocore.session import Session
+from dotenv import dotenv_values
+
+logger = logging.getLogger(__name__)
+
+# variables that aws-vault, and so `gds aws`, export with the credentials' expiry
+EXPIRY_VARIABLES = ("AWS_CREDENTIAL_EXPIRATION", "AWS_SESSION_EXPIRATION")
+
+CredentialIdentity = tuple[str, str | None, str | None]
+
+_valid_credentials: set[CredentialIdentity] = set()
 
 
 @dataclass(frozen=True)
@@ -15,11 +29,18 @@ class AwsCredentialCheckResult:
 
 
 def check_aws_credentials(*, region: str) -> AwsCredentialCheckResult:
+    """Check the AWS credentials with STS. Credentials found to be valid aren't
+    checked again by the same process."""
     session = Session()
 
     try:
+        identity = _credential_identity(session, region)
+        if identity in _valid_credentials:
+            return AwsCredentialCheckResult(ok=True)
+
         client = session.create_client("sts", region_name=region)
         client.get_caller_identity()
+        _valid_credentials.add(identity)
         return AwsCredentialCheckResult(ok=True)
     except (NoCredentialsError, PartialCredentialsError) as exc:
         return AwsCredentialCheckResult(
@@ -34,3 +55,39 @@ def check_aws_credentials(*, region: str) -> AwsCredentialCheckResult:
     # unexpected failures are reported as a credential problem
     except Exception as exc:  # noqa: BLE001
         return AwsCredentialCheckResult(ok=False, error=str(exc))
+
+
+def _credential_identity(session: Session, region: str) -> CredentialIdentity:
+    credentials = session.get_credentials()
+    if credentials is None:
+        return (region, None, None)
+
+    token = credentials.token
+    return (
+        region,
+        credentials.access_key,
+        hashlib.sha256(str(token).encode()).hexdigest() if token else None,
+    )
+
+
+def aws_credentials_expiry(env_path: Path) -> datetime | None:
+    """Return when the credentials in an env file, such as the .env.aws written
+    by scripts/export_aws_credentials.sh, expire, or None if the file doesn't
+    record it"""
+    if not env_path.exists():
+        return None
+
+    values = dotenv_values(env_path)
+    for name in EXPIRY_VARIABLES:
+        if not (value := values.get(name)):
+            continue
+
+        try:
+            expiry = datetime.fromisoformat(value)
+        except ValueError:
+            logger.warning(f"Couldn't parse {name} of {value!r} in {env_path}")
+            return None
+
+        return expiry if expiry.tzinfo else expiry.replace(tzinfo=UTC)
+
+    return None
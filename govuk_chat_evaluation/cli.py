@@ -5,6 +5,7 @@ from dotenv import load_dotenv
 
 from . import (
     jailbreak_guardrails,
+    merge,
     output_guardrails,
     question_router,
     rag_answers,
@@ -26,6 +27,7 @@ def main():
 
 
 main.add_command(jailbreak_guardrails.main)
+main.add_command(merge.main)
 main.add_command(output_guardrails.main)
 main.add_command(question_router.main)
 main.add_command(rag_answers.main)
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limit the number of concurrent operations, adjusting the limit between
+    min_limit and max_limit using additive increase, multiplicative decrease
+    (AIMD).
+
+    The limit increases by one after each limit's worth of operations succeed
+    without latency rising above latency_tolerance times the lowest latency
+    observed. It halves when an operation fails or latency rises above that.
+    Only one decrease is applied per limit's worth of completed operations so
+    that a burst of failures from the same overload doesn't collapse the limit
+    to the minimum."""
+
+    # Weight given to the newest latency sample in the moving average
+    LATENCY_SMOOTHING = 0.2
+    # Latency rises of less than this many seconds are treated as noise
+    MIN_LATENCY_RISE = 0.05
+
+    def __init__(
+        self,
+        min_limit: int,
+        max_limit: int,
+        initial_limit: int | None = None,
+        latency_tolerance: float = 2.0,
+    ):
+        if min_limit < 1 or max_limit < min_limit:
+            raise ValueError(
+                "Concurrency limits must satisfy 1 <= min_limit <= max_limit"
+            )
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = min(max(initial_limit or max_limit, min_limit), max_limit)
+        self.latency_tolerance = latency_tolerance
+
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self._min_latency: float | None = None
+        self._average_latency: float | None = None
+        self._successes_since_increase = 0
+        # allow the first decrease to happen straight away
+        self._completions_since_decrease = self.limit
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait until running an operation is within the limit, then record the
+        latency and outcome of the operation run within the context"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+        start_time = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self._record_failure()
+            raise
+        else:
+            self._record_success(time.perf_counter() - start_time)
+        finally:
+            async with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def _record_success(self, latency: float) -> None:
+        self._completions_since_decrease += 1
+        self._min_latency = min(self._min_latency or latency, latency)
+        self._average_latency = (
+            latency
+            if self._average_latency is None
+            else (
+                self.LATENCY_SMOOTHING * latency
+                + (1 - self.LATENCY_SMOOTHING) * self._average_latency
+            )
+        )
+
+        if (
+            self._average_latency > self.latency_tolerance * self._min_latency
+            and self._average_latency - self._min_latency > self.MIN_LATENCY_RISE
+        ):
+            self._decrease("latency rising")
+            return
+
+        self._successes_since_increase += 1
+        if self._successes_since_increase >= self.limit:
+            self._successes_since_increase = 0
+            if self.limit < self.max_limit:
+                self.limit += 1
+                logger.debug(f"Increased concurrency limit to {self.limit}")
+
+    def _record_failure(self) -> None:
+        self._completions_since_decrease += 1
+        self._decrease("failure")
+
+    def _decrease(self, cause: str) -> None:
+        self._successes_since_increase = 0
+        if self._completions_since_decrease < self.limit:
+            return
+
+        self._completions_since_decrease = 0
+        new_limit = max(self.limit // 2, self.min_limit)
+        if new_limit < self.limit:
+            self.limit = new_limit
+            # let the latency baseline recover at the lower concurrency
+            self._average_latency = None
+            logger.debug(f"Decreased concurrency limit to {self.limit} ({cause})")
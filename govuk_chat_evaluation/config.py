@@ -3,6 +3,7 @@ from pathlib import Path
 from typing import (
     Annotated,
     Any,
+    NamedTuple,
     Optional,
     Self,
     get_args,
@@ -11,7 +12,126 @@ from typing import (
 
 import click
 import yaml
-from pydantic import BaseModel, Field, FilePath
+from pydantic import (
+    BaseModel,
+    BeforeValidator,
+    DirectoryPath,
+    Field,
+    FilePath,
+    PlainSerializer,
+    PositiveFloat,
+    PositiveInt,
+    model_validator,
+)
+
+
+class Shard(NamedTuple):
+    """One of total equal parts of a dataset, written as "number/total" with
+    parts numbered from 1"""
+
+    number: int
+    total: int
+
+    @classmethod
+    def parse(cls, value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+
+        try:
+            number, total = (int(part) for part in value.split("/"))
+        except ValueError:
+            raise ValueError(f"Shard {value!r} must be in the form number/total")
+
+        if not 1 <= number <= total:
+            raise ValueError(f"Shard number must be between 1 and {total}")
+
+        return cls(number, total)
+
+    def __str__(self) -> str:
+        return f"{self.number}/{self.total}"
+
+    def select[Item](self, items: list[Item]) -> list[Item]:
+        """Return the items in this shard, which are every total-th item starting
+        from the shard number, so that each machine is given the same items for
+        the same input file"""
+        return items[self.number - 1 :: self.total]
+
+
+class GenerationConfig(BaseModel):
+    """Options that control how data is generated with GOV.UK Chat"""
+
+    workers: PositiveInt | None = Field(
+        default=None,
+        description=(
+            "Number of long-running GOV.UK Chat worker processes to send "
+            "generation requests to. If not specified, each item is generated "
+            "with its own rake task."
+        ),
+    )
+    min_concurrent: PositiveInt = Field(
+        default=1,
+        description="Lowest number of items to generate concurrently",
+    )
+    max_concurrent: PositiveInt = Field(
+        default=5,
+        description=(
+            "Highest number of items to generate concurrently. Concurrency "
+            "increases towards this while throughput improves and backs off on "
+            "errors or rising latency."
+        ),
+    )
+    batch_size: PositiveInt | None = Field(
+        default=None,
+        description=(
+            "Number of items to generate with each rake task process. If not "
+            "specified, each item is generated with its own rake task."
+        ),
+    )
+    max_attempts: PositiveInt = Field(
+        default=3,
+        description=(
+            "Number of times to try generating each item before recording it as failed"
+        ),
+    )
+    timeout: PositiveFloat | None = Field(
+        default=600,
+        description=(
+            "Seconds an attempt to generate an item can take before its rake "
+            "task is killed and the attempt recorded as timed out. With "
+            "batch_size this is multiplied by the batch size."
+        ),
+    )
+    cache: bool = Field(
+        default=False,
+        description=(
+            "Whether to reuse rake task results from previous runs with the "
+            "same inputs and GOV.UK Chat revision"
+        ),
+    )
+    cache_path: Path | None = Field(
+        default=None,
+        description=(
+            "Directory to store cached rake task results in. If not "
+            "specified, results/generation_cache is used."
+        ),
+    )
+    cache_max_size_mb: PositiveInt = Field(
+        default=1024,
+        description=(
+            "Size the cache is reduced to, by removing the least recently used "
+            "results, at the end of a run"
+        ),
+    )
+
+    @model_validator(mode="after")
+    def validate_options(self) -> Self:
+        if self.workers and self.batch_size:
+            raise ValueError("workers and batch_size can't be used together")
+
+        if self.min_concurrent > self.max_concurrent:
+            raise ValueError("min_concurrent can't be greater than max_concurrent")
+
+        return self
 
 
 class BaseConfig(BaseModel):
@@ -34,6 +154,35 @@ class BaseConfig(BaseModel):
                 ),
             ),
         ]
+        resume = Annotated[
+            DirectoryPath | None,
+            Field(
+                description=(
+                    "Output directory of a previous run to resume generating "
+                    "data from, only the items missing from its generated.jsonl "
+                    "are generated"
+                ),
+                # a resumed run is a one-off so isn't stored for reuse
+                exclude=True,
+            ),
+        ]
+        shard = Annotated[
+            Shard | None,
+            BeforeValidator(Shard.parse),
+            PlainSerializer(lambda shard: shard and str(shard)),
+            Field(
+                description=(
+                    "Only generate one part of the input data, given as "
+                    "number/total e.g. 2/4 for the second of four parts, so "
+                    "generation can be split across machines and combined with "
+                    "the merge command"
+                ),
+            ),
+        ]
+        generation = Annotated[
+            GenerationConfig,
+            Field(description="Options for generating data with GOV.UK Chat"),
+        ]
 
     def _validate_fields_required_for_generate(self, *fields) -> Self:
         if getattr(self, "generate", False):
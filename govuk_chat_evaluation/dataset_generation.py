@@ -1,78 +1,633 @@
 import asyncio
 import json
 import logging
+import math
 import os
-from collections.abc import Awaitable, Callable
+import random
+import shlex
+import signal
+import tempfile
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import AsyncExitStack, contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal, Protocol, Self
 
+from pydantic import BaseModel
 from tqdm.asyncio import tqdm
 
+from .concurrency import AdaptiveConcurrencyLimiter
+from .config import GenerationConfig, Shard
+from .file_system import GeneratedOutputWriter, project_root
+from .generation_cache import (
+    CACHE_MISS,
+    GenerationCache,
+    active_generation_cache,
+    govuk_chat_revision,
+)
+
 MAX_CONCURRENT_TASKS = 5
+WORKER_RAKE_TASK = "evaluation:worker"
+# Generated responses (such as RAG answers with their sources) can be far
+# larger than asyncio's default 64KiB line limit
+WORKER_STREAM_LIMIT = 16 * 1024 * 1024
+BATCH_LINGER_SECONDS = 0.1
+# Retries wait a random time of up to this doubled for each previous attempt
+RETRY_BASE_DELAY_SECONDS = 1.0
+# How often generation checks whether it's been asked to stop
+STOP_POLL_SECONDS = 0.1
 logger = logging.getLogger(__name__)
 
 
+class FailedGeneration(BaseModel):
+    """An item that could not be generated, recorded so it can be inspected or
+    generated again later"""
+
+    input: Any
+    error: str
+    attempts: int
+    failure_type: Literal["error", "timeout"] = "error"
+
+    @classmethod
+    def from_error(cls, input: Any, error: Exception, attempts: int) -> Self:
+        if isinstance(input, BaseModel):
+            input = input.model_dump(mode="json")
+
+        return cls(
+            input=input,
+            error=repr(error),
+            attempts=attempts,
+            failure_type="timeout" if isinstance(error, TimeoutError) else "error",
+        )
+
+
+class RakeTaskRunner(Protocol):
+    async def run(
+        self, task_name: str, env_vars: dict[str, str] | None = None
+    ) -> Any: ...
+
+
+_active_rake_task_runner: ContextVar[RakeTaskRunner | None] = ContextVar(
+    "active_rake_task_runner", default=None
+)
+_active_stop_event: ContextVar[threading.Event | None] = ContextVar(
+    "active_stop_event", default=None
+)
+
+
+@contextmanager
+def stop_generation_on(event: threading.Event) -> Iterator[None]:
+    """Stop generate_dataset calls made in this context, such as from another
+    thread, once the event is set. The items being generated are cancelled,
+    which kills their rake processes, and asyncio.CancelledError is raised."""
+    token = _active_stop_event.set(event)
+    try:
+        yield
+    finally:
+        _active_stop_event.reset(token)
+
+
+def govuk_chat_dir() -> Path:
+    """Return the directory of the GOV.UK Chat project expected to be
+    available locally, which can be set with GOVUK_CHAT_DIR"""
+
+    if path := os.environ.get("GOVUK_CHAT_DIR"):
+        return Path(path)
+
+    return Path.home() / "govuk" / "govuk-chat"
+
+
+def rake_command() -> list[str]:
+    """Return the command used to run GOV.UK Chat rake tasks, which can be set
+    with GOVUK_CHAT_RAKE_COMMAND e.g. to use scripts/fake_govuk_chat_rake.py"""
+
+    return shlex.split(os.environ.get("GOVUK_CHAT_RAKE_COMMAND", "bundle exec rake"))
+
+
 async def run_rake_task(task_name: str, env_vars: dict[str, str] | None = None) -> Any:
     """Asynchronously run a rake task on the GOV.UK Chat project expected to be
-    running locally. Raises an error if it returns a non 0 return code"""
+    running locally. Raises an error if it returns a non 0 return code.
+
+    If called within a RakeWorkerPool or RakeTaskBatcher the task is handed to
+    that rather than starting a new process. If called within a GenerationCache
+    a cached result is returned instead of running the task at all."""
+
+    cache = active_generation_cache()
+    if cache is None:
+        return await _run_rake_task(task_name, env_vars)
+
+    key = cache.key(task_name, env_vars)
+    result = cache.get(key)
+    if result is CACHE_MISS:
+        result = await _run_rake_task(task_name, env_vars)
+        cache.set(key, result)
+
+    return result
+
+
+async def _run_rake_task(task_name: str, env_vars: dict[str, str] | None) -> Any:
+    runner = _active_rake_task_runner.get()
+    if runner is not None:
+        return await runner.run(task_name, env_vars)
+
+    stdout = await _run_rake_process(task_name, env_vars)
+
+    return json.loads(stdout)
+
+
+async def run_rake_task_batch(
+    task_name: str, env_vars_batch: list[dict[str, str]]
+) -> list[Any]:
+    """Run a single rake task process for a batch of inputs. The env vars for
+    each input are written as a line of a temporary JSONL file, the path of
+    which is passed to the task as INPUT_PATH. The task is expected to output a
+    JSON line for each input, in the same order as the file."""
 
-    govuk_chat_dir = Path.home() / "govuk" / "govuk-chat"
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", encoding="utf8") as file:
+        file.writelines(json.dumps(env_vars) + "\n" for env_vars in env_vars_batch)
+        file.flush()
 
+        stdout = await _run_rake_process(task_name, {"INPUT_PATH": file.name})
+
+    results = [json.loads(line) for line in stdout.splitlines() if line.strip()]
+
+    if len(results) != len(env_vars_batch):
+        raise RuntimeError(
+            f"Expected {len(env_vars_batch)} results from batched rake task, "
+            f"received {len(results)}"
+        )
+
+    return results
+
+
+async def _run_rake_process(task_name: str, env_vars: dict[str, str] | None) -> str:
     env = {**os.environ.copy(), **(env_vars or {})}
 
     process = await asyncio.create_subprocess_exec(
-        "bundle",
-        "exec",
-        "rake",
+        *rake_command(),
         task_name,
-        cwd=govuk_chat_dir,
+        cwd=govuk_chat_dir(),
         env=env,
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
     )
 
-    stdout, stderr = await process.communicate()
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        # such as when the item's timeout expires, Rails can otherwise be left
+        # running in the background
+        _kill_process_group(process)
+        await process.wait()
+        raise
 
     if process.returncode != 0:
         raise RuntimeError("Failed to successfully run the rake task", stderr.decode())
 
-    return json.loads(stdout.decode())
+    return stdout.decode()
+
+
+def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """Kill a process started in its own session along with any processes it
+    started, as bundle exec can leave child processes behind"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+class RakeWorker:
+    """A long-running GOV.UK Chat process that runs the evaluation:worker rake
+    task. Each request is written to stdin as a JSON line of the form
+    {"task": <rake task name>, "env": {<env vars>}} and the worker responds
+    with a JSON line on stdout of either {"result": <rake task output>} or
+    {"error": <message>}."""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self._stderr_tail: deque[str] = deque(maxlen=20)
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
+
+    @classmethod
+    async def start(cls) -> Self:
+        process = await asyncio.create_subprocess_exec(
+            *rake_command(),
+            WORKER_RAKE_TASK,
+            cwd=govuk_chat_dir(),
+            env=os.environ.copy(),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=WORKER_STREAM_LIMIT,
+            start_new_session=True,
+        )
+        return cls(process)
+
+    @property
+    def running(self) -> bool:
+        return self.process.returncode is None
+
+    async def request(
+        self, task_name: str, env_vars: dict[str, str] | None = None
+    ) -> Any:
+        assert self.process.stdin is not None
+        assert self.process.stdout is not None
+
+        request = {"task": task_name, "env": env_vars or {}}
+        try:
+            self.process.stdin.write(json.dumps(request).encode() + b"\n")
+            await self.process.stdin.drain()
+            line = await self.process.stdout.readline()
+        except asyncio.CancelledError:
+            # The worker's response would otherwise be read by the next request,
+            # waiting for it to exit means the pool sees it's no longer running
+            # and replaces it
+            _kill_process_group(self.process)
+            await self.process.wait()
+            raise
+
+        if not line:
+            await self.process.wait()
+            raise RuntimeError(
+                "GOV.UK Chat worker exited unexpectedly", "\n".join(self._stderr_tail)
+            )
+
+        response = json.loads(line.decode())
+        if "error" in response:
+            raise RuntimeError(
+                "Failed to successfully run the rake task", response["error"]
+            )
+
+        return response["result"]
+
+    async def stop(self) -> None:
+        if self.running:
+            assert self.process.stdin is not None
+            self.process.stdin.close()
+            await self.process.wait()
+
+        await self._stderr_task
+
+    async def _drain_stderr(self) -> None:
+        """Keep reading stderr so a chatty worker can't fill the pipe and block,
+        retaining the most recent lines to explain unexpected exits"""
+        assert self.process.stderr is not None
+
+        async for line in self.process.stderr:
+            self._stderr_tail.append(line.decode().rstrip())
+
+
+class RakeWorkerPool:
+    """A pool of RakeWorker processes which, when entered as an async context
+    manager, is used by run_rake_task to run tasks on whichever worker is free.
+    Workers that exit unexpectedly are replaced the next time they are needed."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle_workers: asyncio.Queue[RakeWorker] = asyncio.Queue()
+        self._workers: set[RakeWorker] = set()
+
+    async def __aenter__(self) -> Self:
+        logger.info(f"Starting {self.size} GOV.UK Chat workers")
+        workers = await asyncio.gather(*(RakeWorker.start() for _ in range(self.size)))
+        for worker in workers:
+            self._workers.add(worker)
+            self._idle_workers.put_nowait(worker)
+
+        self._context_token = _active_rake_task_runner.set(self)
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        _active_rake_task_runner.reset(self._context_token)
+        await asyncio.gather(*(worker.stop() for worker in self._workers))
+        self._workers.clear()
+
+    async def run(self, task_name: str, env_vars: dict[str, str] | None = None) -> Any:
+        worker = await self._idle_workers.get()
+        try:
+            if not worker.running:
+                worker = await self._replace_worker(worker)
+
+            return await worker.request(task_name, env_vars)
+        finally:
+            self._idle_workers.put_nowait(worker)
+
+    async def _replace_worker(self, worker: RakeWorker) -> RakeWorker:
+        logger.warning(
+            f"GOV.UK Chat worker exited with code {worker.process.returncode}, "
+            "starting a replacement"
+        )
+        await worker.stop()
+        self._workers.discard(worker)
+
+        replacement = await RakeWorker.start()
+        self._workers.add(replacement)
+        return replacement
+
+
+class RakeTaskBatcher:
+    """Collects run_rake_task calls, when entered as an async context manager,
+    into batches for the same task that are run by a single rake process with
+    run_rake_task_batch. A batch is run once it has batch_size inputs or once
+    linger seconds have passed since its first input arrived."""
+
+    def __init__(self, batch_size: int, linger: float = BATCH_LINGER_SECONDS):
+        self.batch_size = batch_size
+        self.linger = linger
+        self._pending: dict[str, list[tuple[dict[str, str], asyncio.Future]]] = {}
+        self._linger_timers: dict[str, asyncio.TimerHandle] = {}
+        self._running_batches: set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> Self:
+        self._context_token = _active_rake_task_runner.set(self)
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        _active_rake_task_runner.reset(self._context_token)
+        for timer in self._linger_timers.values():
+            timer.cancel()
+        for batch in self._running_batches:
+            batch.cancel()
+        await asyncio.gather(*self._running_batches, return_exceptions=True)
+
+    async def run(self, task_name: str, env_vars: dict[str, str] | None = None) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(task_name, [])
+        pending.append((env_vars or {}, future))
+
+        if len(pending) >= self.batch_size:
+            self._run_pending(task_name)
+        elif task_name not in self._linger_timers:
+            self._linger_timers[task_name] = asyncio.get_running_loop().call_later(
+                self.linger, self._run_pending, task_name
+            )
+
+        return await future
+
+    def _run_pending(self, task_name: str) -> None:
+        if timer := self._linger_timers.pop(task_name, None):
+            timer.cancel()
+
+        batch = self._pending.pop(task_name, [])
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run_batch(task_name, batch))
+        self._running_batches.add(task)
+        task.add_done_callback(self._running_batches.discard)
+
+        def cancel_if_abandoned(_future: asyncio.Future) -> None:
+            # stop the process once every caller has timed out or been cancelled
+            if all(future.cancelled() for _, future in batch):
+                task.cancel()
+
+        for _, future in batch:
+            future.add_done_callback(cancel_if_abandoned)
+
+    async def _run_batch(
+        self, task_name: str, batch: list[tuple[dict[str, str], asyncio.Future]]
+    ) -> None:
+        try:
+            results = await run_rake_task_batch(task_name, [env for env, _ in batch])
+        # Deliberately broad: the error is raised to each caller awaiting the batch
+        except Exception as exc:  # noqa: BLE001
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+def generate_and_write_outputs(
+    inputs: list[Any],
+    generate: Callable[..., Any],
+    output_dir: Path,
+    resume_key: str,
+    resume_dir: Path | None = None,
+    shard: Shard | None = None,
+    on_generated: Callable[[Any], None] | None = None,
+) -> Path:
+    """Generate the shard of the inputs, writing the generated items to
+    generated.jsonl and those that failed to failed.jsonl in the output
+    directory, and return the path of the generated items.
+
+    generate is called with the inputs and the on_generated and on_failed
+    keyword arguments. If resume_dir is given the items it generated are
+    copied over, matched to the inputs by resume_key, and only the remaining
+    inputs are generated. If on_generated is given each generated item is also
+    passed to it once written."""
+    if shard:
+        inputs = shard.select(inputs)
+
+    with (
+        GeneratedOutputWriter(output_dir) as output,
+        GeneratedOutputWriter(
+            output_dir, "failed.jsonl", data_label="failed items"
+        ) as failed,
+    ):
+        if resume_dir:
+            inputs = output.resume_from(resume_dir, inputs, key=resume_key)
+
+        def write_generated(item: Any):
+            output.write(item)
+            if on_generated:
+                on_generated(item)
+
+        generate(inputs, on_generated=write_generated, on_failed=failed.write)
+
+    return output.path
 
 
 async def generate_dataset(
     ground_truth: list[Any],
     generator_func: Callable[[Any], Awaitable[Any]],
     max_concurrent: int = MAX_CONCURRENT_TASKS,
+    config: GenerationConfig | None = None,
+    on_generated: Callable[[Any], None] | None = None,
+    on_failed: Callable[[FailedGeneration], None] | None = None,
 ) -> list[Any]:
     """Asynchronously generate data for each item in the ground_truth list by
-    calling the generator_func with each item. Outputs a progress bar and
-    cancels all jobs if one fails."""
+    calling the generator_func with each item. Outputs a progress bar.
+
+    Items that raise are retried, with an exponential backoff, up to the
+    config's max_attempts. If an item still fails it is passed to on_failed
+    and generation carries on; without on_failed all jobs are cancelled and
+    the error is raised.
+
+    If on_generated is given, each result is passed to it as soon as it is
+    generated, rather than being held in memory and returned.
+
+    Generation starts with max_concurrent items in flight, which is then
+    adapted between the config's min_concurrent and max_concurrent bounds as
+    throughput, latency and errors change.
 
-    semaphore = asyncio.Semaphore(max_concurrent)
+    If the config specifies workers, rake tasks are run on a pool of that many
+    long-running GOV.UK Chat processes rather than one process per item. If it
+    specifies a batch_size, rake tasks are run with that many items per
+    process.
 
-    async def run_generation_with_limited_async(item, semaphore):
-        async with semaphore:
-            return await generator_func(item)
+    If the config enables the cache, rake task results are reused from previous
+    runs with the same inputs and GOV.UK Chat revision."""
+
+    config = config or GenerationConfig()
+
+    async with AsyncExitStack() as stack:
+        if config.cache:
+            stack.enter_context(
+                GenerationCache(
+                    config.cache_path
+                    or project_root() / "results" / "generation_cache",
+                    govuk_chat_revision(govuk_chat_dir()),
+                    config.cache_max_size_mb * 1024 * 1024,
+                )
+            )
+
+        if config.workers:
+            await stack.enter_async_context(RakeWorkerPool(config.workers))
+            limiter = AdaptiveConcurrencyLimiter(config.workers, config.workers)
+        else:
+            # allow enough items in flight to fill a batch for each process
+            scale = config.batch_size or 1
+            if config.batch_size:
+                await stack.enter_async_context(RakeTaskBatcher(config.batch_size))
+
+            limiter = AdaptiveConcurrencyLimiter(
+                config.min_concurrent * scale,
+                config.max_concurrent * scale,
+                initial_limit=max_concurrent * scale,
+            )
+
+        return await _generate_dataset(
+            ground_truth, generator_func, limiter, config, on_generated, on_failed
+        )
+
+
+async def _generate_dataset(
+    ground_truth: list[Any],
+    generator_func: Callable[[Any], Awaitable[Any]],
+    limiter: AdaptiveConcurrencyLimiter,
+    config: GenerationConfig,
+    on_generated: Callable[[Any], None] | None,
+    on_failed: Callable[[FailedGeneration], None] | None,
+) -> list[Any]:
+    max_attempts = config.max_attempts
+    # a batched item waits for every item in its batch to be generated
+    timeout = config.timeout and config.timeout * (config.batch_size or 1)
+    attempt_durations: list[float] = []
+    timed_out_count = 0
+    failed_count = 0
+
+    async def run_generation_with_limited_async(item):
+        nonlocal failed_count, timed_out_count
+
+        for attempt in range(1, max_attempts + 1):
+            try:
+                async with limiter.slot():
+                    start_time = time.perf_counter()
+                    try:
+                        async with asyncio.timeout(timeout):
+                            return await generator_func(item)
+                    except TimeoutError:
+                        timed_out_count += 1
+                        raise
+                    finally:
+                        attempt_durations.append(time.perf_counter() - start_time)
+            except Exception as error:
+                if attempt < max_attempts:
+                    # backoff happens outside the slot so waiting items don't
+                    # hold up others
+                    delay = random.uniform(
+                        0, RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1)
+                    )
+                    logger.warning(
+                        f"Generation attempt {attempt} of {max_attempts} failed "
+                        f"with {error!r}, retrying in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+
+                if not on_failed:
+                    raise
+
+                failed_count += 1
+                logger.error(
+                    f"Generation failed after {max_attempts} attempts with {error!r}"
+                )
+                on_failed(FailedGeneration.from_error(item, error, attempt))
 
     tasks = [
-        asyncio.create_task(run_generation_with_limited_async(item, semaphore))
+        asyncio.create_task(run_generation_with_limited_async(item))
         for item in ground_truth
     ]
+    stop_watcher = None
+    if stop_event := _active_stop_event.get():
+        stop_watcher = asyncio.create_task(_cancel_when_set(stop_event, tasks))
     evaluations = []
 
     logger.info("Generating dataset")
-    for future in tqdm.as_completed(tasks, total=len(tasks)):
-        try:
+    try:
+        for future in tqdm.as_completed(tasks, total=len(tasks)):
             evaluation = await future
-            if evaluation is not None:
+            if evaluation is None:
+                continue
+
+            if on_generated:
+                on_generated(evaluation)
+            else:
                 evaluations.append(evaluation)
-        except Exception:
-            # Cancel all remaining tasks to ensure clean termination
-            for task in tasks:
-                if not task.done():
-                    task.cancel()
-            # Wait for all tasks to be cancelled
-            await asyncio.gather(*tasks, return_exceptions=True)
-            raise
+    except BaseException:
+        # Cancel all remaining tasks to ensure clean termination, including
+        # when generation is stopped or cancelled
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        # Wait for all tasks to be cancelled
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        if stop_watcher:
+            stop_watcher.cancel()
+
+    if failed_count:
+        logger.warning(f"{failed_count} items failed to generate")
+
+    _log_attempt_durations(attempt_durations)
+    if timed_out_count:
+        logger.warning(
+            f"{timed_out_count} generation attempts timed out after {timeout}s"
+        )
+
+    logger.info(f"Finished generating with a concurrency of {limiter.limit}")
 
     return evaluations
+
+
+async def _cancel_when_set(event: threading.Event, tasks: list[asyncio.Task]) -> None:
+    while not event.is_set():
+        await asyncio.sleep(STOP_POLL_SECONDS)
+
+    logger.warning("Stopping generation")
+    for task in tasks:
+        task.cancel()
+
+
+def _log_attempt_durations(durations: list[float]) -> None:
+    if not durations:
+        return
+
+    durations = sorted(durations)
+
+    def percentile(p: int) -> float:
+        return durations[math.ceil(p / 100 * len(durations)) - 1]
+
+    logger.info(
+        f"Generation attempt durations over {len(durations)} attempts: "
+        f"p50 {percentile(50):.1f}s, p95 {percentile(95):.1f}s, "
+        f"p99 {percentile(99):.1f}s, max {durations[-1]:.1f}s"
+    )
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Returned on a cache miss as None is a valid cached value
+CACHE_MISS = object()
+
+
+def content_key(content: Any) -> str:
+    """Return a key for JSON serialisable content that doesn't depend on the
+    order of dict keys"""
+    serialised = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha256(serialised.encode()).hexdigest()
+
+
+class FileCache:
+    """A content-addressed cache of JSON values stored as files on disk. evict
+    removes the least recently used entries until the cache is within
+    max_size_bytes."""
+
+    description = "cache"
+
+    def __init__(self, path: Path, max_size_bytes: int):
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        """Return the cached value for a key, or CACHE_MISS if there isn't one"""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding="utf8") as file:
+                value = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return CACHE_MISS
+
+        # record the use so eviction keeps recently used entries
+        os.utime(entry_path)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # write then rename so a concurrent or interrupted run never reads a
+        # partial entry
+        temp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_path, "w", encoding="utf8") as file:
+            json.dump(value, file)
+        temp_path.replace(entry_path)
+
+    def evict(self) -> None:
+        entries = [(entry.stat(), entry) for entry in self.path.glob("*/*.json")]
+        total_size = sum(stat.st_size for stat, _ in entries)
+        if total_size <= self.max_size_bytes:
+            return
+
+        evicted = 0
+        for stat, entry in sorted(entries, key=lambda e: e[0].st_mtime):
+            entry.unlink(missing_ok=True)
+            total_size -= stat.st_size
+            evicted += 1
+            if total_size <= self.max_size_bytes:
+                break
+
+        logger.info(f"Evicted {evicted} entries from the {self.description}")
+
+    def log_stats(self) -> None:
+        logger.info(
+            f"{self.description.capitalize()} had {self.hits} hits and "
+            f"{self.misses} misses"
+        )
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}.json"
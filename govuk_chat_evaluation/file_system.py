@@ -3,7 +3,8 @@ import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from types import TracebackType
+from typing import Any, Self, TextIO
 
 import yaml
 from pydantic import BaseModel
@@ -15,6 +16,8 @@ logger = logging.getLogger(__name__)
 # Timestamps are formatted rather than isoformat()'d so that timezone aware
 # datetimes don't introduce a UTC offset into output directory names
 OUTPUT_DIR_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+# How many generated models are buffered before they are flushed to disk
+GENERATED_FLUSH_EVERY = 10
 
 
 def project_root() -> Path:
@@ -72,6 +75,91 @@ def write_generated_to_output[Model: BaseModel](
     return output_path
 
 
+class GeneratedOutputWriter:
+    """Append the JSON contents of pydantic models to a JSONL file in the output
+    directory as they are generated, flushing to disk in small batches so that
+    an interrupted run keeps the data it has already generated"""
+
+    def __init__(
+        self,
+        output_dir: Path,
+        filename: str = "generated.jsonl",
+        flush_every: int = GENERATED_FLUSH_EVERY,
+        data_label: str = "generated items",
+    ):
+        self.path = output_dir / filename
+        self.data_label = data_label
+        self.flush_every = flush_every
+        self.count = 0
+        self._file: TextIO | None = None
+
+    def __enter__(self) -> Self:
+        self._file = open(self.path, "a", encoding="utf8")
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self._file:
+            self._file.close()
+
+        relative_path = self.path.relative_to(project_root())
+        logger.info(f"Wrote {self.count} {self.data_label} to {relative_path}")
+
+    def write(self, model: BaseModel) -> None:
+        self.write_line(model.model_dump_json())
+
+    def write_line(self, line: str) -> None:
+        assert self._file is not None, "GeneratedOutputWriter must be entered"
+
+        self._file.write(line + "\n")
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._file.flush()
+
+    def resume_from[Model: BaseModel](
+        self, previous_output_dir: Path, inputs: list[Model], key: str
+    ) -> list[Model]:
+        """Copy the data generated by a previous run into this output and return
+        the inputs that are still to be generated, matching them to the previous
+        data by the key field"""
+
+        previous_path = previous_output_dir / self.path.name
+        if not previous_path.exists():
+            # such as a run that stopped before it generated anything
+            logger.warning(
+                f"No {self.path.name} in {previous_output_dir} to resume from, "
+                f"generating all {len(inputs)} items"
+            )
+            return inputs
+
+        generated_keys = set()
+
+        with open(previous_path, "r", encoding="utf8") as file:
+            for line in file:
+                try:
+                    generated_keys.add(json.loads(line)[key])
+                except (json.JSONDecodeError, KeyError):
+                    # a run that was killed may have left a partially written line
+                    logger.warning(f"Skipping unreadable line in {previous_path}")
+                    continue
+
+                self.write_line(line.strip())
+
+        remaining = [
+            input for input in inputs if getattr(input, key) not in generated_keys
+        ]
+        logger.info(
+            f"Resuming with {len(inputs) - len(remaining)} items already "
+            f"generated, {len(remaining)} remaining"
+        )
+
+        return remaining
+
+
 def write_config_file_for_reuse(output_dir: Path, config: BaseConfig) -> Path:
     """Write a Config object as a YAML file in the output directory"""
     config_path = output_dir / "config.yaml"
@@ -0,0 +1,84 @@
+import hashlib
+import subprocess
+from contextvars import ContextVar, Token
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+
+from .file_cache import CACHE_MISS, FileCache, content_key
+
+__all__ = [
+    "CACHE_MISS",
+    "GenerationCache",
+    "active_generation_cache",
+    "govuk_chat_revision",
+]
+
+_active_generation_cache: ContextVar["GenerationCache | None"] = ContextVar(
+    "active_generation_cache", default=None
+)
+
+
+def active_generation_cache() -> "GenerationCache | None":
+    return _active_generation_cache.get()
+
+
+def govuk_chat_revision(govuk_chat_dir: Path) -> str:
+    """Return an identifier for the code checked out in GOV.UK Chat, which
+    includes a hash of any uncommitted changes so that edits to the working tree
+    aren't served stale results"""
+
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args],
+            cwd=govuk_chat_dir,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+
+    revision = git("rev-parse", "HEAD").strip()
+    diff = git("diff", "HEAD")
+    if diff:
+        revision += "-dirty-" + hashlib.sha256(diff.encode()).hexdigest()[:12]
+
+    return revision
+
+
+class GenerationCache(FileCache):
+    """A cache of parsed rake task output stored as files on disk, keyed on the
+    task name, its env vars and the GOV.UK Chat revision.
+
+    When entered, run_rake_task serves results from the cache. On exit the
+    least recently used entries are evicted until the cache is within
+    max_size_bytes and the hits and misses are logged."""
+
+    description = "generation cache"
+
+    def __init__(self, path: Path, revision: str, max_size_bytes: int):
+        super().__init__(path, max_size_bytes)
+        self.revision = revision
+        self._token: Token | None = None
+
+    def __enter__(self) -> Self:
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._token = _active_generation_cache.set(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self._token:
+            _active_generation_cache.reset(self._token)
+            self._token = None
+
+        self.evict()
+        self.log_stats()
+
+    def key(self, task_name: str, env_vars: dict[str, str] | None) -> str:
+        return content_key(
+            {"task": task_name, "env": env_vars or {}, "revision": self.revision}
+        )
@@ -3,7 +3,12 @@ from pathlib import Path
 
 import click
 
-from ..config import BaseConfig, apply_click_options_to_command, config_from_cli_args
+from ..config import (
+    BaseConfig,
+    GenerationConfig,
+    apply_click_options_to_command,
+    config_from_cli_args,
+)
 from ..file_system import write_config_file_for_reuse
 from ..output import initialise_output
 from .evaluate import evaluate_and_output_results
@@ -15,6 +20,9 @@ class Config(BaseConfig):
     generate: BaseConfig.GenericFields.generate
     input_path: BaseConfig.GenericFields.input_path
     claude_generation_model: BaseConfig.GenericFields.claude_generation_model
+    generation: BaseConfig.GenericFields.generation = GenerationConfig()
+    resume: BaseConfig.GenericFields.resume = None
+    shard: BaseConfig.GenericFields.shard = None
 
 
 @click.command(name="jailbreak_guardrails")
@@ -41,6 +49,9 @@ def main(**cli_args):
             config.input_path,
             config.claude_generation_model,
             output_dir=output_dir,
+            generation_config=config.generation,
+            resume_dir=config.resume,
+            shard=config.shard,
         )
     else:
         evaluate_path = config.input_path
@@ -1,12 +1,20 @@
 import asyncio
 import json
 import logging
+from collections.abc import Callable
+from functools import partial
 from pathlib import Path
 
 from pydantic import BaseModel
 
-from ..dataset_generation import generate_dataset, run_rake_task
-from ..file_system import jsonl_to_models, write_generated_to_output
+from ..config import GenerationConfig, Shard
+from ..dataset_generation import (
+    FailedGeneration,
+    generate_and_write_outputs,
+    generate_dataset,
+    run_rake_task,
+)
+from ..file_system import jsonl_to_models
 from .evaluate import EvaluationResult
 
 logger = logging.getLogger(__name__)
@@ -21,15 +29,31 @@ def generate_and_write_dataset(
     input_path: Path,
     claude_generation_model: str | None,
     output_dir: Path,
+    generation_config: GenerationConfig | None = None,
+    resume_dir: Path | None = None,
+    shard: Shard | None = None,
 ):
     models = jsonl_to_models(input_path, GenerateInput)
-    generated = generate_inputs_to_evaluation_results(claude_generation_model, models)
-    return write_generated_to_output(output_dir, generated)
+    return generate_and_write_outputs(
+        models,
+        partial(
+            generate_inputs_to_evaluation_results,
+            claude_generation_model,
+            generation_config=generation_config,
+        ),
+        output_dir,
+        resume_key="question",
+        resume_dir=resume_dir,
+        shard=shard,
+    )
 
 
 def generate_inputs_to_evaluation_results(
     claude_generation_model: str | None,
     generate_inputs: list[GenerateInput],
+    generation_config: GenerationConfig | None = None,
+    on_generated: Callable[[EvaluationResult], None] | None = None,
+    on_failed: Callable[[FailedGeneration], None] | None = None,
 ) -> list[EvaluationResult]:
     """Asynchronously run rake tasks for each GenerateInput instance to
     generate a result"""
@@ -66,5 +90,11 @@ def generate_inputs_to_evaluation_results(
         )
 
     return asyncio.run(
-        generate_dataset(generate_inputs, generate_input_to_evaluation_result)
+        generate_dataset(
+            generate_inputs,
+            generate_input_to_evaluation_result,
+            config=generation_config,
+            on_generated=on_generated,
+            on_failed=on_failed,
+        )
     )
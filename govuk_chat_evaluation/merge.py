@@ -0,0 +1,133 @@
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+
+import click
+import yaml
+
+from .config import Shard
+from .file_system import GeneratedOutputWriter
+from .output import initialise_output
+from .rag_answers.data_models import GenerateInput
+from .rag_answers.handle_model_id_collisions import ensure_unique_model_ids
+
+logger = logging.getLogger(__name__)
+
+
+@click.command(name="merge")
+@click.argument(
+    "shard_dirs",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+)
+@click.option(
+    "--input_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help=(
+        "Path to the data file the shards were generated from, used to check "
+        "for missing items. Defaults to the input_path of the shards' config."
+    ),
+)
+def main(shard_dirs: tuple[Path, ...], input_path: Path | None):
+    """Merge the generated data from the output directories of each shard of a
+    sharded run into one dataset that can be evaluated"""
+    start_time = datetime.now().astimezone()
+
+    output_dir = initialise_output("merge", start_time)
+
+    try:
+        merge_generated(list(shard_dirs), output_dir, input_path)
+    except ValueError as exc:
+        raise click.ClickException(str(exc)) from exc
+
+
+def merge_generated(
+    shard_dirs: list[Path], output_dir: Path, input_path: Path | None = None
+) -> Path:
+    """Combine the generated.jsonl files of every shard of a run into a single
+    generated.jsonl in the output directory. Raises a ValueError if shards are
+    missing or items are duplicated, and warns about items that weren't
+    generated."""
+
+    configs = [_read_shard_config(shard_dir) for shard_dir in shard_dirs]
+    _check_shards_complete([Shard.parse(config["shard"]) for config in configs])
+
+    if input_path is None and Path(configs[0]["input_path"]).exists():
+        input_path = Path(configs[0]["input_path"])
+
+    records = []
+    with GeneratedOutputWriter(output_dir) as output:
+        for shard_dir, config in zip(shard_dirs, configs):
+            with open(shard_dir / "generated.jsonl", "r", encoding="utf8") as file:
+                for line in file:
+                    records.append(json.loads(line))
+                    output.write_line(line.strip())
+
+            failed_path = shard_dir / "failed.jsonl"
+            failed_count = (
+                len(failed_path.read_text().splitlines()) if failed_path.exists() else 0
+            )
+            if failed_count:
+                logger.warning(
+                    f"{failed_count} items failed to generate in shard "
+                    f"{config['shard']}, see {failed_path}"
+                )
+
+    if records and all("id" in record for record in records):
+        ensure_unique_model_ids(
+            [GenerateInput.model_validate(record) for record in records]
+        )
+
+    if input_path:
+        _warn_about_missing_items(records, input_path)
+
+    return output.path
+
+
+def _read_shard_config(shard_dir: Path) -> dict:
+    with open(shard_dir / "config.yaml", "r", encoding="utf8") as file:
+        config = yaml.safe_load(file)
+
+    if not config.get("shard"):
+        raise ValueError(f"{shard_dir} is not the output of a sharded run")
+
+    return config
+
+
+def _check_shards_complete(shards: list[Shard]) -> None:
+    totals = {shard.total for shard in shards}
+    if len(totals) > 1:
+        raise ValueError("Shards are from runs split into different numbers of parts")
+
+    total = totals.pop()
+    numbers = [shard.number for shard in shards]
+    duplicates = sorted({number for number in numbers if numbers.count(number) > 1})
+    if duplicates:
+        raise ValueError(
+            "Duplicate shards: " + ", ".join(f"{n}/{total}" for n in duplicates)
+        )
+
+    missing = sorted(set(range(1, total + 1)) - set(numbers))
+    if missing:
+        raise ValueError(
+            "Missing shards: " + ", ".join(f"{n}/{total}" for n in missing)
+        )
+
+
+def _warn_about_missing_items(records: list[dict], input_path: Path) -> None:
+    with open(input_path, "r", encoding="utf8") as file:
+        inputs = [json.loads(line) for line in file if line.strip()]
+
+    if all("id" in input for input in inputs):
+        generated_ids = {record.get("id") for record in records}
+        missing_ids = [
+            input["id"] for input in inputs if input["id"] not in generated_ids
+        ]
+        if missing_ids:
+            logger.warning(f"Missing generated ids: {', '.join(missing_ids)}")
+    elif len(records) < len(inputs):
+        logger.warning(
+            f"{len(inputs) - len(records)} of {len(inputs)} items weren't generated"
+        )
@@ -5,7 +5,12 @@ from typing import Literal
 import click
 from pydantic import Field
 
-from ..config import BaseConfig, apply_click_options_to_command, config_from_cli_args
+from ..config import (
+    BaseConfig,
+    GenerationConfig,
+    apply_click_options_to_command,
+    config_from_cli_args,
+)
 from ..file_system import write_config_file_for_reuse
 from ..output import initialise_output
 from .evaluate import evaluate_and_output_results
@@ -21,6 +26,9 @@ class Config(BaseConfig):
         description="Type of output guardrail to evaluate: 'answer_guardrails' or 'question_router_guardrails'",
     )
     claude_generation_model: BaseConfig.GenericFields.claude_generation_model
+    generation: BaseConfig.GenericFields.generation = GenerationConfig()
+    resume: BaseConfig.GenericFields.resume = None
+    shard: BaseConfig.GenericFields.shard = None
 
 
 @click.command(name="output_guardrails")
@@ -48,6 +56,9 @@ def main(**cli_args):
             config.guardrail_type,
             config.claude_generation_model,
             output_dir,
+            generation_config=config.generation,
+            resume_dir=config.resume,
+            shard=config.shard,
         )
     else:
         evaluate_path = config.input_path
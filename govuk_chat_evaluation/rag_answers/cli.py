@@ -1,3 +1,4 @@
+from contextlib import closing
 from datetime import datetime
 from pathlib import Path
 
@@ -8,8 +9,8 @@ from ..file_system import write_config_file_for_reuse
 from ..output import initialise_output
 from .data_models import TaskConfig
 from .data_models.config import BedrockCredentialsError
-from .evaluate import evaluate_and_output_results
-from .generate import generate_and_write_dataset
+from .evaluate import evaluate_and_output_results, stream_evaluate_and_output_results
+from .generate import generate_and_write_dataset, stream_generated_dataset
 
 
 @click.command(name="rag_answers")
@@ -31,17 +32,33 @@ def main(**cli_args):
 
     output_dir = initialise_output("rag_answers", start_time)
 
-    if config.generate:
-        evaluate_path = generate_and_write_dataset(
-            config.input_path,
-            config.claude_generation_model,
-            output_dir,
-        )
-    else:
-        evaluate_path = config.input_path
-
     try:
-        evaluate_and_output_results(output_dir, evaluate_path, config)
+        if config.generate and config.stream:
+            # closed straight away if evaluation raises, to stop generating
+            with closing(
+                stream_generated_dataset(
+                    config.input_path,
+                    config.claude_generation_model,
+                    output_dir,
+                    generation_config=config.generation,
+                    shard=config.shard,
+                )
+            ) as batches:
+                stream_evaluate_and_output_results(output_dir, batches, config)
+        else:
+            if config.generate:
+                evaluate_path = generate_and_write_dataset(
+                    config.input_path,
+                    config.claude_generation_model,
+                    output_dir,
+                    generation_config=config.generation,
+                    resume_dir=config.resume,
+                    shard=config.shard,
+                )
+            else:
+                evaluate_path = config.input_path
+
+            evaluate_and_output_results(output_dir, evaluate_path, config)
     except BedrockCredentialsError as exc:
         raise click.ClickException(str(exc)) from exc
 
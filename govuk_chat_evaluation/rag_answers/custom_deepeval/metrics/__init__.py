@@ -1,8 +1,10 @@
 from .absence_of_factual_contradictions import AbsenceOfFactualContradictions
+from .artefact_store import ArtefactStore
 from .coherence import CoherenceMetric
 from .context_relevancy import ContextRelevancyMetric
 from .factual_precision_recall import (
     FactClassificationCache,
+    FactClassificationCacheStats,
     FactualPrecisionRecall,
 )
 from .factual_precision_recall import (
@@ -11,9 +13,11 @@ from .factual_precision_recall import (
 
 __all__ = [
     "AbsenceOfFactualContradictions",
+    "ArtefactStore",
     "CoherenceMetric",
     "ContextRelevancyMetric",
     "FactClassificationCache",
+    "FactClassificationCacheStats",
     "FactualPrecisionRecall",
     "FactualPrecisionRecallMode",
 ]
@@ -1,6 +1,6 @@
+import asyncio
 from typing import ClassVar, TypeVar, cast
 
-from deepeval.metrics import BaseMetric
 from deepeval.metrics.indicator import metric_progress_indicator
 from deepeval.metrics.utils import (
     check_llm_test_case_params,
@@ -16,6 +16,8 @@ from deepeval.test_case import (
 from deepeval.utils import prettify_list
 from pydantic import BaseModel
 
+from ..artefact_store import ArtefactStore
+from ..base_metrics import ReasonMarginMetric, StoredArtefactsMetric
 from .schema import (
     ClaimCollection,
     ScoreReason,
@@ -27,7 +29,7 @@ from .template import ContradictionsTemplate
 SchemaType = TypeVar("SchemaType", bound=BaseModel)
 
 
-class AbsenceOfFactualContradictions(BaseMetric):
+class AbsenceOfFactualContradictions(StoredArtefactsMetric, ReasonMarginMetric):
     _required_params: ClassVar[list[SingleTurnParams]] = [
         SingleTurnParams.INPUT,
         SingleTurnParams.ACTUAL_OUTPUT,
@@ -42,6 +44,8 @@ class AbsenceOfFactualContradictions(BaseMetric):
         include_reason: bool = True,
         strict_mode: bool = False,
         verbose_mode: bool = False,
+        reason_margin: float | None = None,
+        artefact_store: ArtefactStore | None = None,
     ):
         self.threshold = 1 if strict_mode else threshold
         self.model, self.using_native_model = initialize_model(model)
@@ -49,6 +53,8 @@ class AbsenceOfFactualContradictions(BaseMetric):
         self.include_reason = include_reason
         self.strict_mode = strict_mode
         self.verbose_mode = verbose_mode
+        self.reason_margin = reason_margin
+        self.artefact_store = artefact_store
 
     async def a_measure(
         self,
@@ -76,13 +82,23 @@ class AbsenceOfFactualContradictions(BaseMetric):
             _show_indicator=_show_indicator,
             _in_component=_in_component,
         ):
-            truth_collection = await self._generate_truths(
-                cast(str, test_case.expected_output)
+            # truths and claims are independent so are generated concurrently,
+            # only the verdicts need both
+            truth_collection, self.claims = await asyncio.gather(
+                self._generate_stored_artefact(
+                    "absence_of_factual_contradictions_truths",
+                    cast(str, test_case.expected_output),
+                    TruthCollection,
+                    self._generate_truths,
+                ),
+                self._generate_stored_artefact(
+                    "absence_of_factual_contradictions_claims",
+                    cast(str, test_case.actual_output),
+                    ClaimCollection,
+                    self._generate_claims,
+                ),
             )
             self.truths = truth_collection
-            self.claims = await self._generate_claims(
-                cast(str, test_case.actual_output)
-            )
             self.verdicts = await self._generate_verdicts(self.claims, truth_collection)
 
             self.score = self._calculate_score(self.verdicts)
@@ -138,7 +154,7 @@ class AbsenceOfFactualContradictions(BaseMetric):
     async def _generate_reason(
         self, score: float, verdicts: VerdictCollection
     ) -> str | None:
-        if self.include_reason is False:
+        if self.include_reason is False or not self._needs_reason(score):
             return None
 
         contradictions = verdicts.contradiction_reasons()
@@ -0,0 +1,95 @@
+import hashlib
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from govuk_chat_evaluation.sqlite_store import SQLiteStore
+
+ArtefactKey = tuple[str, str, str, int]
+
+# stored in place of a run number for artefacts that are shared by every run
+ALL_RUNS = 0
+
+
+class ArtefactStore(SQLiteStore):
+    """A store of the artefacts metrics extract from text with an LLM judge,
+    such as truths, claims and information needs, keyed on the artefact type,
+    a hash of the text and the judge model, and held in SQLite.
+
+    Without a path the store is held in memory and lasts as long as the object.
+    With a path artefacts persist between evaluations. When run is given
+    artefacts are only reused by the same run, so each run of an evaluation
+    extracts its own, otherwise they're frozen across runs. On exit entries
+    older than ttl_seconds are removed, then the least recently used until
+    there are no more than max_entries."""
+
+    description = "artefact store"
+    table = "artefacts"
+    key_columns = (
+        ("artefact_type", "TEXT"),
+        ("text_hash", "TEXT"),
+        ("evaluation_model", "TEXT"),
+        ("run", "INTEGER"),
+    )
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        run: int | None = None,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+    ):
+        self.run = run
+        super().__init__(path, max_entries, ttl_seconds)
+
+    def close(self) -> None:
+        super().close()
+        self.log_stats()
+
+    def _make_key(
+        self, artefact_type: str, evaluation_model: str | None, text: str
+    ) -> ArtefactKey:
+        return (
+            artefact_type,
+            hashlib.sha256(text.encode()).hexdigest(),
+            evaluation_model or "unknown-model",
+            ALL_RUNS if self.run is None else self.run,
+        )
+
+    def get[ArtefactT: BaseModel](
+        self,
+        artefact_type: str,
+        evaluation_model: str | None,
+        text: str,
+        schema: type[ArtefactT],
+    ) -> ArtefactT | None:
+        key = self._make_key(artefact_type, evaluation_model, text)
+        return self._get(key, schema)
+
+    def set(
+        self,
+        artefact_type: str,
+        evaluation_model: str | None,
+        text: str,
+        value: BaseModel,
+    ) -> None:
+        self._set(self._make_key(artefact_type, evaluation_model, text), value)
+
+    async def get_or_extract[ArtefactT: BaseModel](
+        self,
+        artefact_type: str,
+        evaluation_model: str | None,
+        text: str,
+        schema: type[ArtefactT],
+        extract: Callable[[], Awaitable[ArtefactT]],
+    ) -> ArtefactT:
+        """Return the stored artefact, otherwise the result of extract which is
+        stored. Concurrent calls for the same key wait for the first caller's
+        extraction rather than making their own, and extract again if it
+        raised."""
+        key = self._make_key(artefact_type, evaluation_model, text)
+        artefact, _ = await self._get_or_create(key, schema, extract)
+        # extract always returns an artefact, so one is always stored
+        assert artefact is not None
+        return artefact
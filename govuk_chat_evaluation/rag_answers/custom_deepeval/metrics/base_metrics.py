@@ -0,0 +1,44 @@
+from collections.abc import Awaitable, Callable
+
+from deepeval.metrics import BaseMetric
+from pydantic import BaseModel
+
+from .artefact_store import ArtefactStore
+
+
+class StoredArtefactsMetric(BaseMetric):
+    """A metric that shares the artefacts it extracts with an LLM judge through
+    artefact_store, when one is given"""
+
+    artefact_store: ArtefactStore | None = None
+
+    async def _generate_stored_artefact[ArtefactT: BaseModel](
+        self,
+        artefact_type: str,
+        text: str,
+        schema: type[ArtefactT],
+        generate: Callable[[str], Awaitable[ArtefactT]],
+    ) -> ArtefactT:
+        if self.artefact_store is None:
+            return await generate(text)
+
+        return await self.artefact_store.get_or_extract(
+            artefact_type,
+            self.evaluation_model,
+            text,
+            schema,
+            lambda: generate(text),
+        )
+
+
+class ReasonMarginMetric(BaseMetric):
+    """A metric that, when reason_margin is given, only generates a reason for
+    scores below the threshold or within reason_margin above it, saving a
+    judge call for each case that clearly passes"""
+
+    reason_margin: float | None = None
+
+    def _needs_reason(self, score: float) -> bool:
+        if self.reason_margin is None or self.threshold is None:
+            return True
+        return score < self.threshold + self.reason_margin
@@ -1,7 +1,7 @@
+import asyncio
 from typing import ClassVar, TypeVar, cast
 
 from deepeval.errors import MissingTestCaseParamsError
-from deepeval.metrics import BaseMetric
 from deepeval.metrics.indicator import metric_progress_indicator
 from deepeval.metrics.utils import (
     check_llm_test_case_params,
@@ -21,6 +21,8 @@ from govuk_chat_evaluation.rag_answers.data_models.input import (
     StructuredContext,
 )
 
+from ..artefact_store import ArtefactStore
+from ..base_metrics import ReasonMarginMetric, StoredArtefactsMetric
 from .schema import (
     InformationNeedsCollection,
     ScoreReason,
@@ -32,7 +34,7 @@ from .template import ContextRelevancyTemplate
 SchemaType = TypeVar("SchemaType", bound=BaseModel)
 
 
-class ContextRelevancyMetric(BaseMetric):
+class ContextRelevancyMetric(StoredArtefactsMetric, ReasonMarginMetric):
     _required_params: ClassVar[list[SingleTurnParams]] = [
         SingleTurnParams.INPUT,
         SingleTurnParams.ACTUAL_OUTPUT,
@@ -46,6 +48,8 @@ class ContextRelevancyMetric(BaseMetric):
         include_reason: bool = True,
         strict_mode: bool = False,
         verbose_mode: bool = False,
+        reason_margin: float | None = None,
+        artefact_store: ArtefactStore | None = None,
     ):
         self.threshold = 1 if strict_mode else threshold
         self.model, self.using_native_model = initialize_model(model)
@@ -53,6 +57,8 @@ class ContextRelevancyMetric(BaseMetric):
         self.include_reason = include_reason
         self.strict_mode = strict_mode
         self.verbose_mode = verbose_mode
+        self.reason_margin = reason_margin
+        self.artefact_store = artefact_store
 
     async def a_measure(
         self,
@@ -94,9 +100,16 @@ class ContextRelevancyMetric(BaseMetric):
                 test_case.metadata["structured_contexts"],
             )
 
-            truth_collection = await self._generate_truths(structured_contexts)
-            information_needs_collection = await self._generate_information_needs(
-                test_case.input
+            # truths and information needs are independent so are generated
+            # concurrently, only the verdicts need both
+            truth_collection, information_needs_collection = await asyncio.gather(
+                self._generate_truths(structured_contexts),
+                self._generate_stored_artefact(
+                    "context_relevancy_information_needs",
+                    test_case.input,
+                    InformationNeedsCollection,
+                    self._generate_information_needs,
+                ),
             )
             verdict_collection = await self._generate_verdicts(
                 information_needs_collection, truth_collection
@@ -121,21 +134,32 @@ class ContextRelevancyMetric(BaseMetric):
     async def _generate_truths(
         self, structured_contexts: list[StructuredContext]
     ) -> TruthCollection:
-        retrieval_context = [
-            ctx.to_flattened_context_content() for ctx in structured_contexts
-        ]
-        prompt = self.evaluation_template.truths(
-            retrieval_context=retrieval_context,
+        # truths are extracted from each chunk separately, as the same chunks
+        # are retrieved for many questions and can be reused from the store
+        chunk_truths = await asyncio.gather(
+            *(
+                self._generate_stored_artefact(
+                    "context_relevancy_chunk_truths",
+                    ctx.to_flattened_context_content(),
+                    TruthCollection,
+                    self._generate_chunk_truths,
+                )
+                for ctx in structured_contexts
+            )
         )
-
-        truths_collection = await self._generate_result_from_model(
-            prompt, schema=TruthCollection
+        truths_collection = TruthCollection(
+            truths=[truth for truths in chunk_truths for truth in truths.truths]
         )
         if len(truths_collection.truths) == 0:
             raise ValueError("No truths extracted from the context.")
 
         return truths_collection
 
+    async def _generate_chunk_truths(self, chunk: str) -> TruthCollection:
+        prompt = self.evaluation_template.truths(retrieval_context=[chunk])
+
+        return await self._generate_result_from_model(prompt, schema=TruthCollection)
+
     async def _generate_information_needs(
         self, input: str
     ) -> InformationNeedsCollection:
@@ -182,16 +206,16 @@ class ContextRelevancyMetric(BaseMetric):
     async def _generate_reason(
         self, input: str, verdict_collection: VerdictCollection
     ) -> str | None:
-        if self.include_reason is False:
+        score = self.score or 0.0
+        if self.include_reason is False or not self._needs_reason(score):
             return None
 
         unmet_needs = verdict_collection.unmet_needs()
-        score = float(round(self.score or 0.0, 2))
 
         prompt = self.evaluation_template.reason(
             unmet_needs=unmet_needs,
             input=input,
-            score=score,
+            score=float(round(score, 2)),
         )
 
         result = await self._generate_result_from_model(prompt, schema=ScoreReason)
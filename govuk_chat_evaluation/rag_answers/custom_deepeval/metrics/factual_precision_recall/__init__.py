@@ -1,7 +1,12 @@
-from .cache import FactClassificationCache
+from .cache import FactClassificationCache, FactClassificationCacheStats
 from .factual_precision_recall import (
     FactualPrecisionRecall,
     Mode,
 )
 
-__all__ = ["FactClassificationCache", "FactualPrecisionRecall", "Mode"]
+__all__ = [
+    "FactClassificationCache",
+    "FactClassificationCacheStats",
+    "FactualPrecisionRecall",
+    "Mode",
+]
@@ -1,22 +1,82 @@
+import hashlib
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Self
+
+from pydantic import BaseModel
+
+from govuk_chat_evaluation.sqlite_store import SQLiteStore
+
 from .schema import ClassifiedFacts
 
-CacheKey = tuple[str, str, str]
+CacheKey = tuple[str, str, str, int]
+
+
+class FactClassificationCacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    def __add__(self, other: "FactClassificationCacheStats") -> Self:
+        return self.model_copy(
+            update={
+                "hits": self.hits + other.hits,
+                "misses": self.misses + other.misses,
+                "evictions": self.evictions + other.evictions,
+            }
+        )
+
+
+class FactClassificationCache(SQLiteStore):
+    """A cache of fact classifications keyed on the evaluation model and hashes
+    of the answer and ground truth, stored in SQLite.
 
+    Without a path the cache is held in memory and lasts as long as the object.
+    With a path classifications persist between evaluations, scoped by run so
+    that each of an evaluation's runs is still an independent judgement. On exit
+    entries older than ttl_seconds are removed, then the least recently used
+    until there are no more than max_entries."""
 
-class FactClassificationCache:
-    def __init__(self):
-        self._store: dict[CacheKey, ClassifiedFacts] = {}
+    description = "fact classification cache"
+    table = "classified_facts"
+    key_columns = (
+        ("evaluation_model", "TEXT"),
+        ("answer_hash", "TEXT"),
+        ("ground_truth_hash", "TEXT"),
+        ("run", "INTEGER"),
+    )
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        run: int = 1,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+    ):
+        self.run = run
+        super().__init__(path, max_entries, ttl_seconds)
+
+    @property
+    def stats(self) -> FactClassificationCacheStats:
+        return FactClassificationCacheStats(
+            hits=self.hits, misses=self.misses, evictions=self.evictions
+        )
 
     def _make_key(
         self, evaluation_model: str | None, answer: str, ground_truth: str
     ) -> CacheKey:
-        return (evaluation_model or "unknown-model", answer, ground_truth)
+        return (
+            evaluation_model or "unknown-model",
+            hashlib.sha256(answer.encode()).hexdigest(),
+            hashlib.sha256(ground_truth.encode()).hexdigest(),
+            self.run,
+        )
 
     def get(
         self, evaluation_model: str | None, answer: str, ground_truth: str
     ) -> ClassifiedFacts | None:
         key = self._make_key(evaluation_model, answer, ground_truth)
-        return self._store.get(key)
+        return self._get(key, ClassifiedFacts)
 
     def set(
         self,
@@ -25,5 +85,19 @@ class FactClassificationCache:
         ground_truth: str,
         value: ClassifiedFacts,
     ) -> None:
+        self._set(self._make_key(evaluation_model, answer, ground_truth), value)
+
+    async def get_or_classify(
+        self,
+        evaluation_model: str | None,
+        answer: str,
+        ground_truth: str,
+        classify: Callable[[], Awaitable[ClassifiedFacts | None]],
+    ) -> tuple[ClassifiedFacts | None, bool]:
+        """Return the cached classification, otherwise the result of classify
+        which is cached unless it's None. Concurrent calls for the same key wait
+        for the first caller's classification rather than making their own, and
+        classify again if it isn't cached. Returns whether the classification
+        came from the cache."""
         key = self._make_key(evaluation_model, answer, ground_truth)
-        self._store[key] = value
+        return await self._get_or_create(key, ClassifiedFacts, classify)
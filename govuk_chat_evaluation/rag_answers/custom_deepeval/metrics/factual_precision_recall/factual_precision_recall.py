@@ -141,55 +141,53 @@ class FactualPrecisionRecall(BaseMetric):
     async def _a_classify_statements(
         self, input: str, actual_output: str, expected_output: str
     ) -> ClassifiedFacts:
-        assert self.model is not None
+        # precision and recall metrics for the same test case run concurrently,
+        # so the cache makes the second wait for the first's classification
+        classified_facts, cache_hit = await self.cache.get_or_classify(
+            self.evaluation_model,
+            actual_output,
+            expected_output,
+            lambda: self._a_generate_classified_facts(
+                input, actual_output, expected_output
+            ),
+        )
+        self._used_cache_for_last_classification = cache_hit
 
-        cached = self.cache.get(self.evaluation_model, actual_output, expected_output)
-        if cached is not None:
-            self._used_cache_for_last_classification = True
-            return cached
+        return classified_facts or ClassifiedFacts()
 
-        self._used_cache_for_last_classification = False
+    async def _a_generate_classified_facts(
+        self, input: str, actual_output: str, expected_output: str
+    ) -> ClassifiedFacts | None:
+        """Classify the facts with the model, returning None if its response
+        couldn't be parsed"""
+        assert self.model is not None
 
         prompt = self.evaluation_template.classify_facts(
             answer=actual_output, ground_truth=expected_output
         )
-        classified_facts: ClassifiedFacts
-        should_cache_result = True
         if self.using_native_model:
             res, cost = await self.model.a_generate(
                 prompt, schema=FactClassificationResult
             )
             if isinstance(cost, float):
                 self.evaluation_cost = (self.evaluation_cost or 0.0) + cost
-            classified_facts = res.classified_facts  # type: ignore[arg-type]
-        else:
+            return res.classified_facts  # type: ignore[arg-type]
+
+        try:
+            res = await self.model.a_generate(prompt, schema=FactClassificationResult)
+            return res.classified_facts  # type: ignore[arg-type]
+        except TypeError:
             try:
-                res = await self.model.a_generate(
-                    prompt, schema=FactClassificationResult
+                res = await self.model.a_generate(prompt)
+                data = trimAndLoadJson(res, self)
+                data_model = FactClassificationResult(**data)
+                return data_model.classified_facts
+            except Exception as inner_e:
+                logger.error(
+                    f"Failed to parse fallback JSON for test input: {input}",
+                    exc_info=inner_e,
                 )
-                classified_facts = res.classified_facts  # type: ignore[arg-type]
-            except TypeError:
-                try:
-                    res = await self.model.a_generate(prompt)
-                    data = trimAndLoadJson(res, self)
-                    data_model = FactClassificationResult(**data)
-                    classified_facts = data_model.classified_facts
-                except Exception as inner_e:
-                    logger.error(
-                        f"Failed to parse fallback JSON for test input: {input}",
-                        exc_info=inner_e,
-                    )
-                    classified_facts = ClassifiedFacts()
-                    should_cache_result = False
-
-        if should_cache_result:
-            self.cache.set(
-                self.evaluation_model,
-                actual_output,
-                expected_output,
-                classified_facts,
-            )
-        return classified_facts
+                return None
 
     def _calculate_score(self) -> float:
         """
@@ -1,6 +1,11 @@
+import logging
 import os
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
 from enum import Enum
-from typing import Any
+from functools import cache
+from pathlib import Path
+from typing import Any, Self
 
 from deepeval.metrics import (
     BaseMetric,
@@ -10,13 +15,21 @@ from deepeval.metrics import (
 from deepeval.metrics.answer_relevancy.answer_relevancy import AnswerRelevancyMetric
 from deepeval.models.llms.amazon_bedrock_model import AmazonBedrockModel
 from deepeval.models.llms.openai_model import GPTModel
-from pydantic import BaseModel, model_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    NonNegativeFloat,
+    PositiveFloat,
+    PositiveInt,
+    model_validator,
+)
 
-from ...aws_credentials import check_aws_credentials
-from ...config import BaseConfig
+from ...aws_credentials import aws_credentials_expiry, check_aws_credentials
+from ...config import BaseConfig, GenerationConfig
 from ...file_system import project_root
 from ..custom_deepeval.metrics import (
     AbsenceOfFactualContradictions,
+    ArtefactStore,
     CoherenceMetric,
     ContextRelevancyMetric,
     FactClassificationCache,
@@ -24,6 +37,19 @@ from ..custom_deepeval.metrics import (
     FactualPrecisionRecallMode,
 )
 from ..invalid_json_retry import attach_invalid_json_retry_to_model
+from ..judge_hedging import HedgingPolicy, attach_hedging_to_model
+from ..judge_load_balancer import BedrockRoute, LoadBalancedBedrockModel
+from ..judge_rate_limiter import JudgeRateLimiter, attach_rate_limiter_to_model
+from ..judge_registry import JudgeRegistry, PooledAmazonBedrockModel
+from ..judge_response_cache import (
+    JudgeResponseCache,
+    attach_judge_response_cache_to_model,
+)
+
+logger = logging.getLogger(__name__)
+
+# warn when credentials expire within this time, as an evaluation may outlast them
+CREDENTIALS_EXPIRY_WARNING = timedelta(hours=1)
 
 
 class MetricName(str, Enum):
@@ -49,35 +75,106 @@ class LLMJudgeModel(str, Enum):
     GPT_OSS_120B = "openai.gpt-oss-120b-1:0"
 
 
+BEDROCK_JUDGE_MODELS = {
+    LLMJudgeModel.AMAZON_NOVA_MICRO_1,
+    LLMJudgeModel.AMAZON_NOVA_PRO_1,
+    LLMJudgeModel.GPT_OSS_20B,
+    LLMJudgeModel.GPT_OSS_120B,
+}
+
+
 class BedrockCredentialsError(RuntimeError):
     pass
 
 
+def _bedrock_region() -> str:
+    return os.getenv("AWS_BEDROCK_REGION", "eu-west-1")
+
+
 def _ensure_bedrock_credentials(*, region: str) -> None:
+    script_command = "./scripts/export_aws_credentials.sh"
+    env_path = project_root() / ".env.aws"
+    expiry = aws_credentials_expiry(env_path)
+
     result = check_aws_credentials(region=region)
     if result.ok:
+        if expiry and expiry - datetime.now(UTC) < CREDENTIALS_EXPIRY_WARNING:
+            _warn_credentials_expire_soon(expiry, env_path, script_command)
         return
 
-    script_command = "./scripts/export_aws_credentials.sh"
-    env_path = project_root() / ".env.aws"
     message_lines = [
         "Missing or invalid AWS credentials for AWS Bedrock judge model.",
         f"Region: {region}",
         f"Run: {script_command} (optionally with a role) or set AWS_* environment variables.",
         f"Expected credentials file at: {env_path}",
     ]
+    if expiry and expiry <= datetime.now(UTC):
+        message_lines.append(f"Credentials in {env_path.name} expired at {expiry}")
     if result.error:
         message_lines.append(f"Credential check error: {result.error}")
 
     raise BedrockCredentialsError("\n".join(message_lines))
 
 
+@cache
+def _warn_credentials_expire_soon(
+    expiry: datetime, env_path: Path, script_command: str
+) -> None:
+    logger.warning(
+        f"AWS credentials in {env_path.name} expire at {expiry}, which may be "
+        f"before the evaluation finishes. Run {script_command} to refresh them."
+    )
+
+
 class LLMJudgeModelConfig(BaseModel):
     model: LLMJudgeModel
     temperature: float = 0.0
 
-    def instantiate_llm_judge(self):
-        """Return the LLM judge model instance."""
+    def instantiate_llm_judge(
+        self,
+        response_cache: JudgeResponseCache | None = None,
+        judge_registry: JudgeRegistry | None = None,
+    ):
+        """Return the LLM judge model instance, which returns responses from
+        response_cache when one is given. With a judge_registry the instance
+        shares its client with every other judge of the same model,
+        temperature and region, and its rate limiter with every judge of the
+        same model and region. Bedrock models with routes in the registry are
+        balanced across them, sharing the model's limiter for every region,
+        and slow requests are hedged if the registry has a hedging policy."""
+        if judge_registry is None:
+            model = self._instantiate_model()
+        else:
+            routes = judge_registry.routes.get(self.model.value, [])
+            region = None if routes else _bedrock_region()
+            model = judge_registry.get(
+                (self.model, self.temperature, region),
+                lambda: self._instantiate_model(
+                    judge_registry.max_pool_connections, routes
+                ),
+            )
+            # hedges are sent once a request has its turn, so waiting for the
+            # rate limiter doesn't count towards the hedge delay
+            if hedger := judge_registry.hedger(self.model.value):
+                model = attach_hedging_to_model(model, hedger)
+            # attached before the response cache so cached responses don't
+            # use up the budget
+            model = attach_rate_limiter_to_model(
+                model, judge_registry.rate_limiter(self.model.value, region)
+            )
+
+        if response_cache is not None:
+            model = attach_judge_response_cache_to_model(
+                model, response_cache, self.temperature
+            )
+
+        return model
+
+    def _instantiate_model(
+        self,
+        max_pool_connections: int | None = None,
+        routes: Sequence[BedrockRoute] = (),
+    ):
         match self.model:
             case (
                 LLMJudgeModel.AMAZON_NOVA_MICRO_1
@@ -85,19 +182,23 @@ class LLMJudgeModelConfig(BaseModel):
                 | LLMJudgeModel.GPT_OSS_20B
                 | LLMJudgeModel.GPT_OSS_120B
             ):
-                region = os.getenv("AWS_BEDROCK_REGION", "eu-west-1")
-                _ensure_bedrock_credentials(
-                    region=region,
-                )
-                model = AmazonBedrockModel(
-                    model=self.model.value,
-                    region=region,
-                    aws_session_token=os.getenv("AWS_SESSION_TOKEN"),
-                    generation_kwargs={
-                        "temperature": self.temperature,
-                        "maxTokens": 15_000,
-                    },
-                )
+                if routes:
+                    model = LoadBalancedBedrockModel(
+                        self.model.value,
+                        [
+                            (
+                                route,
+                                self._instantiate_bedrock_model(
+                                    route, max_pool_connections
+                                ),
+                            )
+                            for route in routes
+                        ],
+                    )
+                else:
+                    model = self._instantiate_bedrock_model(
+                        BedrockRoute(_bedrock_region()), max_pool_connections
+                    )
                 return attach_invalid_json_retry_to_model(model)
             case LLMJudgeModel.GEMINI_15_PRO:
                 raise NotImplementedError(
@@ -110,11 +211,54 @@ class LLMJudgeModelConfig(BaseModel):
             case LLMJudgeModel.GPT_4O_MINI | LLMJudgeModel.GPT_4O:
                 return GPTModel(model=self.model.value, temperature=self.temperature)
 
+    def _instantiate_bedrock_model(
+        self, route: BedrockRoute, max_pool_connections: int | None
+    ) -> AmazonBedrockModel:
+        # stub endpoints don't need real credentials
+        if route.endpoint_url is None:
+            _ensure_bedrock_credentials(
+                region=route.region,
+            )
+
+        bedrock_kwargs: dict[str, Any] = {
+            "model": self.model.value,
+            "region": route.region,
+            "aws_session_token": os.getenv("AWS_SESSION_TOKEN"),
+            "generation_kwargs": {
+                "temperature": self.temperature,
+                "maxTokens": 15_000,
+            },
+        }
+        if route.endpoint_url is not None:
+            bedrock_kwargs["endpoint_url"] = route.endpoint_url
+
+        if max_pool_connections is None:
+            return AmazonBedrockModel(**bedrock_kwargs)
+
+        return PooledAmazonBedrockModel(
+            max_pool_connections=max_pool_connections,
+            inference_profile=route.inference_profile,
+            **bedrock_kwargs,
+        )
+
+
+REASON_MARGIN_METRICS = {
+    MetricName.ABSENCE_OF_FACTUAL_CONTRADICTIONS,
+    MetricName.CONTEXT_RELEVANCY,
+}
+
 
 class MetricConfig(BaseModel):
     name: MetricName
     threshold: float
     llm_judge: LLMJudgeModelConfig
+    reason_margin: NonNegativeFloat | None = Field(
+        default=None,
+        description=(
+            "Only generate reasons for scores below the threshold or within this "
+            "margin above it. If not specified, every score has a reason."
+        ),
+    )
 
     @model_validator(mode="before")
     @classmethod
@@ -127,27 +271,419 @@ class MetricConfig(BaseModel):
             }
         return values
 
+    @model_validator(mode="after")
+    def validate_reason_margin(self) -> Self:
+        if self.reason_margin is not None and self.name not in REASON_MARGIN_METRICS:
+            raise ValueError(f"reason_margin isn't supported by {self.name.value}")
+
+        return self
+
+
+class JudgeRateLimitConfig(BaseModel):
+    """A budget of requests to a judge model, shared by every metric and run
+    that uses it"""
+
+    model: LLMJudgeModel
+    region: str | None = Field(
+        default=None,
+        description=(
+            "AWS region the budget applies to. If not specified, it applies to "
+            "the model in every region without a budget of its own."
+        ),
+    )
+    requests_per_minute: PositiveFloat | None = Field(
+        default=None, description="Requests to send to the model a minute"
+    )
+    tokens_per_minute: PositiveFloat | None = Field(
+        default=None,
+        description="Prompt tokens, estimated from length, to send a minute",
+    )
+    max_backoff_seconds: PositiveFloat = Field(
+        default=60,
+        description=(
+            "Longest pause after the model throttles requests, which doubles "
+            "from a second while throttling continues"
+        ),
+    )
+
+    def instantiate_rate_limiter(self) -> JudgeRateLimiter:
+        return JudgeRateLimiter(
+            requests_per_minute=self.requests_per_minute,
+            tokens_per_minute=self.tokens_per_minute,
+            max_backoff_seconds=self.max_backoff_seconds,
+        )
+
+
+class JudgeRouteConfig(BaseModel):
+    """A Bedrock region to send a judge model's requests to"""
+
+    region: str
+    inference_profile: str | None = Field(
+        default=None,
+        description=(
+            "Model ID to call instead of the judge model, such as a cross-region "
+            "inference profile"
+        ),
+    )
+    endpoint_url: str | None = Field(
+        default=None,
+        description=(
+            "Bedrock runtime endpoint to call instead of the region's, such as a "
+            "local stub. Credentials aren't checked for it."
+        ),
+    )
+
+
+class JudgeRoutesConfig(BaseModel):
+    """Regions to balance a Bedrock judge model's requests across"""
+
+    model: LLMJudgeModel
+    routes: list[JudgeRouteConfig] = Field(min_length=1)
+
+    @model_validator(mode="after")
+    def validate_bedrock_model(self) -> Self:
+        if self.model not in BEDROCK_JUDGE_MODELS:
+            raise ValueError(f"{self.model.value} isn't a Bedrock judge model")
+
+        return self
+
+
+class JudgeHedgingConfig(BaseModel):
+    """Options for sending a duplicate of a judge request that's much slower
+    than usual and using whichever response arrives first"""
+
+    enabled: bool = Field(
+        default=False, description="Whether to hedge slow judge requests"
+    )
+    percentile: float = Field(
+        default=95,
+        gt=0,
+        lt=100,
+        description=(
+            "Percentile of recent latencies, for the model and a similar prompt "
+            "size, after which a request is hedged"
+        ),
+    )
+    max_hedge_rate: float = Field(
+        default=0.05,
+        gt=0,
+        le=1,
+        description="Highest fraction of a model's requests to hedge",
+    )
+    min_samples: PositiveInt = Field(
+        default=20,
+        description=(
+            "Latencies needed for a prompt size before its requests are hedged"
+        ),
+    )
+
+    def instantiate_policy(self) -> HedgingPolicy | None:
+        if not self.enabled:
+            return None
+
+        return HedgingPolicy(
+            percentile=self.percentile,
+            max_hedge_rate=self.max_hedge_rate,
+            min_samples=self.min_samples,
+        )
+
+
+class EvaluationConfig(BaseModel):
+    """Options that control how test cases are evaluated"""
+
+    max_concurrent: PositiveInt = Field(
+        default=40,
+        description=(
+            "Highest number of metric measurements to run at once, across all "
+            "test cases, metrics and runs"
+        ),
+    )
+    max_concurrent_per_judge: PositiveInt | None = Field(
+        default=None,
+        description=(
+            "Highest number of metric measurements to run at once with any one "
+            "judge model. If not specified, only max_concurrent applies."
+        ),
+    )
+    judge_pool_connections: PositiveInt | None = Field(
+        default=None,
+        description=(
+            "Connections each shared judge client keeps open. If not specified, "
+            "enough for max_concurrent_per_judge, or else max_concurrent, "
+            "requests at once."
+        ),
+    )
+
+    judge_rate_limits: list[JudgeRateLimitConfig] = Field(
+        default_factory=list,
+        description=(
+            "Budgets of requests and tokens a minute for judge models. Judges "
+            "without one are only limited by the concurrency, but still back "
+            "off when they're throttled."
+        ),
+    )
+
+    judge_routes: list[JudgeRoutesConfig] = Field(
+        default_factory=list,
+        description=(
+            "Bedrock regions or inference profiles to balance each judge model's "
+            "requests across. Judge models without routes use AWS_BEDROCK_REGION."
+        ),
+    )
+
+    judge_hedging: JudgeHedgingConfig = JudgeHedgingConfig()
+
+    @model_validator(mode="after")
+    def validate_judge_routes(self) -> Self:
+        models = [judge_routes.model for judge_routes in self.judge_routes]
+        if len(models) != len(set(models)):
+            raise ValueError("judge_routes has more than one entry for a model")
+
+        return self
+
+    @model_validator(mode="after")
+    def validate_judge_rate_limits(self) -> Self:
+        keys = [(limit.model, limit.region) for limit in self.judge_rate_limits]
+        if len(keys) != len(set(keys)):
+            raise ValueError("judge_rate_limits has more than one budget for a region")
+
+        return self
+
+    def judge_registry(self) -> JudgeRegistry:
+        """Return a registry of judges with pools sized to the concurrency, and
+        the configured rate limits, routes and hedging"""
+        return JudgeRegistry(
+            max_pool_connections=self.judge_pool_connections
+            or self.max_concurrent_per_judge
+            or self.max_concurrent,
+            rate_limiters={
+                (limit.model.value, limit.region): limit.instantiate_rate_limiter()
+                for limit in self.judge_rate_limits
+            },
+            routes={
+                judge_routes.model.value: [
+                    BedrockRoute(**route.model_dump()) for route in judge_routes.routes
+                ]
+                for judge_routes in self.judge_routes
+            },
+            hedging=self.judge_hedging.instantiate_policy(),
+        )
+
+
+class FactClassificationCacheConfig(BaseModel):
+    """Options for the cache of fact classifications shared by the
+    factual_precision and factual_recall metrics"""
+
+    persist: bool = Field(
+        default=False,
+        description=(
+            "Whether to keep fact classifications between evaluations, so "
+            "re-evaluating unchanged answers doesn't call the judge again"
+        ),
+    )
+    path: Path | None = Field(
+        default=None,
+        description=(
+            "SQLite database to persist classifications in. If not specified, "
+            "results/fact_classification_cache.sqlite is used."
+        ),
+    )
+    max_entries: PositiveInt = Field(
+        default=100_000,
+        description=(
+            "Number of classifications to keep, the least recently used are "
+            "removed at the end of each run"
+        ),
+    )
+    ttl_days: PositiveFloat | None = Field(
+        default=30,
+        description="Days a classification is reused for, or null for no limit",
+    )
+
+    def instantiate_cache(self, run: int = 1) -> FactClassificationCache:
+        """Return a cache for an evaluation run, which is only persisted if
+        persist is set"""
+        if not self.persist:
+            return FactClassificationCache(run=run)
+
+        return FactClassificationCache(
+            path=self.path
+            or project_root() / "results" / "fact_classification_cache.sqlite",
+            run=run,
+            max_entries=self.max_entries,
+            ttl_seconds=self.ttl_days * 24 * 60 * 60 if self.ttl_days else None,
+        )
+
+
+class ArtefactStoreConfig(BaseModel):
+    """Options for the store of truths, claims and information needs that
+    metrics extract from test cases with their judge"""
+
+    persist: bool = Field(
+        default=False,
+        description=(
+            "Whether to keep extracted artefacts between evaluations, so "
+            "re-evaluating the same text doesn't extract them again"
+        ),
+    )
+    path: Path | None = Field(
+        default=None,
+        description=(
+            "SQLite database to persist artefacts in. If not specified, "
+            "results/artefact_store.sqlite is used."
+        ),
+    )
+    freeze_across_runs: bool = Field(
+        default=False,
+        description=(
+            "Whether every run reuses the same extracted artefacts, rather than "
+            "each of n_runs extracting its own, so only the later judgements vary"
+        ),
+    )
+    max_entries: PositiveInt = Field(
+        default=100_000,
+        description=(
+            "Number of artefacts to keep, the least recently used are removed at "
+            "the end of each run"
+        ),
+    )
+    ttl_days: PositiveFloat | None = Field(
+        default=30,
+        description="Days an artefact is reused for, or null for no limit",
+    )
+
+    def instantiate_stores(self, n_runs: int) -> list[ArtefactStore]:
+        """Return the store for each of n_runs, which is the same store for
+        every run if freeze_across_runs is set"""
+        if self.freeze_across_runs:
+            return [self._instantiate_store(run=None)] * n_runs
+
+        return [self._instantiate_store(run) for run in range(1, n_runs + 1)]
+
+    def _instantiate_store(self, run: int | None) -> ArtefactStore:
+        if not self.persist:
+            return ArtefactStore(run=run)
+
+        return ArtefactStore(
+            path=self.path or project_root() / "results" / "artefact_store.sqlite",
+            run=run,
+            max_entries=self.max_entries,
+            ttl_seconds=self.ttl_days * 24 * 60 * 60 if self.ttl_days else None,
+        )
+
+
+class JudgeResponseCacheConfig(BaseModel):
+    """Options for the cache of LLM judge responses"""
+
+    enabled: bool = Field(
+        default=False,
+        description=(
+            "Whether to reuse judge responses from previous evaluations for the "
+            "same prompt, judge model, temperature and response schema"
+        ),
+    )
+    path: Path | None = Field(
+        default=None,
+        description=(
+            "Directory to store cached judge responses in. If not specified, "
+            "results/judge_response_cache is used."
+        ),
+    )
+    max_size_mb: PositiveInt = Field(
+        default=1024,
+        description=(
+            "Size in megabytes the cache is kept within by removing the least "
+            "recently used responses at the end of each run"
+        ),
+    )
+    per_run: bool = Field(
+        default=True,
+        description=(
+            "Whether responses are only reused by the same run number, so each "
+            "of n_runs remains an independent sample of the judge"
+        ),
+    )
+
+    def instantiate_cache(self, run: int = 1) -> JudgeResponseCache | None:
+        """Return a cache for an evaluation run, or None if caching is disabled"""
+        if not self.enabled:
+            return None
+
+        return JudgeResponseCache(
+            path=self.path or project_root() / "results" / "judge_response_cache",
+            max_size_bytes=self.max_size_mb * 1024 * 1024,
+            run=run if self.per_run else None,
+        )
+
 
 class TaskConfig(BaseConfig):
     what: BaseConfig.GenericFields.what
     generate: BaseConfig.GenericFields.generate
     input_path: BaseConfig.GenericFields.input_path
     claude_generation_model: BaseConfig.GenericFields.claude_generation_model
+    generation: BaseConfig.GenericFields.generation = GenerationConfig()
+    resume: BaseConfig.GenericFields.resume = None
+    shard: BaseConfig.GenericFields.shard = None
+    stream: bool = Field(
+        default=False,
+        description=(
+            "Whether to evaluate generated data in batches while the rest is "
+            "still being generated, rather than after generation finishes"
+        ),
+    )
+    evaluation: EvaluationConfig = EvaluationConfig()
+    fact_classification_cache: FactClassificationCacheConfig = (
+        FactClassificationCacheConfig()
+    )
+    judge_response_cache: JudgeResponseCacheConfig = JudgeResponseCacheConfig()
+    artefact_store: ArtefactStoreConfig = ArtefactStoreConfig()
     metrics: list[MetricConfig]
     n_runs: int
 
-    def metric_instances(self) -> list[BaseMetric]:
-        """Return the list of runtime metric objects for evaluation."""
-        fact_classification_cache = FactClassificationCache()
+    @model_validator(mode="after")
+    def validate_stream(self) -> Self:
+        if self.stream and self.resume:
+            raise ValueError("stream can't be used with resume")
+
+        return self
+
+    def metric_instances(
+        self,
+        fact_classification_cache: FactClassificationCache | None = None,
+        judge_response_cache: JudgeResponseCache | None = None,
+        artefact_store: ArtefactStore | None = None,
+        judge_registry: JudgeRegistry | None = None,
+    ) -> list[BaseMetric]:
+        """Return the list of runtime metric objects for evaluation. Factual
+        metrics share the given cache, or a new in-memory one. When they're
+        given, judges return responses from judge_response_cache and are shared
+        through judge_registry, and metrics share extracted artefacts through
+        artefact_store."""
+        fact_classification_cache = (
+            fact_classification_cache or FactClassificationCache()
+        )
         return [
-            self._build_metric(metric, fact_classification_cache)
+            self._build_metric(
+                metric,
+                fact_classification_cache,
+                judge_response_cache,
+                artefact_store,
+                judge_registry,
+            )
             for metric in self.metrics
         ]
 
     def _build_metric(
-        self, metric: MetricConfig, fact_classification_cache: FactClassificationCache
+        self,
+        metric: MetricConfig,
+        fact_classification_cache: FactClassificationCache,
+        judge_response_cache: JudgeResponseCache | None = None,
+        artefact_store: ArtefactStore | None = None,
+        judge_registry: JudgeRegistry | None = None,
     ):
-        model = metric.llm_judge.instantiate_llm_judge()
+        model = metric.llm_judge.instantiate_llm_judge(
+            judge_response_cache, judge_registry
+        )
         match metric.name:
             case MetricName.FAITHFULNESS:
                 return FaithfulnessMetric(
@@ -175,9 +711,17 @@ class TaskConfig(BaseConfig):
                 )
             case MetricName.ABSENCE_OF_FACTUAL_CONTRADICTIONS:
                 return AbsenceOfFactualContradictions(
-                    threshold=metric.threshold, model=model
+                    threshold=metric.threshold,
+                    model=model,
+                    reason_margin=metric.reason_margin,
+                    artefact_store=artefact_store,
                 )
             case MetricName.CONTEXT_RELEVANCY:
-                return ContextRelevancyMetric(threshold=metric.threshold, model=model)
+                return ContextRelevancyMetric(
+                    threshold=metric.threshold,
+                    model=model,
+                    reason_margin=metric.reason_margin,
+                    artefact_store=artefact_store,
+                )
             case MetricName.COHERENCE:
                 return CoherenceMetric(threshold=metric.threshold, model=model)
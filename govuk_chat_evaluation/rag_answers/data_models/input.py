@@ -1,8 +1,11 @@
 import uuid
+from functools import cached_property
 
 from deepeval.test_case import LLMTestCase
 from pydantic import BaseModel, Field
 
+from ..html_to_text import html_to_text
+
 
 class StructuredContext(BaseModel):
     title: str
@@ -12,13 +15,19 @@ class StructuredContext(BaseModel):
     exact_path: str
     base_path: str
 
+    @cached_property
+    def text_content(self) -> str:
+        """Return html_content as compact text for judge prompts, converted once
+        per context."""
+        return html_to_text(self.html_content)
+
     def to_flattened_string(self) -> str:
         """Return the flattened string representation of the structure context."""
         return (
             f"{self.title}\n"
             f"{' > '.join(self.heading_hierarchy)}\n"
             f"{self.description}\n\n"
-            f"{self.html_content}"
+            f"{self.text_content}"
         )
 
     def to_flattened_context_content(self) -> str:
@@ -30,7 +39,7 @@ class StructuredContext(BaseModel):
             f"Page description: {self.description}\n"
             f"Headings: {' > '.join(self.heading_hierarchy)}\n\n"
             f"Content:\n"
-            f"{self.html_content}"
+            f"{self.text_content}"
         )
 
 
@@ -1,18 +1,28 @@
+import asyncio
 import json
 import logging
+import time
 from collections import defaultdict
+from contextlib import ExitStack
 from pathlib import Path
 
-from deepeval import evaluate as deepeval_evaluate
 from deepeval.evaluate.types import TestResult
+from deepeval.evaluate.utils import create_test_result
+from deepeval.metrics import BaseMetric
 from deepeval.test_case import LLMTestCase
-from deepeval.test_run import global_test_run_manager
+from deepeval.test_run import TestRunManager
+from deepeval.test_run.api import LLMApiTestCase
 from pydantic.dataclasses import dataclass
 
 from govuk_chat_evaluation import file_system
 
 from ..timing import log_task_duration
+from .custom_deepeval.metrics import FactClassificationCacheStats
 from .data_models.config import TaskConfig
+from .data_models.input import StructuredContext
+from .evaluation_scheduler import evaluate_test_cases
+from .judge_registry import JudgeRegistry
+from .tokens import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -46,16 +56,23 @@ def run_deepeval_evaluation(
     config: TaskConfig,
     output_dir: Path,
     n_runs: int = 1,
-    **kwargs,
+    test_run_suffix: str = "",
+    ignore_errors: bool = True,
 ) -> list[list[TestResult]]:
-    """ "
-    Run the DeepEval evaluation on the given models and metrics
+    """
+    Run the DeepEval metrics on the given test cases. Every metric of every run
+    is measured for each test case as its own task, within the concurrency
+    limits of config.evaluation.
 
     Args:
         cases : List of test cases to evaluate
-        metrics : List of metrics to use for evaluation
+        config : Configuration of the metrics to evaluate with
+        output_dir : Directory to write each run's DeepEval test run file to
         n_runs : Number of runs to perform for the evaluation
-        **kwargs: Additional arguments to pass to the deepeval.evaluation function
+        test_run_suffix : Appended to the name of each DeepEval test run file, to
+            distinguish evaluations of different parts of a dataset
+        ignore_errors : Whether to record metric errors in the results rather
+            than raising them
 
     Returns:
         Evaluation results grouped by run
@@ -63,41 +80,158 @@ def run_deepeval_evaluation(
     """
 
     with log_task_duration("Running DeepEval Evaluation"):
-        logger.info("Running DeepEval evaluation")
-
-        all_evaluation_runs = []
-
-        for i in range(n_runs):
-            logger.info(f"Running evaluation iteration {i + 1}/{n_runs}...")
-
-            metrics = config.metric_instances()
+        logger.info(f"Running DeepEval evaluation of {n_runs} runs")
+        _log_context_compaction(cases)
+        start_time = time.perf_counter()
+
+        with ExitStack() as caches:
+            artefact_stores = config.artefact_store.instantiate_stores(n_runs)
+            # a store frozen across runs is shared by them, so is only entered once
+            for artefact_store in dict.fromkeys(artefact_stores):
+                caches.enter_context(artefact_store)
+
+            fact_classification_caches = []
+            run_metrics = []
+            judge_registry = config.evaluation.judge_registry()
+            for run, artefact_store in enumerate(artefact_stores, start=1):
+                fact_classification_cache = caches.enter_context(
+                    config.fact_classification_cache.instantiate_cache(run=run)
+                )
+                judge_response_cache = config.judge_response_cache.instantiate_cache(
+                    run=run
+                )
+                if judge_response_cache:
+                    caches.enter_context(judge_response_cache)
+
+                fact_classification_caches.append(fact_classification_cache)
+                run_metrics.append(
+                    config.metric_instances(
+                        fact_classification_cache,
+                        judge_response_cache,
+                        artefact_store,
+                        judge_registry,
+                    )
+                )
 
-            evaluation_run = deepeval_evaluate(
-                test_cases=cases,
-                metrics=metrics,
-                **kwargs,  # pass additional arguments dynamically
+            run_test_cases = asyncio.run(
+                _evaluate_test_cases(
+                    cases, run_metrics, config, judge_registry, ignore_errors
+                )
             )
 
-            all_evaluation_runs.append(
-                evaluation_run.test_results
-            )  # Store results per run
-
-            test_run = global_test_run_manager.get_test_run()
-            path = output_dir / f"deepeval_test_run_{i + 1}.json"
+        run_duration = time.perf_counter() - start_time
+        all_evaluation_runs = [
+            _write_test_run(
+                cases,
+                api_test_cases,
+                output_dir / f"deepeval_test_run_{run}{test_run_suffix}.json",
+                run_duration,
+            )
+            for run, api_test_cases in enumerate(run_test_cases, start=1)
+        ]
+
+        _write_fact_classification_cache_stats(
+            output_dir,
+            sum(
+                (cache.stats for cache in fact_classification_caches),
+                FactClassificationCacheStats(),
+            ),
+        )
 
-            if test_run is None:
-                raise RuntimeError(f"DeepEval test run not found for run {i + 1}")
+    logger.info("Deepval evaluation complete")
 
-            body = test_run.model_dump(by_alias=True, exclude_none=True)
-            with (path).open("w") as f:
-                json.dump(body, f)
+    return all_evaluation_runs
 
-            relative_path = path.relative_to(file_system.project_root())
-            logger.info(f"Run {i + 1} done. written to {relative_path}")
 
-    logger.info("Deepval evaluation complete")
+async def _evaluate_test_cases(
+    cases: list[LLMTestCase],
+    run_metrics: list[list[BaseMetric]],
+    config: TaskConfig,
+    judge_registry: JudgeRegistry,
+    ignore_errors: bool,
+) -> list[list[LLMApiTestCase]]:
+    try:
+        return await evaluate_test_cases(
+            cases,
+            run_metrics,
+            max_concurrent=config.evaluation.max_concurrent,
+            max_concurrent_per_judge=config.evaluation.max_concurrent_per_judge,
+            ignore_errors=ignore_errors,
+        )
+    finally:
+        # the judges' clients are closed in the event loop they were used in
+        await judge_registry.close()
+
+
+def _log_context_compaction(cases: list[LLMTestCase]) -> None:
+    """Log an estimate of the prompt tokens saved in each run by giving judges
+    the structured contexts as text rather than HTML"""
+    contexts: list[StructuredContext] = [
+        context
+        for case in cases
+        for context in (case.metadata or {}).get("structured_contexts") or []
+    ]
+    html_tokens = sum(estimate_tokens(context.html_content) for context in contexts)
+    if not html_tokens:
+        return
+
+    text_tokens = sum(estimate_tokens(context.text_content) for context in contexts)
+    saved_tokens = html_tokens - text_tokens
+    logger.info(
+        f"Converting context HTML to text saves about {saved_tokens} of "
+        f"{html_tokens} tokens ({saved_tokens / html_tokens:.0%}) each time "
+        "a run's metrics use the contexts"
+    )
+
+
+def _write_test_run(
+    cases: list[LLMTestCase],
+    api_test_cases: list[LLMApiTestCase],
+    test_run_path: Path,
+    run_duration: float,
+) -> list[TestResult]:
+    """Record a run's test cases in a DeepEval test run, which is written to
+    test_run_path, and return their results"""
+    test_run_manager = TestRunManager()
+    for case, api_test_case in zip(cases, api_test_cases):
+        test_run_manager.update_test_run(api_test_case, case)
+
+    test_run = test_run_manager.get_test_run()
+    if test_run is None:
+        raise RuntimeError(f"DeepEval test run not found for {test_run_path.name}")
+
+    test_run.construct_metrics_scores()
+    test_run.calculate_test_passes_and_fails()
+    test_run.sort_test_cases()
+    test_run.run_duration = run_duration
+
+    body = test_run.model_dump(by_alias=True, exclude_none=True)
+    with test_run_path.open("w") as f:
+        json.dump(body, f)
+
+    relative_path = test_run_path.relative_to(file_system.project_root())
+    logger.info(f"Run written to {relative_path}")
+
+    return [create_test_result(api_test_case) for api_test_case in api_test_cases]
+
+
+def _write_fact_classification_cache_stats(
+    output_dir: Path, stats: FactClassificationCacheStats
+) -> None:
+    """Write the fact classification cache statistics to the output directory,
+    adding to those of earlier evaluations in the same run, such as other
+    streamed batches"""
+    path = output_dir / "fact_classification_cache_stats.json"
+    if path.exists():
+        stats = (
+            FactClassificationCacheStats.model_validate_json(path.read_text()) + stats
+        )
 
-    return all_evaluation_runs
+    path.write_text(stats.model_dump_json(indent=2))
+    logger.info(
+        f"Fact classification cache had {stats.hits} hits, {stats.misses} misses "
+        f"and {stats.evictions} evictions"
+    )
 
 
 def convert_deepeval_output_to_evaluation_results(
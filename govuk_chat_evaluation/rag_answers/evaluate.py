@@ -1,14 +1,10 @@
 import logging
+from collections.abc import Iterable
 from functools import cached_property
 from pathlib import Path
 
 import pandas as pd
-from deepeval.evaluate.configs import (
-    AsyncConfig,
-    CacheConfig,
-    DisplayConfig,
-    ErrorConfig,
-)
+from deepeval.evaluate.types import TestResult
 
 from govuk_chat_evaluation.rag_answers.handle_model_id_collisions import (
     ensure_unique_model_ids,
@@ -24,23 +20,6 @@ from .deepeval_evaluate import (
 
 logger = logging.getLogger(__name__)
 
-display_config = DisplayConfig(
-    verbose_mode=False,
-    show_indicator=True,
-    print_results=False,
-)
-
-async_config = AsyncConfig(
-    max_concurrent=40,
-    throttle_value=5,
-)
-
-cache_config = CacheConfig(use_cache=False, write_cache=False)
-
-error_config = ErrorConfig(
-    ignore_errors=True,
-)
-
 
 # would expect we need to pass config object through if that has metrics configuration
 def evaluate_and_output_results(
@@ -63,17 +42,69 @@ def evaluate_and_output_results(
 
     ensure_unique_model_ids(models)
 
-    evaluation_outputs = run_deepeval_evaluation(
+    evaluation_outputs = _run_evaluation(models, evaluation_config, output_dir)
+
+    _output_results(output_dir, evaluation_outputs, models[0].model)
+
+
+def stream_evaluate_and_output_results(
+    output_dir: Path,
+    batches: Iterable[list[EvaluationTestCase]],
+    evaluation_config: TaskConfig,
+):
+    """
+    Evaluate batches of test cases as they arrive, such as while the rest of the
+    dataset is still being generated, then aggregate the results of all batches
+    and export them to files.
+
+    Args:
+        output_dir: The directory to save the evaluation results.
+        batches: Batches of test cases to evaluate.
+        evaluation_config: Configuration for the evaluation.
+    """
+
+    evaluation_outputs: list[list[TestResult]] = [
+        [] for _ in range(evaluation_config.n_runs)
+    ]
+    generation_model = None
+
+    for part, models in enumerate(batches, start=1):
+        logger.info(f"Evaluating batch {part} of {len(models)} test cases")
+        generation_model = generation_model or models[0].model
+
+        batch_outputs = _run_evaluation(
+            models, evaluation_config, output_dir, test_run_suffix=f"_part_{part}"
+        )
+        for run_results, batch_run_results in zip(evaluation_outputs, batch_outputs):
+            run_results.extend(batch_run_results)
+
+    if generation_model is None:
+        logger.error("\nThere is no data to evaluate")
+        return
+
+    _output_results(output_dir, evaluation_outputs, generation_model)
+
+
+def _run_evaluation(
+    models: list[EvaluationTestCase],
+    evaluation_config: TaskConfig,
+    output_dir: Path,
+    test_run_suffix: str = "",
+) -> list[list[TestResult]]:
+    return run_deepeval_evaluation(
         cases=[model.to_llm_test_case() for model in models],
         config=evaluation_config,
         n_runs=evaluation_config.n_runs,
-        display_config=display_config,
-        async_config=async_config,
-        cache_config=cache_config,
-        error_config=error_config,
+        test_run_suffix=test_run_suffix,
         output_dir=output_dir,
     )
 
+
+def _output_results(
+    output_dir: Path,
+    evaluation_outputs: list[list[TestResult]],
+    generation_model: str,
+) -> None:
     evaluation_results = convert_deepeval_output_to_evaluation_results(
         evaluation_outputs
     )
@@ -86,7 +117,7 @@ def evaluate_and_output_results(
     aggregation.export_to_csvs(output_dir)
 
     logger.info("Evaluation Results:")
-    logger.info("Generation model: %s", models[0].model)
+    logger.info("Generation model: %s", generation_model)
     logger.info(aggregation.summary)
 
 
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Sequence
+from contextlib import nullcontext
+from typing import cast
+
+from deepeval.evaluate.utils import create_metric_data
+from deepeval.metrics import BaseMetric
+from deepeval.metrics.indicator import safe_a_measure
+from deepeval.metrics.utils import copy_metrics
+from deepeval.test_case import LLMTestCase
+from deepeval.test_case.api import create_api_test_case
+from deepeval.test_run.api import LLMApiTestCase
+from tqdm.asyncio import tqdm
+
+logger = logging.getLogger(__name__)
+
+
+async def evaluate_test_cases(
+    cases: list[LLMTestCase],
+    run_metrics: Sequence[Sequence[BaseMetric]],
+    max_concurrent: int,
+    max_concurrent_per_judge: int | None = None,
+    ignore_errors: bool = True,
+) -> list[list[LLMApiTestCase]]:
+    """Measure every test case with every metric of each run, where each
+    measurement is its own task so that a slow metric or test case doesn't hold
+    up the others. At most max_concurrent measurements run at once, and at most
+    max_concurrent_per_judge for any one judge model.
+
+    Returns DeepEval API test cases for each run, in the order of cases, with
+    metric data in the order of the run's metrics. Metric errors are recorded
+    in the metric data if ignore_errors is set, otherwise they're raised."""
+    limit = asyncio.Semaphore(max_concurrent)
+    judge_limits: defaultdict[str, asyncio.Semaphore] = defaultdict(
+        lambda: asyncio.Semaphore(max_concurrent_per_judge or max_concurrent)
+    )
+
+    async def measure(metric: BaseMetric, case: LLMTestCase) -> float:
+        # wait for the judge before taking a global slot, so a busy judge
+        # doesn't hold up measurements by the others
+        judge_limit = (
+            judge_limits[str(metric.evaluation_model)]
+            if max_concurrent_per_judge
+            else nullcontext()
+        )
+        async with judge_limit, limit:
+            start_time = time.perf_counter()
+            await safe_a_measure(
+                metric,
+                case,
+                ignore_errors=ignore_errors,
+                skip_on_missing_params=False,
+            )
+            return time.perf_counter() - start_time
+
+    # each measurement has its own copy of the metric as metrics hold the
+    # score and reason of what they last measured
+    measurements = [
+        [
+            [
+                (metric, asyncio.ensure_future(measure(metric, case)))
+                for metric in cast(list[BaseMetric], copy_metrics(list(metrics)))
+            ]
+            for case in cases
+        ]
+        for metrics in run_metrics
+    ]
+    tasks = [
+        task
+        for run_measurements in measurements
+        for case_measurements in run_measurements
+        for _, task in case_measurements
+    ]
+
+    logger.info(
+        f"Evaluating {len(tasks)} measurements of {len(cases)} test cases "
+        f"over {len(run_metrics)} runs"
+    )
+    try:
+        for task in tqdm.as_completed(tasks, total=len(tasks)):
+            await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    return [
+        [
+            _api_test_case(case, index, case_measurements)
+            for index, (case, case_measurements) in enumerate(
+                zip(cases, run_measurements)
+            )
+        ]
+        for run_measurements in measurements
+    ]
+
+
+def _api_test_case(
+    case: LLMTestCase,
+    index: int,
+    case_measurements: list[tuple[BaseMetric, asyncio.Task[float]]],
+) -> LLMApiTestCase:
+    api_test_case = create_api_test_case(test_case=case, index=index)
+    assert isinstance(api_test_case, LLMApiTestCase)
+
+    for metric, task in case_measurements:
+        if metric.skipped:
+            continue
+
+        api_test_case.update_metric_data(create_metric_data(metric))
+        api_test_case.update_run_duration(task.result())
+
+    return api_test_case
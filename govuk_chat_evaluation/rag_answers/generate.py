@@ -1,36 +1,129 @@
 import asyncio
+import queue
+import threading
+from collections.abc import Callable, Generator
+from functools import partial
 from pathlib import Path
 
 from govuk_chat_evaluation.rag_answers.handle_model_id_collisions import (
     ensure_unique_model_ids,
 )
 
-from ..dataset_generation import generate_dataset, run_rake_task
-from ..file_system import jsonl_to_models, write_generated_to_output
+from ..config import GenerationConfig, Shard
+from ..dataset_generation import (
+    FailedGeneration,
+    generate_and_write_outputs,
+    generate_dataset,
+    run_rake_task,
+    stop_generation_on,
+)
+from ..file_system import jsonl_to_models
 from .data_models import (
     EvaluationTestCase,
     GenerateInput,
     StructuredContext,
 )
 
+# Generated test cases are evaluated in batches of at least this size, so that
+# the overhead of starting an evaluation is shared between them
+STREAM_MIN_BATCH_SIZE = 20
+_GENERATION_FINISHED = object()
+
 
 def generate_and_write_dataset(
     input_path: Path,
     claude_generation_model: str | None,
     output_dir: Path,
+    generation_config: GenerationConfig | None = None,
+    resume_dir: Path | None = None,
+    shard: Shard | None = None,
+    on_generated: Callable[[EvaluationTestCase], None] | None = None,
 ):
     models = jsonl_to_models(Path(input_path), GenerateInput)
     ensure_unique_model_ids(models)
-    generated = generate_inputs_to_evaluation_test_cases(
-        claude_generation_model, models
+    # ids missing from the input are generated afresh on each run, so a
+    # previous run's output can only be matched to the inputs by question
+    resume_key = "id" if all("id" in m.model_fields_set for m in models) else "question"
+    return generate_and_write_outputs(
+        models,
+        partial(
+            generate_inputs_to_evaluation_test_cases,
+            claude_generation_model,
+            generation_config=generation_config,
+        ),
+        output_dir,
+        resume_key=resume_key,
+        resume_dir=resume_dir,
+        shard=shard,
+        on_generated=on_generated,
     )
 
-    return write_generated_to_output(output_dir, generated)
+
+def stream_generated_dataset(
+    input_path: Path,
+    claude_generation_model: str | None,
+    output_dir: Path,
+    generation_config: GenerationConfig | None = None,
+    shard: Shard | None = None,
+    min_batch_size: int = STREAM_MIN_BATCH_SIZE,
+) -> Generator[list[EvaluationTestCase]]:
+    """Generate and write the dataset in a background thread, yielding the
+    generated test cases in batches so they can be evaluated while the rest are
+    still being generated. A batch is yielded once it has at least
+    min_batch_size test cases and none more are waiting, the last batch may be
+    smaller.
+
+    If the caller stops iterating, such as when evaluation fails or is
+    interrupted, generation is stopped so its rake processes don't carry on."""
+
+    generated: queue.Queue = queue.Queue()
+    errors: list[BaseException] = []
+    stop = threading.Event()
+
+    def generate():
+        try:
+            with stop_generation_on(stop):
+                generate_and_write_dataset(
+                    input_path,
+                    claude_generation_model,
+                    output_dir,
+                    generation_config,
+                    shard=shard,
+                    on_generated=generated.put,
+                )
+        # Deliberately broad: the error is raised again in the calling thread
+        except BaseException as exc:  # noqa: BLE001
+            errors.append(exc)
+        finally:
+            generated.put(_GENERATION_FINISHED)
+
+    thread = threading.Thread(target=generate, daemon=True)
+    thread.start()
+
+    batch: list[EvaluationTestCase] = []
+    try:
+        while (item := generated.get()) is not _GENERATION_FINISHED:
+            batch.append(item)
+            if len(batch) >= min_batch_size and generated.empty():
+                yield batch
+                batch = []
+    finally:
+        stop.set()
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+    if batch:
+        yield batch
 
 
 def generate_inputs_to_evaluation_test_cases(
     claude_generation_model: str | None,
     generate_inputs: list[GenerateInput],
+    generation_config: GenerationConfig | None = None,
+    on_generated: Callable[[EvaluationTestCase], None] | None = None,
+    on_failed: Callable[[FailedGeneration], None] | None = None,
 ) -> list[EvaluationTestCase]:
     """Asynchronously run rake tasks for each GenerateInput instance to
     generate models that can be evaluated"""
@@ -69,5 +162,11 @@ def generate_inputs_to_evaluation_test_cases(
         )
 
     return asyncio.run(
-        generate_dataset(generate_inputs, generate_input_to_evaluation_test_case)
+        generate_dataset(
+            generate_inputs,
+            generate_input_to_evaluation_test_case,
+            config=generation_config,
+            on_generated=on_generated,
+            on_failed=on_failed,
+        )
     )
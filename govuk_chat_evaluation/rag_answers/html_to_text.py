@@ -0,0 +1,154 @@
+import re
+from html.parser import HTMLParser
+
+HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+BLOCKS = {
+    "address",
+    "article",
+    "aside",
+    "blockquote",
+    "br",
+    "dd",
+    "details",
+    "div",
+    "dl",
+    "dt",
+    "figcaption",
+    "figure",
+    "footer",
+    "header",
+    "hr",
+    "main",
+    "nav",
+    "p",
+    "pre",
+    "section",
+    "summary",
+}
+SKIPPED = {"head", "noscript", "script", "style", "svg", "template"}
+TAG = re.compile(r"</?[a-zA-Z][^>]*>")
+
+
+def html_to_text(html: str) -> str:
+    """Convert HTML to compact text for judge prompts. Headings are kept as
+    markdown headings, list items as bullets or numbers and table rows as
+    markdown table rows, while other markup is removed. The lines of <pre>
+    elements, and of text without any markup, are kept."""
+    converter = _TextConverter(preformatted=not TAG.search(html))
+    converter.feed(html)
+    converter.close()
+    return converter.text()
+
+
+class _TextConverter(HTMLParser):
+    def __init__(self, preformatted: bool = False):
+        super().__init__(convert_charrefs=True)
+        self._lines: list[str] = []
+        self._text: list[str] = []
+        self._prefix = ""
+        self._lists: list[tuple[str, int]] = []
+        self._row: list[str] | None = None
+        self._cell: list[str] = []
+        self._table_rows = 0
+        self._skipping = 0
+        self._preformatted = int(preformatted)
+
+    def text(self) -> str:
+        self._flush()
+        return "\n".join(self._lines)
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        if tag in SKIPPED:
+            self._skipping += 1
+        elif tag in HEADINGS:
+            self._flush()
+            self._prefix = "#" * HEADINGS[tag] + " "
+        elif tag in BLOCKS:
+            self._flush()
+        elif tag in ("ul", "ol"):
+            self._flush()
+            self._lists.append((tag, 0))
+        elif tag == "li":
+            self._flush()
+            self._prefix = self._list_item_prefix()
+        elif tag == "table":
+            self._flush()
+            self._table_rows = 0
+        elif tag == "tr":
+            self._flush()
+            self._row = []
+        elif tag in ("td", "th"):
+            # drop whitespace between cells
+            self._text = []
+            self._cell = []
+
+        if tag == "pre":
+            self._preformatted += 1
+
+    def handle_endtag(self, tag: str):
+        if tag in SKIPPED:
+            self._skipping = max(self._skipping - 1, 0)
+        elif tag in HEADINGS or tag == "li":
+            self._flush()
+            self._prefix = ""
+        elif tag in BLOCKS:
+            self._flush()
+        elif tag in ("ul", "ol"):
+            self._flush()
+            if self._lists:
+                self._lists.pop()
+        elif tag in ("td", "th") and self._row is not None:
+            self._flush()
+            self._row.append(" / ".join(self._cell))
+            self._cell = []
+        elif tag == "tr" and self._row is not None:
+            self._end_row()
+
+        if tag == "pre":
+            self._preformatted = max(self._preformatted - 1, 0)
+
+    def handle_data(self, data: str):
+        if not self._skipping:
+            self._text.append(data)
+
+    def _list_item_prefix(self) -> str:
+        if not self._lists:
+            return "- "
+
+        tag, count = self._lists[-1]
+        self._lists[-1] = (tag, count + 1)
+        indent = "  " * (len(self._lists) - 1)
+        return f"{indent}{count + 1}. " if tag == "ol" else f"{indent}- "
+
+    def _end_row(self):
+        row = self._row or []
+        self._row = None
+        if not any(row):
+            return
+
+        self._lines.append(f"| {' | '.join(row)} |")
+        if self._table_rows == 0:
+            self._lines.append(f"|{' --- |' * len(row)}")
+        self._table_rows += 1
+
+    def _take_text(self) -> str:
+        text = "".join(self._text)
+        self._text = []
+        # a table row has to stay on one line
+        if not self._preformatted or self._row is not None:
+            return " ".join(text.split())
+
+        lines = [re.sub(r"[ \t]+", " ", line).strip() for line in text.splitlines()]
+        return "\n".join(lines).strip("\n")
+
+    def _flush(self):
+        # blocks and line breaks within a table cell are kept apart on the
+        # cell's line
+        if self._row is not None:
+            if text := self._take_text():
+                self._cell.append(text)
+            return
+
+        if text := self._take_text():
+            self._lines.append(self._prefix + text)
+            self._prefix = ""
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import math
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from types import MethodType
+from typing import Any
+
+from deepeval.models.base_model import DeepEvalBaseLLM
+from pydantic import BaseModel
+
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# recent latencies kept for each prompt size
+LATENCY_SAMPLES = 200
+
+
+@dataclass(frozen=True)
+class HedgingPolicy:
+    """When to send a duplicate of a judge request that's taking too long"""
+
+    percentile: float = 95
+    max_hedge_rate: float = 0.05
+    min_samples: int = 20
+
+
+class JudgeHedger:
+    """Decides when to hedge requests to a judge model and records how hedging
+    went.
+
+    A request is hedged once it has taken longer than the policy's percentile
+    of recent latencies for prompts of a similar size, so long as no more
+    than max_hedge_rate of requests have been hedged. Prompts are grouped into
+    sizes by powers of two of their estimated tokens, and a size isn't hedged
+    until it has min_samples latencies."""
+
+    def __init__(self, policy: HedgingPolicy):
+        self.policy = policy
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.extra_cost = 0.0
+        self._latencies: defaultdict[int, deque[float]] = defaultdict(
+            lambda: deque(maxlen=LATENCY_SAMPLES)
+        )
+
+    def hedge_delay(self, tokens: int) -> float | None:
+        """Return how long to wait for a request before hedging it, or None if
+        there aren't enough latencies for its prompt size"""
+        latencies = sorted(self._latencies[tokens.bit_length()])
+        if len(latencies) < self.policy.min_samples:
+            return None
+
+        index = math.ceil(self.policy.percentile / 100 * len(latencies)) - 1
+        return latencies[index]
+
+    def record_latency(self, tokens: int, latency: float) -> None:
+        self._latencies[tokens.bit_length()].append(latency)
+
+    def try_hedge(self) -> bool:
+        """Count a hedge if it's within the hedge rate"""
+        if self.hedges + 1 > self.policy.max_hedge_rate * self.requests:
+            return False
+
+        self.hedges += 1
+        return True
+
+    def log_stats(self, judge: str) -> None:
+        if not self.requests:
+            return
+
+        logger.info(
+            f"Hedged {self.hedges} of {self.requests} requests to {judge} "
+            f"({self.hedges / self.requests:.1%}), the hedge returned first "
+            f"{self.hedge_wins} times, costing about ${self.extra_cost:.4f} extra"
+        )
+
+
+def attach_hedging_to_model[ModelT: DeepEvalBaseLLM](
+    model: ModelT,
+    hedger: JudgeHedger,
+) -> ModelT:
+    """Wrap model.a_generate to send a duplicate of a request that's slower
+    than the hedger allows, and return whichever response arrives first. The
+    extra cost of a hedge is taken to be the cost of the response used."""
+    original = model.a_generate
+
+    async def _hedged_a_generate(
+        self: DeepEvalBaseLLM,
+        prompt: str,
+        schema: type[BaseModel] | None = None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        hedger.requests += 1
+        tokens = estimate_tokens(str(prompt))
+        start_time = time.monotonic()
+        request = asyncio.ensure_future(original(prompt, schema, *args, **kwargs))
+        hedge: asyncio.Future[Any] | None = None
+        try:
+            delay = hedger.hedge_delay(tokens)
+            if delay is not None:
+                await asyncio.wait([request], timeout=delay)
+
+            if request.done() or delay is None or not hedger.try_hedge():
+                response = await request
+            else:
+                hedge = asyncio.ensure_future(original(prompt, schema, *args, **kwargs))
+                winner = await _first_successful(request, hedge)
+                response = winner.result()
+                if winner is hedge:
+                    hedger.hedge_wins += 1
+                cost = response[1] if isinstance(response, tuple) else None
+                if isinstance(cost, (int, float)):
+                    hedger.extra_cost += cost
+        finally:
+            # the slower of a hedged pair isn't needed, and neither is
+            # needed if the caller is cancelled
+            request.cancel()
+            if hedge is not None:
+                hedge.cancel()
+
+        # a request cancelled by its hedge took at least this long
+        hedger.record_latency(tokens, time.monotonic() - start_time)
+        return response
+
+    model.a_generate = MethodType(_hedged_a_generate, model)
+    return model
+
+
+async def _first_successful(
+    request: asyncio.Future[Any], hedge: asyncio.Future[Any]
+) -> asyncio.Future[Any]:
+    """Return the first of the request and hedge to succeed, or the request
+    if both fail"""
+    pending = {request, hedge}
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for future in (request, hedge):
+            if future in done and future.exception() is None:
+                return future
+
+    return request
@@ -0,0 +1,190 @@
+import logging
+import random
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from botocore.exceptions import BotoCoreError, ClientError  # type: ignore
+from deepeval.models.base_model import DeepEvalBaseLLM
+from deepeval.models.llms.amazon_bedrock_model import AmazonBedrockModel
+from pydantic import BaseModel
+
+from .judge_rate_limiter import is_throttling_error, unwrap_retry_error
+
+logger = logging.getLogger(__name__)
+
+# error codes from a region that's unable to serve requests for now, which are
+# sent to another region instead
+UNAVAILABLE_ERROR_CODES = {
+    "InternalServerException",
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+    "ServiceUnavailableException",
+}
+# weight given to the latest latency and outcome of a route's requests
+OBSERVATION_WEIGHT = 0.2
+# a route's weight is never reduced below this fraction by its errors, so a
+# route that failed can be tried again once it recovers
+MIN_SUCCESS_WEIGHT = 0.05
+
+
+@dataclass(frozen=True)
+class BedrockRoute:
+    """A Bedrock region to send judge requests to, optionally calling a
+    cross-region inference profile or a different endpoint"""
+
+    region: str
+    inference_profile: str | None = None
+    endpoint_url: str | None = None
+
+
+class _RouteStats:
+    def __init__(self):
+        self.latency: float | None = None
+        self.error_rate = 0.0
+        self.cooling_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def record_success(self, latency: float) -> None:
+        self.requests += 1
+        self.error_rate *= 1 - OBSERVATION_WEIGHT
+        self.latency = (
+            latency
+            if self.latency is None
+            else self.latency + (latency - self.latency) * OBSERVATION_WEIGHT
+        )
+
+    def record_failure(self) -> None:
+        self.requests += 1
+        self.failures += 1
+        self.error_rate += (1 - self.error_rate) * OBSERVATION_WEIGHT
+
+
+class LoadBalancedBedrockModel(AmazonBedrockModel):
+    """A judge that spreads requests over the same model in several Bedrock
+    regions or inference profiles, choosing each route with a weight that
+    favours lower observed latency and error rate.
+
+    A request that's throttled, or that the route is unable to serve, is sent
+    to another route, and a throttled route is left to cool down for
+    cooldown_seconds. The error is raised once every route has failed. Copies
+    of the model share its routes and their statistics.
+
+    It's an AmazonBedrockModel so that deepeval's metrics treat it as a native
+    model, which returns a (result, cost) tuple, although every request is
+    made by one of its routes."""
+
+    def __init__(
+        self,
+        model: str,
+        routes: Sequence[tuple[BedrockRoute, AmazonBedrockModel]],
+        cooldown_seconds: float = 10.0,
+    ):
+        if not routes:
+            raise ValueError("LoadBalancedBedrockModel needs at least one route")
+
+        self.routes = list(routes)
+        self.cooldown_seconds = cooldown_seconds
+        self._stats = [_RouteStats() for _ in self.routes]
+        # the routes have the clients and credentials, so AmazonBedrockModel's
+        # own set up isn't needed
+        DeepEvalBaseLLM.__init__(self, model)
+
+    def get_model_name(self) -> str:
+        assert self.name is not None
+        return self.name
+
+    def supports_structured_outputs(self) -> bool | None:
+        return self.routes[0][1].supports_structured_outputs()
+
+    def supports_json_mode(self) -> bool | None:
+        return self.routes[0][1].supports_json_mode()
+
+    def supports_temperature(self) -> bool | None:
+        return self.routes[0][1].supports_temperature()
+
+    def supports_multimodal(self) -> bool | None:
+        return self.routes[0][1].supports_multimodal()
+
+    def generate(self, prompt: str, schema: BaseModel | None = None, *args: Any) -> Any:
+        _, model = self.routes[self._choose_route(set())]
+        return model.generate(prompt, schema, *args)
+
+    async def a_generate(
+        self, prompt: str, schema: BaseModel | None = None, *args: Any
+    ) -> Any:
+        tried: set[int] = set()
+        while True:
+            index = self._choose_route(tried)
+            route, model = self.routes[index]
+            stats = self._stats[index]
+            start_time = time.monotonic()
+            try:
+                response = await model.a_generate(prompt, schema, *args)
+            except Exception as exc:
+                if not is_route_failure(exc):
+                    raise
+
+                stats.record_failure()
+                if is_throttling_error(exc):
+                    stats.cooling_until = time.monotonic() + self.cooldown_seconds
+
+                tried.add(index)
+                if len(tried) == len(self.routes):
+                    raise
+
+                logger.warning(
+                    f"LLM judge {self.name} failed in {route.region} "
+                    f"({exc.__class__.__name__}); trying another region"
+                )
+                continue
+
+            stats.record_success(time.monotonic() - start_time)
+            return response
+
+    def _choose_route(self, tried: set[int]) -> int:
+        untried = [index for index in range(len(self.routes)) if index not in tried]
+        now = time.monotonic()
+        available = [
+            index for index in untried if self._stats[index].cooling_until <= now
+        ]
+        # when every route is cooling down, the request still goes to one
+        candidates = available or untried
+
+        observed = [s.latency for s in self._stats if s.latency is not None]
+        # routes without a latency yet are assumed to be as quick as the
+        # average, so they're tried
+        default_latency = sum(observed) / len(observed) if observed else 1.0
+        weights = [
+            max(1 - self._stats[index].error_rate, MIN_SUCCESS_WEIGHT)
+            / max(self._stats[index].latency or default_latency, 0.001)
+            for index in candidates
+        ]
+
+        return random.choices(candidates, weights)[0]
+
+    async def close(self) -> None:
+        for _, model in self.routes:
+            await model.close()
+
+    def log_stats(self) -> None:
+        for (route, _), stats in zip(self.routes, self._stats):
+            latency = f"{stats.latency:.1f}s" if stats.latency is not None else "n/a"
+            logger.info(
+                f"LLM judge {self.name} in {route.region} handled "
+                f"{stats.requests} requests, {stats.failures} failed, with a "
+                f"recent latency of {latency}"
+            )
+
+
+def is_route_failure(exc: BaseException) -> bool:
+    exc = unwrap_retry_error(exc)
+    if is_throttling_error(exc) or isinstance(exc, BotoCoreError):
+        return True
+
+    if isinstance(exc, ClientError):
+        return exc.response.get("Error", {}).get("Code") in UNAVAILABLE_ERROR_CODES
+
+    return False
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import random
+import time
+from types import MethodType
+from typing import Any
+
+from botocore.exceptions import ClientError  # type: ignore
+from deepeval.models.base_model import DeepEvalBaseLLM
+from openai import RateLimitError
+from pydantic import BaseModel
+from tenacity import RetryError
+
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# error codes Bedrock returns when a request is over the account's quota
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceQuotaExceededException",
+}
+THROTTLED_ATTEMPTS = 6
+INITIAL_BACKOFF_SECONDS = 1.0
+# after throttling the rate is halved, down to this fraction of the budget,
+# then recovers by RATE_RECOVERY for each request that isn't throttled
+MIN_RATE_SCALE = 0.1
+RATE_RECOVERY = 0.05
+
+
+class _TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.available = per_minute
+        self._rate = per_minute / 60
+        self._updated = time.monotonic()
+
+    def refill(self, now: float, rate_scale: float) -> None:
+        elapsed = now - self._updated
+        self.available = min(
+            self.capacity, self.available + elapsed * self._rate * rate_scale
+        )
+        self._updated = now
+
+    def wait_for(self, amount: float, rate_scale: float) -> float:
+        shortfall = min(amount, self.capacity) - self.available
+        return max(shortfall, 0) / (self._rate * rate_scale)
+
+    def take(self, amount: float) -> None:
+        self.available -= min(amount, self.capacity)
+
+
+class JudgeRateLimiter:
+    """Keeps the requests to a judge model within budgets of requests and
+    prompt tokens per minute, using a token bucket for each.
+
+    When the judge throttles a request every caller pauses, for a backoff that
+    doubles up to max_backoff_seconds while the judge keeps throttling, and
+    the rate is halved then recovers as requests succeed. Prompt tokens are
+    estimated from the prompt's length."""
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        max_backoff_seconds: float = 60.0,
+    ):
+        self.max_backoff_seconds = max_backoff_seconds
+        self.throttled = 0
+        self.waited_seconds = 0.0
+        self._requests = (
+            _TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self._tokens = _TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._rate_scale = 1.0
+        self._backoff = INITIAL_BACKOFF_SECONDS
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until a request with this many prompt tokens is within budget"""
+        # the lock makes callers take their turn in the order they arrived
+        async with self._lock:
+            while (wait := self._wait_time(tokens)) > 0:
+                self.waited_seconds += wait
+                await asyncio.sleep(wait)
+
+            for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+                if bucket:
+                    bucket.take(amount)
+
+    def _wait_time(self, tokens: int) -> float:
+        now = time.monotonic()
+        wait = self._paused_until - now
+        for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+            if bucket:
+                bucket.refill(now, self._rate_scale)
+                wait = max(wait, bucket.wait_for(amount, self._rate_scale))
+
+        return wait
+
+    def record_success(self) -> None:
+        self._rate_scale = min(self._rate_scale + RATE_RECOVERY, 1.0)
+        if time.monotonic() >= self._paused_until:
+            self._backoff = INITIAL_BACKOFF_SECONDS
+
+    def record_throttling(self) -> float:
+        """Pause every request to the judge and return the pause in seconds"""
+        self.throttled += 1
+        now = time.monotonic()
+        # requests already in flight when the judge started throttling share
+        # the pause rather than each lengthening it
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        pause = self._backoff * random.uniform(0.5, 1.0)
+        self._paused_until = now + pause
+        self._backoff = min(self._backoff * 2, self.max_backoff_seconds)
+        self._rate_scale = max(self._rate_scale / 2, MIN_RATE_SCALE)
+        for bucket in (self._requests, self._tokens):
+            if bucket:
+                bucket.available = 0
+
+        return pause
+
+    def log_stats(self, judge: str) -> None:
+        if self.throttled or self.waited_seconds:
+            logger.info(
+                f"Rate limiter for {judge} waited {self.waited_seconds:.1f}s and "
+                f"was throttled {self.throttled} times"
+            )
+
+
+def is_throttling_error(exc: BaseException) -> bool:
+    exc = unwrap_retry_error(exc)
+    if isinstance(exc, RateLimitError):
+        return True
+
+    if isinstance(exc, ClientError):
+        return exc.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+    return False
+
+
+def unwrap_retry_error(exc: BaseException) -> BaseException:
+    """Return the error behind a RetryError, which deepeval's judges raise
+    once their own retries are used up"""
+    if isinstance(exc, RetryError) and (last_error := exc.last_attempt.exception()):
+        return last_error
+
+    return exc
+
+
+def attach_rate_limiter_to_model[ModelT: DeepEvalBaseLLM](
+    model: ModelT,
+    limiter: JudgeRateLimiter,
+    max_attempts: int = THROTTLED_ATTEMPTS,
+) -> ModelT:
+    """Wrap model.a_generate to wait for the limiter before each request, and
+    to back off and try again when the judge throttles a request."""
+    original = model.a_generate
+
+    async def _rate_limited_a_generate(
+        self: DeepEvalBaseLLM,
+        prompt: str,
+        schema: type[BaseModel] | None = None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        for attempt in range(max_attempts):
+            await limiter.acquire(estimate_tokens(str(prompt)))
+            try:
+                response = await original(prompt, schema, *args, **kwargs)
+            except Exception as exc:
+                if not is_throttling_error(exc):
+                    raise
+
+                pause = limiter.record_throttling()
+                if attempt == max_attempts - 1:
+                    raise
+
+                logger.warning(
+                    f"LLM judge {model.get_model_name()} throttled a request; "
+                    f"retrying in {pause:.1f}s"
+                )
+                continue
+
+            limiter.record_success()
+            return response
+
+    model.a_generate = MethodType(_rate_limited_a_generate, model)
+    return model
@@ -0,0 +1,182 @@
+import asyncio
+import copy
+from collections.abc import AsyncIterator, Callable, Hashable, Mapping, Sequence
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any
+
+from deepeval.constants import ProviderSlug
+from deepeval.models.base_model import DeepEvalBaseLLM
+from deepeval.models.llms.amazon_bedrock_model import AmazonBedrockModel
+from deepeval.models.retry_policy import sdk_retries_for
+
+from .judge_hedging import HedgingPolicy, JudgeHedger
+from .judge_load_balancer import BedrockRoute, LoadBalancedBedrockModel
+from .judge_rate_limiter import JudgeRateLimiter
+
+
+class PooledAmazonBedrockModel(AmazonBedrockModel):
+    """An AmazonBedrockModel that keeps one Bedrock runtime client open, with a
+    pool of up to max_pool_connections connections, rather than creating a
+    client and connecting again for every request. Copies of the model share
+    the client, which is closed by close().
+
+    inference_profile is the model ID to call instead of model, such as a
+    cross-region inference profile, which is priced as model."""
+
+    def __init__(
+        self,
+        *args: Any,
+        max_pool_connections: int = 10,
+        inference_profile: str | None = None,
+        **kwargs: Any,
+    ):
+        super().__init__(*args, **kwargs)
+        self.max_pool_connections = max_pool_connections
+        self.inference_profile = inference_profile
+        if inference_profile:
+            self.name = inference_profile
+        self._shared_client = _SharedClient()
+
+    @asynccontextmanager
+    async def _get_client(self) -> AsyncIterator[Any]:
+        yield await self._shared_client.get(self._open_client)
+
+    async def _open_client(self, stack: AsyncExitStack) -> Any:
+        # as AmazonBedrockModel._get_client, with a sized connection pool
+        use_sdk_retries = sdk_retries_for(ProviderSlug.BEDROCK)
+        retries: dict[str, Any] = {"max_attempts": 5 if use_sdk_retries else 1}
+        if use_sdk_retries:
+            retries["mode"] = "adaptive"
+
+        client_kwargs = {
+            "region_name": self.region,
+            "config": self.botocore_module.config.Config(
+                retries=retries, max_pool_connections=self.max_pool_connections
+            ),
+            **self.kwargs,
+        }
+        for name in ("aws_access_key_id", "aws_secret_access_key", "aws_session_token"):
+            if (secret := getattr(self, name)) is not None:
+                client_kwargs[name] = secret.get_secret_value()
+
+        return await stack.enter_async_context(
+            self._session.create_client("bedrock-runtime", **client_kwargs)
+        )
+
+    async def close(self) -> None:
+        await self._shared_client.close()
+
+
+class _SharedClient:
+    """A client that's opened by the first request that needs it and reused
+    by later requests in the same event loop"""
+
+    def __init__(self):
+        self._client: Any = None
+        self._stack: AsyncExitStack | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+
+    async def get(self, open_client: Callable[[AsyncExitStack], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # clients and locks can't be used outside the event loop they were
+            # created in
+            self._client = None
+            self._loop = loop
+            self._lock = asyncio.Lock()
+
+        if self._client is None:
+            assert self._lock is not None
+            async with self._lock:
+                if self._client is None:
+                    self._stack = AsyncExitStack()
+                    self._client = await open_client(self._stack)
+
+        return self._client
+
+    async def close(self) -> None:
+        if self._stack is not None and self._loop is asyncio.get_running_loop():
+            await self._stack.aclose()
+
+        self._client = None
+        self._stack = None
+        self._loop = None
+
+
+class JudgeRegistry:
+    """Hands out LLM judges so that every metric using the same judge model,
+    temperature and region shares one judge and its client, rather than each
+    metric of each run creating its own.
+
+    Each metric is given a shallow copy of the shared judge, so wrappers such
+    as a response cache can be attached for one metric without affecting the
+    others. Bedrock judges pool up to max_pool_connections connections.
+
+    rate_limiters are keyed on the judge model and region, or None for a
+    limiter that applies in every region without one of its own. Every judge
+    waits for its rate limiter and backs off when it's throttled.
+
+    Bedrock judge models with routes are balanced across those regions rather
+    than using a single region. With a hedging policy every judge of a model
+    shares a hedger, which sends duplicates of its slowest requests."""
+
+    def __init__(
+        self,
+        max_pool_connections: int = 10,
+        rate_limiters: Mapping[tuple[str, str | None], JudgeRateLimiter] | None = None,
+        routes: Mapping[str, Sequence[BedrockRoute]] | None = None,
+        hedging: HedgingPolicy | None = None,
+    ):
+        self.max_pool_connections = max_pool_connections
+        self.rate_limiters = dict(rate_limiters or {})
+        self.routes = dict(routes or {})
+        self.hedging = hedging
+        self._hedgers: dict[str, JudgeHedger] = {}
+        self._judges: dict[Hashable, DeepEvalBaseLLM] = {}
+
+    def get[ModelT: DeepEvalBaseLLM](
+        self, key: Hashable, create: Callable[[], ModelT]
+    ) -> ModelT:
+        """Return a copy of the judge for key, which is created the first time
+        it's needed"""
+        if key not in self._judges:
+            self._judges[key] = create()
+
+        return copy.copy(self._judges[key])  # pyright: ignore[reportReturnType]
+
+    def rate_limiter(self, model: str, region: str | None) -> JudgeRateLimiter:
+        """Return the rate limiter shared by every judge of model in region,
+        or in every region for None. Without a configured one, the judges
+        share a limiter that only backs off when they're throttled."""
+        for key in ((model, region), (model, None)):
+            if key in self.rate_limiters:
+                return self.rate_limiters[key]
+
+        return self.rate_limiters.setdefault((model, region), JudgeRateLimiter())
+
+    def hedger(self, model: str) -> JudgeHedger | None:
+        """Return the hedger shared by every judge of model, or None if
+        requests aren't hedged"""
+        if self.hedging is None:
+            return None
+
+        if model not in self._hedgers:
+            self._hedgers[model] = JudgeHedger(self.hedging)
+
+        return self._hedgers[model]
+
+    async def close(self) -> None:
+        for (model, region), limiter in self.rate_limiters.items():
+            limiter.log_stats(f"{model} in {region or 'every region'}")
+
+        for model, hedger in self._hedgers.items():
+            hedger.log_stats(model)
+
+        for judge in self._judges.values():
+            if isinstance(judge, LoadBalancedBedrockModel):
+                judge.log_stats()
+            if isinstance(judge, (PooledAmazonBedrockModel, LoadBalancedBedrockModel)):
+                await judge.close()
+
+        self._judges.clear()
@@ -0,0 +1,109 @@
+import logging
+from pathlib import Path
+from types import MethodType, TracebackType
+from typing import Any, Self
+
+from deepeval.models.base_model import DeepEvalBaseLLM
+from pydantic import BaseModel
+
+from ..file_cache import CACHE_MISS, FileCache, content_key
+
+logger = logging.getLogger(__name__)
+
+
+class JudgeResponseCache(FileCache):
+    """A cache of LLM judge responses stored as files on disk, keyed on the
+    prompt, judge model, temperature and response schema.
+
+    When run is given it's part of the key, so each run of an evaluation with
+    n_runs reuses only its own earlier responses and the runs remain independent
+    samples. On exit the least recently used entries are evicted until the cache
+    is within max_size_bytes and the hits and misses are logged."""
+
+    description = "judge response cache"
+
+    def __init__(self, path: Path, max_size_bytes: int, run: int | None = None):
+        super().__init__(path, max_size_bytes)
+        self.run = run
+
+    def __enter__(self) -> Self:
+        self.path.mkdir(parents=True, exist_ok=True)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.evict()
+        self.log_stats()
+
+    def key(
+        self,
+        prompt: str,
+        model_name: str,
+        temperature: float,
+        schema: type[BaseModel] | None,
+    ) -> str:
+        return content_key(
+            {
+                "prompt": prompt,
+                "model": model_name,
+                "temperature": temperature,
+                "schema": schema and schema.model_json_schema(),
+                "run": self.run,
+            }
+        )
+
+
+def attach_judge_response_cache_to_model[ModelT: DeepEvalBaseLLM](
+    model: ModelT,
+    cache: JudgeResponseCache,
+    temperature: float,
+) -> ModelT:
+    """Wrap model.a_generate to return cached responses for prompts it has
+    already been given. A cached response has no cost."""
+    original = model.a_generate
+    model_name = model.get_model_name()
+
+    async def _caching_a_generate(
+        self: DeepEvalBaseLLM,
+        prompt: str,
+        schema: type[BaseModel] | None = None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        # multimodal prompts and extra arguments aren't part of the key
+        if not isinstance(prompt, str) or args or kwargs:
+            return await original(prompt, schema, *args, **kwargs)
+
+        key = cache.key(prompt, model_name, temperature, schema)
+        cached = cache.get(key)
+        if cached is not CACHE_MISS:
+            return _response_from_cache(cached, schema)
+
+        response = await original(prompt, schema)
+        cache.set(key, _response_to_cache(response))
+        return response
+
+    model.a_generate = MethodType(_caching_a_generate, model)
+    return model
+
+
+def _response_to_cache(response: Any) -> dict[str, Any]:
+    # native deepeval models return an (output, cost) tuple
+    with_cost = isinstance(response, tuple)
+    output = response[0] if with_cost else response
+    if isinstance(output, BaseModel):
+        output = output.model_dump(mode="json")
+
+    return {"output": output, "with_cost": with_cost}
+
+
+def _response_from_cache(cached: dict[str, Any], schema: type[BaseModel] | None):
+    output = cached["output"]
+    if schema is not None:
+        output = schema.model_validate(output)
+
+    return (output, 0.0) if cached["with_cost"] else output
@@ -0,0 +1,9 @@
+import math
+
+# a rough count of characters per token for English text, good enough to
+# compare prompt sizes without a model's tokeniser
+CHARACTERS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARACTERS_PER_TOKEN)
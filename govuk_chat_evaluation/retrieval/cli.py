@@ -3,7 +3,12 @@ from pathlib import Path
 
 import click
 
-from ..config import BaseConfig, apply_click_options_to_command, config_from_cli_args
+from ..config import (
+    BaseConfig,
+    GenerationConfig,
+    apply_click_options_to_command,
+    config_from_cli_args,
+)
 from ..file_system import create_output_directory, write_config_file_for_reuse
 from .evaluate import evaluate_and_output_results
 from .generate import generate_and_write_dataset
@@ -13,6 +18,9 @@ class Config(BaseConfig):
     what: BaseConfig.GenericFields.what
     generate: BaseConfig.GenericFields.generate
     input_path: BaseConfig.GenericFields.input_path
+    generation: BaseConfig.GenericFields.generation = GenerationConfig()
+    resume: BaseConfig.GenericFields.resume = None
+    shard: BaseConfig.GenericFields.shard = None
 
 
 @click.command(name="retrieval")
@@ -35,7 +43,13 @@ def main(**cli_args):
     output_dir = create_output_directory("retrieval", start_time)
 
     if config.generate:
-        evaluate_path = generate_and_write_dataset(config.input_path, output_dir)
+        evaluate_path = generate_and_write_dataset(
+            config.input_path,
+            output_dir,
+            generation_config=config.generation,
+            resume_dir=config.resume,
+            shard=config.shard,
+        )
     else:
         evaluate_path = config.input_path
 
@@ -1,10 +1,18 @@
 import asyncio
+from collections.abc import Callable
+from functools import partial
 from pathlib import Path
 
 from pydantic import BaseModel
 
-from ..dataset_generation import generate_dataset, run_rake_task
-from ..file_system import jsonl_to_models, write_generated_to_output
+from ..config import GenerationConfig, Shard
+from ..dataset_generation import (
+    FailedGeneration,
+    generate_and_write_outputs,
+    generate_dataset,
+    run_rake_task,
+)
+from ..file_system import jsonl_to_models
 from .evaluate import EvaluationResult, SearchResult
 
 
@@ -15,14 +23,31 @@ class GenerateInput(BaseModel):
     expected_opensearch_index: str | None = None
 
 
-def generate_and_write_dataset(input_path: Path, output_dir: Path):
+def generate_and_write_dataset(
+    input_path: Path,
+    output_dir: Path,
+    generation_config: GenerationConfig | None = None,
+    resume_dir: Path | None = None,
+    shard: Shard | None = None,
+):
     models = jsonl_to_models(Path(input_path), GenerateInput)
-    generated = generate_inputs_to_evaluation_results(models)
-    return write_generated_to_output(output_dir, generated)
+    return generate_and_write_outputs(
+        models,
+        partial(
+            generate_inputs_to_evaluation_results, generation_config=generation_config
+        ),
+        output_dir,
+        resume_key="question",
+        resume_dir=resume_dir,
+        shard=shard,
+    )
 
 
 def generate_inputs_to_evaluation_results(
     generate_inputs: list[GenerateInput],
+    generation_config: GenerationConfig | None = None,
+    on_generated: Callable[[EvaluationResult], None] | None = None,
+    on_failed: Callable[[FailedGeneration], None] | None = None,
 ) -> list[EvaluationResult]:
     """Asynchronously run rake tasks for each GenerateInput instance to
     generate a result"""
@@ -58,5 +83,11 @@ def generate_inputs_to_evaluation_results(
         )
 
     return asyncio.run(
-        generate_dataset(generate_inputs, generate_input_to_evaluation_result)
+        generate_dataset(
+            generate_inputs,
+            generate_input_to_evaluation_result,
+            config=generation_config,
+            on_generated=on_generated,
+            on_failed=on_failed,
+        )
     )
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+StoreKey = tuple[Any, ...]
+
+
+class SQLiteStore:
+    """A store of pydantic models in a SQLite table, with a row for each key
+    made of the key_columns.
+
+    Without a path the store is held in memory and lasts as long as the object.
+    With a path entries persist between runs. Entries older than ttl_seconds
+    are misses, and on exit they're removed, then the least recently used until
+    there are no more than max_entries."""
+
+    description = "store"
+    table: str
+    # the name and SQLite type of each column in the key
+    key_columns: tuple[tuple[str, str], ...]
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._in_flight: dict[StoreKey, asyncio.Event] = {}
+
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            path or ":memory:", timeout=30, check_same_thread=False
+        )
+        columns = [f"{name} {type} NOT NULL" for name, type in self.key_columns]
+        with self._connection:
+            self._connection.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    {", ".join(columns)},
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    used_at REAL NOT NULL,
+                    PRIMARY KEY ({", ".join(name for name, _ in self.key_columns)})
+                )
+                """
+            )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.evict()
+        self._connection.close()
+
+    def _get[ModelT: BaseModel](
+        self, key: StoreKey, schema: type[ModelT]
+    ) -> ModelT | None:
+        now = time.time()
+        with self._connection:
+            row = self._connection.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE {self._where_key}",
+                key,
+            ).fetchone()
+
+            if row and self._expired(row[1], now):
+                self._connection.execute(
+                    f"DELETE FROM {self.table} WHERE {self._where_key}", key
+                )
+                self.evictions += 1
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._connection.execute(
+                f"UPDATE {self.table} SET used_at = ? WHERE {self._where_key}",
+                (now, *key),
+            )
+
+        self.hits += 1
+        return schema.model_validate_json(row[0])
+
+    def _set(self, key: StoreKey, value: BaseModel) -> None:
+        now = time.time()
+        placeholders = ", ".join("?" * (len(key) + 3))
+        with self._connection:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES ({placeholders})",
+                (*key, value.model_dump_json(), now, now),
+            )
+
+    async def _get_or_create[ModelT: BaseModel](
+        self,
+        key: StoreKey,
+        schema: type[ModelT],
+        create: Callable[[], Awaitable[ModelT | None]],
+    ) -> tuple[ModelT | None, bool]:
+        """Return the stored value, otherwise the result of create which is
+        stored unless it's None. Concurrent calls for the same key wait for the
+        first caller's value rather than creating their own, and create again
+        if it isn't stored. Returns whether the value came from the store."""
+        while (in_flight := self._in_flight.get(key)) is not None:
+            await in_flight.wait()
+
+        if (stored := self._get(key, schema)) is not None:
+            return stored, True
+
+        self._in_flight[key] = asyncio.Event()
+        try:
+            value = await create()
+            if value is not None:
+                self._set(key, value)
+            return value, False
+        finally:
+            self._in_flight.pop(key).set()
+
+    def evict(self) -> None:
+        evicted = 0
+        with self._connection:
+            if self.ttl_seconds is not None:
+                evicted += self._connection.execute(
+                    f"DELETE FROM {self.table} WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,),
+                ).rowcount
+
+            if self.max_entries is not None:
+                evicted += self._connection.execute(
+                    f"""
+                    DELETE FROM {self.table} WHERE rowid IN (
+                        SELECT rowid FROM {self.table}
+                        ORDER BY used_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,),
+                ).rowcount
+
+        if evicted:
+            self.evictions += evicted
+            logger.info(f"Evicted {evicted} entries from the {self.description}")
+
+    def log_stats(self) -> None:
+        logger.info(
+            f"{self.description.capitalize()} had {self.hits} hits and "
+            f"{self.misses} misses"
+        )
+
+    @property
+    def _where_key(self) -> str:
+        return " AND ".join(f"{name} = ?" for name, _ in self.key_columns)
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and created_at < now - self.ttl_seconds
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""Measure the throughput of generate_dataset against the fake GOV.UK Chat rake
+tasks in scripts/fake_govuk_chat_rake.py, at a range of concurrency levels.
+
+    uv run scripts/benchmark_generation.py --concurrency 1 --concurrency 10
+
+Reports items per second, p50/p95/p99 item latency and peak memory of this
+process and of its largest child process for each level. Peak memory only
+grows during a run, so levels are best compared by running them separately.
+"""
+
+import asyncio
+import math
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import click
+from tabulate import tabulate
+
+from govuk_chat_evaluation.config import GenerationConfig
+from govuk_chat_evaluation.dataset_generation import generate_dataset, run_rake_task
+
+FAKE_RAKE_SCRIPT = Path(__file__).parent / "fake_govuk_chat_rake.py"
+RAKE_TASK = "evaluation:generate_rag_structured_answer_response"
+
+
+def percentile(values: list[float], p: int) -> float:
+    values = sorted(values)
+    return values[math.ceil(p / 100 * len(values)) - 1]
+
+
+def peak_rss_mb(who: int) -> float:
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(who).ru_maxrss / scale
+
+
+async def run_benchmark(items: int, config: GenerationConfig) -> dict:
+    latencies: list[float] = []
+    failures = 0
+
+    async def generate(item: int):
+        start_time = time.perf_counter()
+        result = await run_rake_task(RAKE_TASK, {"INPUT": f"Question {item}"})
+        latencies.append(time.perf_counter() - start_time)
+        return result
+
+    def record_failure(_failure):
+        nonlocal failures
+        failures += 1
+
+    start_time = time.perf_counter()
+    await generate_dataset(
+        list(range(items)),
+        generate,
+        max_concurrent=config.max_concurrent,
+        config=config,
+        on_generated=lambda _result: None,
+        on_failed=record_failure,
+    )
+    duration = time.perf_counter() - start_time
+
+    return {
+        "items/s": len(latencies) / duration,
+        "p50 (s)": percentile(latencies, 50) if latencies else None,
+        "p95 (s)": percentile(latencies, 95) if latencies else None,
+        "p99 (s)": percentile(latencies, 99) if latencies else None,
+        "failed": failures,
+        "peak RSS (MB)": peak_rss_mb(resource.RUSAGE_SELF),
+        "peak child RSS (MB)": peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+@click.command()
+@click.option("--items", default=200, help="Number of items to generate per level")
+@click.option(
+    "--concurrency",
+    "concurrency_levels",
+    multiple=True,
+    type=int,
+    default=[1, 5, 10, 20],
+    help="Concurrency level to measure, can be given multiple times",
+)
+@click.option(
+    "--mode",
+    type=click.Choice(["process", "workers", "batch"]),
+    default="process",
+    help=(
+        "Run a rake process per item, a pool of workers sized to the "
+        "concurrency or batches of --batch_size items"
+    ),
+)
+@click.option("--batch_size", default=10, help="Items per process in batch mode")
+@click.option("--latency", default=0.5, help="Median seconds per item")
+@click.option("--latency_sigma", default=0.5, help="Spread of the latency")
+@click.option("--error_rate", default=0.0, help="Proportion of items that fail")
+@click.option("--payload_bytes", default=2000, help="Size of generated answers")
+@click.option("--startup", default=0.0, help="Seconds for each process to boot")
+def main(
+    items: int,
+    concurrency_levels: tuple[int, ...],
+    mode: str,
+    batch_size: int,
+    latency: float,
+    latency_sigma: float,
+    error_rate: float,
+    payload_bytes: int,
+    startup: float,
+):
+    """Benchmark data generation against a fake GOV.UK Chat"""
+    os.environ.update(
+        {
+            "GOVUK_CHAT_RAKE_COMMAND": f"{sys.executable} {FAKE_RAKE_SCRIPT}",
+            "GOVUK_CHAT_DIR": tempfile.gettempdir(),
+            "FAKE_RAKE_STARTUP_SECONDS": str(startup),
+            "FAKE_RAKE_LATENCY_SECONDS": str(latency),
+            "FAKE_RAKE_LATENCY_SIGMA": str(latency_sigma),
+            "FAKE_RAKE_ERROR_RATE": str(error_rate),
+            "FAKE_RAKE_PAYLOAD_BYTES": str(payload_bytes),
+        }
+    )
+
+    rows = []
+    for concurrency in concurrency_levels:
+        config = GenerationConfig(
+            min_concurrent=concurrency,
+            max_concurrent=concurrency,
+            max_attempts=1,
+            workers=concurrency if mode == "workers" else None,
+            batch_size=batch_size if mode == "batch" else None,
+        )
+        result = asyncio.run(run_benchmark(items, config))
+        rows.append({"concurrency": concurrency} | result)
+
+    click.echo(tabulate(rows, headers="keys", floatfmt=".2f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""A stand-in for the GOV.UK Chat `bundle exec rake evaluation:*` tasks, for
+measuring the generation path without a running GOV.UK Chat. Use it by setting:
+
+    GOVUK_CHAT_RAKE_COMMAND="python scripts/fake_govuk_chat_rake.py"
+
+It outputs the JSON each task's generate.py module expects and supports single
+items (INPUT), batches (INPUT_PATH) and the evaluation:worker protocol. Its
+behaviour is configured with environment variables:
+
+    FAKE_RAKE_STARTUP_SECONDS  time taken to boot, as Rails would (default 0)
+    FAKE_RAKE_LATENCY_SECONDS  median time taken per item (default 1)
+    FAKE_RAKE_LATENCY_SIGMA    spread of the log-normal latency distribution,
+                               larger values give a longer tail (default 0.5)
+    FAKE_RAKE_ERROR_RATE       proportion of items that fail (default 0)
+    FAKE_RAKE_PAYLOAD_BYTES    size of generated answers and content
+                               (default 2000)
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+MODEL = "fake-model"
+
+
+def env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+def simulate_work() -> None:
+    median = env_float("FAKE_RAKE_LATENCY_SECONDS", 1)
+    sigma = env_float("FAKE_RAKE_LATENCY_SIGMA", 0.5)
+    if median > 0:
+        time.sleep(random.lognormvariate(0, sigma) * median)
+
+    if random.random() < env_float("FAKE_RAKE_ERROR_RATE", 0):
+        raise RuntimeError("Simulated failure")
+
+
+def payload() -> str:
+    return "x" * int(env_float("FAKE_RAKE_PAYLOAD_BYTES", 2000))
+
+
+def build_response(task: str, env: dict[str, str]) -> dict:
+    name, _, argument = task.removeprefix("evaluation:").partition("[")
+    argument = argument.rstrip("]")
+    opensearch_index = env.get("OPENSEARCH_INDEX", "chunks")
+
+    match name:
+        case "generate_jailbreak_guardrail_response":
+            return {
+                "jailbreak_guardrails_status": "pass",
+                "llm_responses": "{}",
+                "metrics": {"jailbreak_guardrails": {"model": MODEL}},
+            }
+        case "generate_output_guardrail_response":
+            return {
+                f"{argument}_failures": [],
+                "metrics": {argument: {"model": MODEL}},
+            }
+        case "generate_question_routing_response":
+            return {
+                "question_routing_label": "genuine_rag",
+                "question_routing_confidence_score": 0.9,
+                "message": None,
+                "metrics": {"question_routing": {"model": MODEL}},
+            }
+        case "generate_rag_structured_answer_response":
+            return {
+                "message": payload(),
+                "sources": [
+                    {
+                        "used": True,
+                        "chunk": {
+                            "title": "Title",
+                            "heading_hierarchy": ["Heading"],
+                            "description": None,
+                            "html_content": f"<p>{payload()}</p>",
+                            "exact_path": "/page#heading",
+                            "base_path": "/page",
+                        },
+                    }
+                ],
+                "opensearch_index": opensearch_index,
+                "metrics": {"structured_answer": {"model": MODEL}},
+            }
+        case "search_results_for_question":
+            return {
+                "opensearch_index": opensearch_index,
+                "results": [
+                    {
+                        "exact_path": "/page#heading",
+                        "chunk_uid": "chunk-uid",
+                        "weighted_score": 1.0,
+                        "score": 0.9,
+                    }
+                ],
+            }
+        case "generate_topics_for_question":
+            return {
+                "primary_topic": "benefits",
+                "secondary_topic": None,
+                "status": "success",
+                "error_message": None,
+                "metrics": {"model": MODEL},
+            }
+        case _:
+            raise ValueError(f"Unknown rake task {task}")
+
+
+def run_worker() -> None:
+    for line in sys.stdin:
+        request = json.loads(line)
+        try:
+            simulate_work()
+            response = {"result": build_response(request["task"], request["env"])}
+        # Deliberately broad: a worker reports errors rather than exiting
+        except Exception as exc:  # noqa: BLE001
+            response = {"error": str(exc)}
+
+        print(json.dumps(response), flush=True)
+
+
+def main() -> None:
+    task = sys.argv[1]
+    time.sleep(env_float("FAKE_RAKE_STARTUP_SECONDS", 0))
+
+    if task == "evaluation:worker":
+        run_worker()
+    elif input_path := os.environ.get("INPUT_PATH"):
+        with open(input_path, "r", encoding="utf8") as file:
+            for line in file:
+                simulate_work()
+                print(json.dumps(build_response(task, json.loads(line))))
+    else:
+        simulate_work()
+        print(json.dumps(build_response(task, dict(os.environ))))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    # Deliberately broad: rake reports errors on stderr with a non-zero exit
+    except Exception as exc:  # noqa: BLE001
+        print(exc, file=sys.stderr)
+        sys.exit(1)
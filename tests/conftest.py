@@ -36,6 +36,21 @@ def mock_or_use_openai_api_key(monkeypatch):
     monkeypatch.setenv("OPENAI_API_KEY", "fake-api-key-for-testing")
 
 
+def stream_generated(results: list) -> Callable:
+    """Side effect for mocking a generate_inputs_to_* function that hands its
+    results to the on_generated callback, as the real functions do"""
+
+    def side_effect(*_args, on_generated=None, **_kwargs):
+        if on_generated is None:
+            return results
+
+        for result in results:
+            on_generated(result)
+        return []
+
+    return side_effect
+
+
 def assert_csv_exists_with_headers(file_path: Path, *expected_headers: str):
     assert file_path.exists()
     with open(file_path, "r") as file:
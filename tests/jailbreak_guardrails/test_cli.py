@@ -5,6 +5,7 @@ from click.testing import CliRunner
 from govuk_chat_evaluation.file_system import OUTPUT_DIR_TIME_FORMAT
 from govuk_chat_evaluation.jailbreak_guardrails.cli import main
 from govuk_chat_evaluation.jailbreak_guardrails.evaluate import EvaluationResult
+from tests.conftest import stream_generated
 
 
 @pytest.fixture(autouse=True)
@@ -42,7 +43,7 @@ def mock_data_generation(mocker):
 
     return mocker.patch(
         "govuk_chat_evaluation.jailbreak_guardrails.generate.generate_inputs_to_evaluation_results",
-        return_value=return_value,
+        side_effect=stream_generated(return_value),
     )
 
 
@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock
 
 import pytest
 
+from govuk_chat_evaluation.config import GenerationConfig, Shard
 from govuk_chat_evaluation.question_router.generate import (
     EvaluationResult,
     GenerateInput,
@@ -119,3 +120,37 @@ def test_generate_and_write_dataset(mock_input_data, mock_project_root):
     with open(path, "r") as file:
         for line in file:
             assert json.loads(line)
+
+
+def test_generate_and_write_dataset_writes_failed_items(
+    mock_input_data, mock_project_root, run_rake_task_mock
+):
+    run_rake_task_mock.side_effect = RuntimeError("Contrived failure")
+
+    path = generate_and_write_dataset(
+        mock_input_data,
+        None,
+        mock_project_root,
+        generation_config=GenerationConfig(max_attempts=1),
+    )
+
+    assert path.read_text() == ""
+    failed = [
+        json.loads(line)
+        for line in (mock_project_root / "failed.jsonl").read_text().splitlines()
+    ]
+    assert len(failed) == len(mock_input_data.read_text().splitlines())
+    assert failed[0]["error"] == "RuntimeError('Contrived failure')"
+    assert failed[0]["attempts"] == 1
+    assert "question" in failed[0]["input"]
+
+
+def test_generate_and_write_dataset_only_generates_shard(
+    mock_input_data, mock_project_root, run_rake_task_mock
+):
+    generate_and_write_dataset(
+        mock_input_data, None, mock_project_root, shard=Shard(2, 2)
+    )
+
+    assert run_rake_task_mock.call_count == 1
+    assert run_rake_task_mock.call_args[0][1]["INPUT"] == "Question 2"
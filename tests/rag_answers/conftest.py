@@ -2,13 +2,11 @@ import json
 
 import pytest
 import yaml
-from deepeval.evaluate.types import (
-    EvaluationResult as DeepevalEvaluationResult,
-)
 from deepeval.evaluate.types import (
     TestResult as DeepevalTestResult,
 )
 from deepeval.test_run import MetricData
+from deepeval.test_run.api import LLMApiTestCase
 
 
 @pytest.fixture
@@ -115,14 +113,29 @@ def mock_deepeval_results():
 
 
 @pytest.fixture
-def mock_deepeval_evaluate(mocker, mock_deepeval_results):
-    wrapped_results = [
-        DeepevalEvaluationResult(
-            test_results=result, confident_link=None, test_run_id=None
-        )
-        for result in mock_deepeval_results
-    ]
+def mock_evaluate_test_cases(mocker, mock_deepeval_results):
+    # return the API test cases of a group of results for each run
+    async def evaluate_test_cases(cases, run_metrics, **kwargs):
+        return [
+            [
+                LLMApiTestCase(
+                    name=result.name,
+                    input=result.input,
+                    actualOutput=result.actual_output,
+                    expectedOutput=result.expected_output,
+                    retrievalContext=result.retrieval_context,
+                    success=result.success,
+                    metricsData=result.metrics_data,
+                    runDuration=0,
+                    order=index,
+                    metadata=result.metadata,
+                )  # pyright: ignore[reportCallIssue]
+                for index, result in enumerate(results)
+            ]
+            for results in mock_deepeval_results[: len(run_metrics)]
+        ]
+
     return mocker.patch(
-        "govuk_chat_evaluation.rag_answers.deepeval_evaluate.deepeval_evaluate",
-        side_effect=wrapped_results,  # using side effects to return a group per execution
+        "govuk_chat_evaluation.rag_answers.deepeval_evaluate.evaluate_test_cases",
+        side_effect=evaluate_test_cases,
     )
@@ -1,3 +1,4 @@
+import asyncio
 import json
 from unittest.mock import AsyncMock, Mock, patch
 
@@ -7,6 +8,7 @@ from deepeval.models import DeepEvalBaseLLM, GPTModel
 from deepeval.test_case import LLMTestCase
 from deepeval.utils import prettify_list
 
+from govuk_chat_evaluation.rag_answers.custom_deepeval.metrics import ArtefactStore
 from govuk_chat_evaluation.rag_answers.custom_deepeval.metrics.absence_of_factual_contradictions.absence_of_factual_contradictions import (
     AbsenceOfFactualContradictions,
 )
@@ -177,6 +179,70 @@ class TestAbsenceOfFactualContradictions:
             # 2 verdicts: 1 yes, 1 no => score = 1 / 2 = 0.5
             assert score == 0.5
 
+        @pytest.mark.asyncio
+        async def test_generates_truths_and_claims_concurrently(
+            self,
+            mock_native_model,
+            mock_test_case,
+            sample_truths,
+            sample_claims,
+            sample_verdicts,
+            sample_reason,
+        ):
+            responses = {
+                type(response): response
+                for response in [
+                    sample_truths,
+                    sample_claims,
+                    sample_verdicts,
+                    sample_reason,
+                ]
+            }
+            started = 0
+            both_started = asyncio.Event()
+
+            async def a_generate(prompt, schema):
+                nonlocal started
+                started += 1
+                if started == 2:
+                    both_started.set()
+                # the first two prompts only return once both are in flight
+                await asyncio.wait_for(both_started.wait(), timeout=1)
+                return responses[schema], 0.1
+
+            mock_native_model.a_generate.side_effect = a_generate
+            metric = AbsenceOfFactualContradictions(model=mock_native_model)
+
+            assert await metric.a_measure(mock_test_case) == 0.5
+            assert mock_native_model.a_generate.call_count == 4
+
+        @pytest.mark.asyncio
+        async def test_reuses_truths_and_claims_from_artefact_store(
+            self,
+            mock_native_model,
+            mock_test_case,
+            sample_truths,
+            sample_claims,
+            sample_verdicts,
+            sample_reason,
+        ):
+            mock_native_model.a_generate.side_effect = [
+                (sample_truths, 0.1),
+                (sample_claims, 0.1),
+                (sample_verdicts, 0.1),
+                (sample_reason, 0.1),
+                (sample_verdicts, 0.1),
+                (sample_reason, 0.1),
+            ]
+            artefact_store = ArtefactStore()
+            for _ in range(2):
+                metric = AbsenceOfFactualContradictions(
+                    model=mock_native_model, artefact_store=artefact_store
+                )
+                assert await metric.a_measure(mock_test_case) == 0.5
+
+            assert mock_native_model.a_generate.call_count == 6
+
         @pytest.mark.asyncio
         async def test_tracks_evaluation_cost_for_native_models(
             self,
@@ -255,6 +321,41 @@ class TestAbsenceOfFactualContradictions:
             await metric.a_measure(mock_test_case)
             assert metric.reason == sample_reason.reason
 
+        @pytest.mark.parametrize(
+            "threshold, reason_margin, expected_reason",
+            [
+                (0.6, None, True),
+                (0.6, 0.0, True),
+                (0.4, 0.2, True),
+                (0.4, 0.1, False),
+                (0.4, 0.0, False),
+            ],
+        )
+        @pytest.mark.asyncio
+        async def test_reason_only_generated_within_reason_margin(
+            self,
+            mock_native_model,
+            mock_test_case,
+            sample_reason,
+            threshold,
+            reason_margin,
+            expected_reason,
+        ):
+            metric = AbsenceOfFactualContradictions(
+                model=mock_native_model,
+                threshold=threshold,
+                reason_margin=reason_margin,
+            )
+            # 2 verdicts: 1 yes, 1 no => score = 1 / 2 = 0.5
+            await metric.a_measure(mock_test_case)
+
+            if expected_reason:
+                assert metric.reason == sample_reason.reason
+                assert mock_native_model.a_generate.call_count == 4
+            else:
+                assert metric.reason is None
+                assert mock_native_model.a_generate.call_count == 3
+
         @pytest.mark.asyncio
         async def test_reason_none_when_include_reason_false(
             self,
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import re
 from unittest.mock import AsyncMock, Mock, patch
@@ -8,6 +9,7 @@ from deepeval.models import DeepEvalBaseLLM, GPTModel
 from deepeval.test_case import LLMTestCase
 from deepeval.utils import prettify_list
 
+from govuk_chat_evaluation.rag_answers.custom_deepeval.metrics import ArtefactStore
 from govuk_chat_evaluation.rag_answers.custom_deepeval.metrics.context_relevancy import (
     ContextRelevancyMetric,
 )
@@ -32,8 +34,8 @@ def mock_native_model(
     mock.get_model_name.return_value = "eu.amazon.nova-pro-v1:0"
     mock.a_generate = AsyncMock()
     mock.a_generate.side_effect = [
-        (sample_truths, 0.1),
         (sample_information_needs, 0.1),
+        (sample_truths, 0.1),
         (sample_verdicts, 0.1),
         (sample_reason, 0.1),
     ]
@@ -48,8 +50,8 @@ def mock_non_native_model(
     mock.get_model_name.return_value = "non-native-model"
     mock.a_generate = AsyncMock()
     mock.a_generate.side_effect = [
-        (sample_truths, 0.1),
         (sample_information_needs, 0.1),
+        (sample_truths, 0.1),
         (sample_verdicts, 0.1),
         (sample_reason, 0.1),
     ]
@@ -111,10 +113,11 @@ class TestContextRelevancyMetric:
 
         @pytest.mark.asyncio
         async def test_empty_truths_raises_error(
-            self, mock_native_model, mock_test_case
+            self, mock_native_model, mock_test_case, sample_information_needs
         ):
             mock_native_model.a_generate.side_effect = [
-                (TruthCollection(truths=[]), 0.1)
+                (sample_information_needs, 0.1),
+                (TruthCollection(truths=[]), 0.1),
             ]
             metric = ContextRelevancyMetric(model=mock_native_model)
             with pytest.raises(
@@ -127,8 +130,8 @@ class TestContextRelevancyMetric:
             self, mock_native_model, mock_test_case, sample_truths
         ):
             mock_native_model.a_generate.side_effect = [
-                (sample_truths, 0.1),
                 (InformationNeedsCollection(information_needs=[]), 0.1),
+                (sample_truths, 0.1),
             ]
             metric = ContextRelevancyMetric(model=mock_native_model)
             with pytest.raises(
@@ -145,8 +148,8 @@ class TestContextRelevancyMetric:
             sample_information_needs,
         ):
             mock_native_model.a_generate.side_effect = [
-                (sample_truths, 0.1),
                 (sample_information_needs, 0.1),
+                (sample_truths, 0.1),
                 (VerdictCollection(verdicts=[]), 0.1),
             ]
             metric = ContextRelevancyMetric(model=mock_native_model)
@@ -230,12 +233,127 @@ class TestContextRelevancyMetric:
             assert score == 0.5
 
         @pytest.mark.asyncio
-        async def test_tracks_evaluation_cost_for_native_models(
+        async def test_generates_truths_and_information_needs_concurrently(
             self,
             mock_native_model,
             mock_test_case,
+            sample_information_needs,
             sample_truths,
+            sample_verdicts,
+            sample_reason,
+        ):
+            responses = {
+                type(response): response
+                for response in [
+                    sample_information_needs,
+                    sample_truths,
+                    sample_verdicts,
+                    sample_reason,
+                ]
+            }
+            started = 0
+            both_started = asyncio.Event()
+
+            async def a_generate(prompt, schema):
+                nonlocal started
+                started += 1
+                if started == 2:
+                    both_started.set()
+                # the first two prompts only return once both are in flight
+                await asyncio.wait_for(both_started.wait(), timeout=1)
+                return responses[schema], 0.1
+
+            mock_native_model.a_generate.side_effect = a_generate
+            metric = ContextRelevancyMetric(model=mock_native_model)
+
+            assert await metric.a_measure(mock_test_case) == 0.5
+            assert mock_native_model.a_generate.call_count == 4
+
+        @pytest.mark.asyncio
+        async def test_reuses_information_needs_and_truths_from_artefact_store(
+            self,
+            mock_native_model,
+            mock_test_case,
             sample_information_needs,
+            sample_truths,
+            sample_verdicts,
+            sample_reason,
+        ):
+            mock_native_model.a_generate.side_effect = [
+                (sample_information_needs, 0.1),
+                (sample_truths, 0.1),
+                (sample_verdicts, 0.1),
+                (sample_reason, 0.1),
+                (sample_verdicts, 0.1),
+                (sample_reason, 0.1),
+            ]
+            artefact_store = ArtefactStore()
+            for _ in range(2):
+                metric = ContextRelevancyMetric(
+                    model=mock_native_model, artefact_store=artefact_store
+                )
+                assert await metric.a_measure(mock_test_case) == 0.5
+
+            assert mock_native_model.a_generate.call_count == 6
+
+        @pytest.mark.asyncio
+        async def test_extracts_truths_from_each_chunk(
+            self,
+            mock_native_model,
+            sample_information_needs,
+            sample_verdicts,
+            sample_reason,
+        ):
+            structured_contexts = [
+                StructuredContext(
+                    title=title,
+                    heading_hierarchy=[],
+                    html_content=f"<p>{title}</p>",
+                    exact_path=f"https://gov.uk/{title}",
+                    base_path="https://gov.uk",
+                )
+                for title in ["VAT", "Income Tax"]
+            ]
+            test_case = LLMTestCase(
+                input="What taxes do I pay?",
+                actual_output="VAT and Income Tax.",
+                metadata={"structured_contexts": structured_contexts},
+            )
+
+            async def a_generate(prompt, schema):
+                if schema is TruthCollection:
+                    [title] = [
+                        ctx.title
+                        for ctx in structured_contexts
+                        if f"Page Title: {ctx.title}" in prompt
+                    ]
+                    return TruthCollection(
+                        truths=[Truth(context=title, facts=[f"{title} fact"])]
+                    ), 0.1
+                return {
+                    InformationNeedsCollection: sample_information_needs,
+                    VerdictCollection: sample_verdicts,
+                    ScoreReason: sample_reason,
+                }[schema], 0.1
+
+            mock_native_model.a_generate.side_effect = a_generate
+            metric = ContextRelevancyMetric(model=mock_native_model, verbose_mode=True)
+            await metric.a_measure(test_case)
+
+            assert mock_native_model.a_generate.call_count == 5
+            assert metric.verbose_logs is not None
+            assert "VAT fact" in metric.verbose_logs
+            assert metric.verbose_logs.index("VAT fact") < metric.verbose_logs.index(
+                "Income Tax fact"
+            )
+
+        @pytest.mark.asyncio
+        async def test_tracks_evaluation_cost_for_native_models(
+            self,
+            mock_native_model,
+            mock_test_case,
+            sample_information_needs,
+            sample_truths,
             sample_verdicts,
             sample_reason,
         ):
@@ -247,8 +365,8 @@ class TestContextRelevancyMetric:
             # Second evaluation should reset cost back to 0.0 and recount
             mock_native_model.a_generate.reset_mock()
             mock_native_model.a_generate.side_effect = [
-                (sample_truths, 0.05),
                 (sample_information_needs, 0.05),
+                (sample_truths, 0.05),
                 (sample_verdicts, 0.05),
                 (sample_reason, 0.05),
             ]
@@ -261,14 +379,14 @@ class TestContextRelevancyMetric:
             self,
             mock_native_model,
             mock_test_case,
-            sample_truths,
             sample_information_needs,
+            sample_truths,
             sample_verdicts,
             sample_reason,
         ):
             mock_native_model.a_generate.side_effect = [
-                (sample_truths, None),
                 (sample_information_needs, None),
+                (sample_truths, None),
                 (sample_verdicts, None),
                 (sample_reason, None),
             ]
@@ -321,18 +439,53 @@ class TestContextRelevancyMetric:
             await metric.a_measure(mock_test_case)
             assert metric.reason == sample_reason.reason
 
+        @pytest.mark.parametrize(
+            "threshold, reason_margin, expected_reason",
+            [
+                (0.6, None, True),
+                (0.6, 0.0, True),
+                (0.4, 0.2, True),
+                (0.4, 0.1, False),
+                (0.4, 0.0, False),
+            ],
+        )
+        @pytest.mark.asyncio
+        async def test_reason_only_generated_within_reason_margin(
+            self,
+            mock_native_model,
+            mock_test_case,
+            sample_reason,
+            threshold,
+            reason_margin,
+            expected_reason,
+        ):
+            metric = ContextRelevancyMetric(
+                model=mock_native_model,
+                threshold=threshold,
+                reason_margin=reason_margin,
+            )
+            # 2 verdicts: 1 yes, 1 no => score = 1 / 2 = 0.5
+            await metric.a_measure(mock_test_case)
+
+            if expected_reason:
+                assert metric.reason == sample_reason.reason
+                assert mock_native_model.a_generate.call_count == 4
+            else:
+                assert metric.reason is None
+                assert mock_native_model.a_generate.call_count == 3
+
         @pytest.mark.asyncio
         async def test_reason_none_when_include_reason_false(
             self,
             mock_native_model,
             mock_test_case,
-            sample_truths,
             sample_information_needs,
+            sample_truths,
             sample_verdicts,
         ):
             mock_native_model.a_generate.side_effect = [
-                (sample_truths, 0.1),
                 (sample_information_needs, 0.1),
+                (sample_truths, 0.1),
                 (sample_verdicts, 0.1),
             ]
 
@@ -348,8 +501,8 @@ class TestContextRelevancyMetric:
             self,
             mock_native_model,
             mock_test_case,
-            sample_truths,
             sample_information_needs,
+            sample_truths,
             sample_verdicts,
             sample_reason,
         ):
@@ -377,14 +530,14 @@ class TestContextRelevancyMetric:
             self,
             mock_non_native_model,
             mock_test_case,
-            sample_truths,
             sample_information_needs,
+            sample_truths,
             sample_verdicts,
             sample_reason,
         ):
             mock_non_native_model.a_generate.side_effect = [
-                sample_truths,
                 sample_information_needs,
+                sample_truths,
                 sample_verdicts,
                 sample_reason,
             ]
@@ -407,11 +560,11 @@ class TestContextRelevancyMetric:
             )
             reason_json = json.dumps({"reason": "fallback"})
             mock_non_native_model.a_generate.side_effect = [
-                TypeError("schema fail"),
-                truth_json,
                 TypeError("schema fail"),
                 info_needs_json,
                 TypeError("schema fail"),
+                truth_json,
+                TypeError("schema fail"),
                 verdicts_json,
                 TypeError("schema fail"),
                 reason_json,
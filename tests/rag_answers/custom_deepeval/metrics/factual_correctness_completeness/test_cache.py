@@ -1,5 +1,11 @@
+import asyncio
+import time
+
+import pytest
+
 from govuk_chat_evaluation.rag_answers.custom_deepeval.metrics.factual_precision_recall import (
     FactClassificationCache,
+    FactClassificationCacheStats,
 )
 from govuk_chat_evaluation.rag_answers.custom_deepeval.metrics.factual_precision_recall.schema import (
     ClassifiedFacts,
@@ -36,3 +42,142 @@ class TestFactClassificationCache:
 
         assert cache.get("model-a", "answer", "ground") == facts_model_a
         assert cache.get("model-a", "different", "ground") == facts_other_answer
+
+    @pytest.mark.asyncio
+    async def test_get_or_classify_caches_the_classification(self):
+        cache = FactClassificationCache()
+        classified_facts = ClassifiedFacts(TP=["t"], FP=[], FN=[])
+
+        async def classify():
+            return classified_facts
+
+        assert await cache.get_or_classify("model", "answer", "ground", classify) == (
+            classified_facts,
+            False,
+        )
+        assert await cache.get_or_classify("model", "answer", "ground", classify) == (
+            classified_facts,
+            True,
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_or_classify_coalesces_concurrent_calls(self):
+        cache = FactClassificationCache()
+        classified_facts = ClassifiedFacts(TP=["t"], FP=[], FN=[])
+        calls = 0
+
+        async def classify():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return classified_facts
+
+        results = await asyncio.gather(
+            *[
+                cache.get_or_classify("model", "answer", "ground", classify)
+                for _ in range(3)
+            ]
+        )
+
+        assert calls == 1
+        assert results == [
+            (classified_facts, False),
+            (classified_facts, True),
+            (classified_facts, True),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_get_or_classify_retries_when_the_first_call_fails(self):
+        cache = FactClassificationCache()
+        classified_facts = ClassifiedFacts(TP=["t"], FP=[], FN=[])
+        results = [None, classified_facts]
+
+        async def classify():
+            await asyncio.sleep(0.01)
+            return results.pop(0)
+
+        first, second = await asyncio.gather(
+            cache.get_or_classify("model", "answer", "ground", classify),
+            cache.get_or_classify("model", "answer", "ground", classify),
+        )
+
+        assert first == (None, False)
+        assert second == (classified_facts, False)
+        assert cache.get("model", "answer", "ground") == classified_facts
+
+    @pytest.mark.asyncio
+    async def test_get_or_classify_retries_when_the_first_call_is_cancelled(self):
+        cache = FactClassificationCache()
+        classified_facts = ClassifiedFacts(TP=["t"], FP=[], FN=[])
+
+        async def never_classify():
+            await asyncio.Event().wait()
+            return classified_facts
+
+        async def classify():
+            return classified_facts
+
+        leader = asyncio.create_task(
+            cache.get_or_classify("model", "answer", "ground", never_classify)
+        )
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(
+            cache.get_or_classify("model", "answer", "ground", classify)
+        )
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await waiter == (classified_facts, False)
+
+    def test_records_hits_and_misses(self):
+        cache = FactClassificationCache()
+        cache.get("model", "answer", "ground")
+        cache.set("model", "answer", "ground", ClassifiedFacts(TP=["t"]))
+        cache.get("model", "answer", "ground")
+
+        assert cache.stats == FactClassificationCacheStats(hits=1, misses=1)
+
+    def test_persists_between_instances_for_the_same_run(self, tmp_path):
+        path = tmp_path / "cache.sqlite"
+        classified_facts = ClassifiedFacts(TP=["t"], FP=[], FN=[])
+
+        with FactClassificationCache(path=path, run=1) as cache:
+            cache.set("model", "answer", "ground", classified_facts)
+
+        with FactClassificationCache(path=path, run=1) as cache:
+            assert cache.get("model", "answer", "ground") == classified_facts
+
+        with FactClassificationCache(path=path, run=2) as cache:
+            assert cache.get("model", "answer", "ground") is None
+
+    def test_expired_entries_are_misses(self, tmp_path, mocker):
+        path = tmp_path / "cache.sqlite"
+        with FactClassificationCache(path=path, ttl_seconds=60) as cache:
+            cache.set("model", "answer", "ground", ClassifiedFacts(TP=["t"]))
+
+            mocker.patch(
+                "govuk_chat_evaluation.sqlite_store.time.time",
+                return_value=time.time() + 120,
+            )
+
+            assert cache.get("model", "answer", "ground") is None
+            assert cache.stats == FactClassificationCacheStats(misses=1, evictions=1)
+
+    def test_evicts_least_recently_used_entries_on_exit(self, tmp_path, mocker):
+        path = tmp_path / "cache.sqlite"
+        mock_time = mocker.patch("govuk_chat_evaluation.sqlite_store.time.time")
+
+        with FactClassificationCache(path=path, max_entries=2) as cache:
+            for now, answer in enumerate(["first", "second", "third"]):
+                mock_time.return_value = now
+                cache.set("model", answer, "ground", ClassifiedFacts(TP=[answer]))
+
+            mock_time.return_value = 3
+            cache.get("model", "first", "ground")
+
+        assert cache.stats.evictions == 1
+
+        with FactClassificationCache(path=path) as cache:
+            assert cache.get("model", "first", "ground") is not None
+            assert cache.get("model", "second", "ground") is None
+            assert cache.get("model", "third", "ground") is not None
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import math
@@ -876,6 +877,49 @@ class TestFactualPrecisionRecall:
         # Both metrics should see the same underlying classified facts.
         assert precision_metric.confusion_matrix == recall_metric.confusion_matrix
 
+    @pytest.mark.asyncio
+    async def test_concurrent_precision_and_recall_classify_once(
+        self,
+        mock_native_model: Mock,
+        test_case: LLMTestCase,
+    ):
+        shared_cache = FactClassificationCache()
+        generated = asyncio.Event()
+
+        async def slow_generate(*_args, **_kwargs):
+            await generated.wait()
+            return (
+                FactClassificationResult(
+                    classified_facts=ClassifiedFacts(
+                        TP=["fact1"], FP=[], FN=["missing"]
+                    )
+                ),
+                0.1,
+            )
+
+        mock_native_model.a_generate = AsyncMock(side_effect=slow_generate)
+
+        precision_metric = FactualPrecisionRecall(
+            model=mock_native_model, mode=Mode.PRECISION, cache=shared_cache
+        )
+        recall_metric = FactualPrecisionRecall(
+            model=mock_native_model, mode=Mode.RECALL, cache=shared_cache
+        )
+
+        measuring = asyncio.gather(
+            precision_metric.a_measure(test_case), recall_metric.a_measure(test_case)
+        )
+        await asyncio.sleep(0)
+        generated.set()
+        precision_score, recall_score = await measuring
+
+        assert mock_native_model.a_generate.await_count == 1
+        assert round(precision_score, 3) == 1.0
+        assert round(recall_score, 3) == 0.5
+        # only the metric that made the call carries its cost
+        costs = [precision_metric.evaluation_cost, recall_metric.evaluation_cost]
+        assert sorted(cost or 0 for cost in costs) == [0, 0.1]
+
     @pytest.mark.asyncio
     async def test_verbose_logs_record_cache_hits(
         self,
@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+import pytest
+
+from govuk_chat_evaluation.rag_answers.custom_deepeval.metrics import ArtefactStore
+from govuk_chat_evaluation.rag_answers.custom_deepeval.metrics.absence_of_factual_contradictions.schema import (
+    ClaimCollection,
+    TruthCollection,
+)
+
+
+class TestArtefactStore:
+    def test_get_and_set(self):
+        store = ArtefactStore()
+        truths = TruthCollection(truths=["truth"])
+
+        assert store.get("truths", "model", "text", TruthCollection) is None
+
+        store.set("truths", "model", "text", truths)
+
+        assert store.get("truths", "model", "text", TruthCollection) == truths
+        assert (store.hits, store.misses) == (1, 1)
+
+    def test_get_and_set_distinguish_keys_by_type_model_and_text(self):
+        store = ArtefactStore()
+        truths = TruthCollection(truths=["truth"])
+        claims = ClaimCollection(claims=["claim"])
+
+        store.set("truths", "model", "text", truths)
+        store.set("claims", "model", "text", claims)
+
+        assert store.get("truths", "model", "text", TruthCollection) == truths
+        assert store.get("claims", "model", "text", ClaimCollection) == claims
+        assert store.get("truths", "other-model", "text", TruthCollection) is None
+        assert store.get("truths", "model", "other text", TruthCollection) is None
+
+    @pytest.mark.asyncio
+    async def test_get_or_extract_coalesces_concurrent_calls(self):
+        store = ArtefactStore()
+        truths = TruthCollection(truths=["truth"])
+        calls = 0
+
+        async def extract():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return truths
+
+        results = await asyncio.gather(
+            *[
+                store.get_or_extract(
+                    "truths", "model", "text", TruthCollection, extract
+                )
+                for _ in range(3)
+            ]
+        )
+
+        assert calls == 1
+        assert results == [truths] * 3
+
+    @pytest.mark.asyncio
+    async def test_get_or_extract_extracts_again_when_the_first_call_raises(self):
+        store = ArtefactStore()
+        truths = TruthCollection(truths=["truth"])
+        results: list[TruthCollection | None] = [None, truths]
+
+        async def extract():
+            await asyncio.sleep(0.01)
+            if (result := results.pop(0)) is None:
+                raise ValueError("No truths extracted")
+            return result
+
+        first, second = await asyncio.gather(
+            store.get_or_extract("truths", "model", "text", TruthCollection, extract),
+            store.get_or_extract("truths", "model", "text", TruthCollection, extract),
+            return_exceptions=True,
+        )
+
+        assert isinstance(first, ValueError)
+        assert second == truths
+
+    @pytest.mark.parametrize("run, expected_reused", [(None, True), (1, False)])
+    def test_artefacts_are_frozen_across_runs_without_a_run(
+        self, tmp_path, run, expected_reused
+    ):
+        path = tmp_path / "store.sqlite"
+        truths = TruthCollection(truths=["truth"])
+
+        with ArtefactStore(path=path, run=run) as store:
+            store.set("truths", "model", "text", truths)
+
+        with ArtefactStore(path=path, run=run and run + 1) as store:
+            stored = store.get("truths", "model", "text", TruthCollection)
+
+        assert (stored == truths) is expected_reused
+
+    def test_expired_artefacts_are_misses(self, tmp_path, mocker):
+        with ArtefactStore(path=tmp_path / "store.sqlite", ttl_seconds=60) as store:
+            store.set("truths", "model", "text", TruthCollection(truths=["truth"]))
+
+            mocker.patch(
+                "govuk_chat_evaluation.sqlite_store.time.time",
+                return_value=time.time() + 120,
+            )
+
+            assert store.get("truths", "model", "text", TruthCollection) is None
+
+    def test_evicts_least_recently_used_artefacts_on_exit(self, tmp_path, mocker):
+        path = tmp_path / "store.sqlite"
+        mock_time = mocker.patch("govuk_chat_evaluation.sqlite_store.time.time")
+
+        with ArtefactStore(path=path, max_entries=2) as store:
+            for now, text in enumerate(["first", "second", "third"]):
+                mock_time.return_value = now
+                store.set("truths", "model", text, TruthCollection(truths=[text]))
+
+            mock_time.return_value = 3
+            store.get("truths", "model", "first", TruthCollection)
+
+        with ArtefactStore(path=path) as store:
+            assert store.get("truths", "model", "first", TruthCollection)
+            assert store.get("truths", "model", "second", TruthCollection) is None
+            assert store.get("truths", "model", "third", TruthCollection)
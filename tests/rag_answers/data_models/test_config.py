@@ -1,3 +1,5 @@
+import logging
+from datetime import UTC, datetime, timedelta
 from typing import cast
 
 import pytest
@@ -11,6 +13,8 @@ from pydantic import ValidationError
 
 from govuk_chat_evaluation.aws_credentials import AwsCredentialCheckResult
 from govuk_chat_evaluation.rag_answers.custom_deepeval.metrics import (
+    AbsenceOfFactualContradictions,
+    ContextRelevancyMetric,
     FactClassificationCache,
     FactualPrecisionRecall,
 )
@@ -27,6 +31,16 @@ from govuk_chat_evaluation.rag_answers.data_models import (
 from govuk_chat_evaluation.rag_answers.data_models import (
     config as config_module,
 )
+from govuk_chat_evaluation.rag_answers.judge_hedging import HedgingPolicy
+from govuk_chat_evaluation.rag_answers.judge_load_balancer import (
+    BedrockRoute,
+    LoadBalancedBedrockModel,
+)
+from govuk_chat_evaluation.rag_answers.judge_registry import (
+    JudgeRegistry,
+    PooledAmazonBedrockModel,
+)
+from govuk_chat_evaluation.rag_answers.judge_response_cache import JudgeResponseCache
 
 
 class TestMetricConfig:
@@ -162,8 +176,53 @@ class TestMetricConfig:
         assert "validation error for MetricConfig" in str(exception_info.value)
         assert "does_not_exist" in str(exception_info.value)
 
+    @pytest.mark.parametrize(
+        "name, expected_class",
+        [
+            ("absence_of_factual_contradictions", AbsenceOfFactualContradictions),
+            ("context_relevancy", ContextRelevancyMetric),
+        ],
+    )
+    def test_build_metric_with_reason_margin(self, name, expected_class, task_config):
+        metric_config = MetricConfig.model_validate(
+            {
+                "name": name,
+                "threshold": 0.8,
+                "model": "gpt-4o",
+                "reason_margin": 0.1,
+            }
+        )
+        metric = task_config._build_metric(metric_config, FactClassificationCache())
+        assert isinstance(metric, expected_class)
+        assert metric.reason_margin == 0.1
+
+    def test_reason_margin_unsupported_by_metric(self):
+        with pytest.raises(ValidationError, match="reason_margin isn't supported"):
+            MetricConfig.model_validate(
+                {
+                    "name": "faithfulness",
+                    "threshold": 0.8,
+                    "model": "gpt-4o",
+                    "reason_margin": 0.1,
+                }
+            )
+
 
 class TestTaskConfig:
+    def test_stream_cant_be_used_with_resume(self, mock_input_data, tmp_path):
+        config_dict = {
+            "what": "Test",
+            "generate": True,
+            "input_path": mock_input_data,
+            "metrics": [],
+            "n_runs": 1,
+            "stream": True,
+            "resume": tmp_path,
+        }
+
+        with pytest.raises(ValidationError, match="stream can't be used with resume"):
+            TaskConfig(**config_dict)
+
     def test_get_metric_instances(self, mock_input_data):
         config_dict = {
             "what": "Test",
@@ -254,3 +313,351 @@ class TestTaskConfig:
         message = str(exc_info.value)
         assert "ExpiredToken" in message
         assert "export_aws_credentials.sh" in message
+
+    def test_instantiate_llm_judge_reports_when_credentials_expired(self, mocker):
+        mocker.patch(
+            "govuk_chat_evaluation.rag_answers.data_models.config.check_aws_credentials",
+            return_value=AwsCredentialCheckResult(ok=False, error="ExpiredToken"),
+        )
+        mocker.patch(
+            "govuk_chat_evaluation.rag_answers.data_models.config.aws_credentials_expiry",
+            return_value=datetime.now(UTC) - timedelta(minutes=5),
+        )
+
+        llm_config = LLMJudgeModelConfig(
+            model=LLMJudgeModel.GPT_OSS_120B, temperature=0.0
+        )
+
+        with pytest.raises(config_module.BedrockCredentialsError) as exc_info:
+            llm_config.instantiate_llm_judge()
+
+        assert "Credentials in .env.aws expired at" in str(exc_info.value)
+
+    @pytest.mark.parametrize(
+        "expires_in, expected_warning",
+        [(timedelta(minutes=30), True), (timedelta(hours=3), False)],
+    )
+    def test_instantiate_llm_judge_warns_when_credentials_expire_soon(
+        self, mocker, caplog, expires_in, expected_warning
+    ):
+        mocker.patch(
+            "govuk_chat_evaluation.rag_answers.data_models.config.check_aws_credentials",
+            return_value=AwsCredentialCheckResult(ok=True),
+        )
+        mocker.patch(
+            "govuk_chat_evaluation.rag_answers.data_models.config.aws_credentials_expiry",
+            return_value=datetime.now(UTC) + expires_in,
+        )
+        config_module._warn_credentials_expire_soon.cache_clear()
+
+        llm_config = LLMJudgeModelConfig(
+            model=LLMJudgeModel.GPT_OSS_120B, temperature=0.0
+        )
+        with caplog.at_level(logging.WARNING):
+            llm_config.instantiate_llm_judge()
+            llm_config.instantiate_llm_judge()
+
+        warnings = [r for r in caplog.records if "expire at" in r.getMessage()]
+        assert len(warnings) == (1 if expected_warning else 0)
+
+    def test_instantiate_llm_judge_shares_judges_through_registry(self, mocker):
+        aws_check = mocker.patch(
+            "govuk_chat_evaluation.rag_answers.data_models.config.check_aws_credentials",
+            return_value=AwsCredentialCheckResult(ok=True),
+        )
+        registry = JudgeRegistry(max_pool_connections=5)
+        llm_config = LLMJudgeModelConfig(
+            model=LLMJudgeModel.GPT_OSS_120B, temperature=0.0
+        )
+
+        first = llm_config.instantiate_llm_judge(judge_registry=registry)
+        second = llm_config.instantiate_llm_judge(judge_registry=registry)
+        other = LLMJudgeModelConfig(
+            model=LLMJudgeModel.GPT_OSS_120B, temperature=0.5
+        ).instantiate_llm_judge(judge_registry=registry)
+
+        assert isinstance(first, PooledAmazonBedrockModel)
+        assert isinstance(second, PooledAmazonBedrockModel)
+        assert isinstance(other, PooledAmazonBedrockModel)
+        assert first.max_pool_connections == 5
+        assert first is not second
+        assert first._shared_client is second._shared_client
+        assert first._shared_client is not other._shared_client
+        assert aws_check.call_count == 2
+
+    def test_instantiate_llm_judge_balances_across_registry_routes(self, mocker):
+        aws_check = mocker.patch(
+            "govuk_chat_evaluation.rag_answers.data_models.config.check_aws_credentials",
+            return_value=AwsCredentialCheckResult(ok=True),
+        )
+        routes = [
+            BedrockRoute("eu-west-1"),
+            BedrockRoute("us-east-1", "us.openai.gpt-oss-120b-1:0"),
+            BedrockRoute("local", endpoint_url="http://localhost:4566"),
+        ]
+        registry = JudgeRegistry(
+            max_pool_connections=5, routes={LLMJudgeModel.GPT_OSS_120B.value: routes}
+        )
+
+        judge = LLMJudgeModelConfig(
+            model=LLMJudgeModel.GPT_OSS_120B
+        ).instantiate_llm_judge(judge_registry=registry)
+
+        assert isinstance(judge, LoadBalancedBedrockModel)
+        assert judge.get_model_name() == LLMJudgeModel.GPT_OSS_120B.value
+        route_models = [model for _, model in judge.routes]
+        assert [model.region for model in route_models] == [
+            "eu-west-1",
+            "us-east-1",
+            "local",
+        ]
+        assert route_models[1].get_model_name() == "us.openai.gpt-oss-120b-1:0"
+        assert route_models[2].kwargs["endpoint_url"] == "http://localhost:4566"
+        # credentials aren't checked for the stub endpoint
+        assert [call.kwargs["region"] for call in aws_check.call_args_list] == [
+            "eu-west-1",
+            "us-east-1",
+        ]
+        assert registry.rate_limiter(LLMJudgeModel.GPT_OSS_120B.value, None)
+
+    @pytest.mark.asyncio
+    async def test_instantiate_llm_judge_shares_rate_limiter_through_registry(
+        self, mocker
+    ):
+        mocker.patch(
+            "govuk_chat_evaluation.rag_answers.data_models.config.check_aws_credentials",
+            return_value=AwsCredentialCheckResult(ok=True),
+        )
+        registry = JudgeRegistry()
+        limiter = registry.rate_limiter(LLMJudgeModel.GPT_OSS_120B.value, "eu-west-1")
+        acquire = mocker.patch.object(limiter, "acquire")
+
+        for temperature in (0.0, 0.5):
+            judge = LLMJudgeModelConfig(
+                model=LLMJudgeModel.GPT_OSS_120B, temperature=temperature
+            ).instantiate_llm_judge(judge_registry=registry)
+            mocker.patch.object(
+                judge._shared_client,  # pyright: ignore[reportAttributeAccessIssue]
+                "get",
+                side_effect=RuntimeError("no client"),
+            )
+            with pytest.raises(RuntimeError):
+                await judge.a_generate("prompt")
+
+        assert acquire.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_instantiate_llm_judge_hedges_through_registry(self, mocker):
+        mocker.patch(
+            "govuk_chat_evaluation.rag_answers.data_models.config.check_aws_credentials",
+            return_value=AwsCredentialCheckResult(ok=True),
+        )
+        registry = JudgeRegistry(hedging=HedgingPolicy())
+        judge = LLMJudgeModelConfig(
+            model=LLMJudgeModel.GPT_OSS_120B
+        ).instantiate_llm_judge(judge_registry=registry)
+        mocker.patch.object(
+            judge._shared_client,  # pyright: ignore[reportAttributeAccessIssue]
+            "get",
+            side_effect=RuntimeError("no client"),
+        )
+
+        with pytest.raises(RuntimeError):
+            await judge.a_generate("prompt")
+
+        hedger = registry.hedger(LLMJudgeModel.GPT_OSS_120B.value)
+        assert hedger is not None
+        assert hedger.requests == 1
+
+
+class TestEvaluationConfig:
+    @pytest.mark.parametrize(
+        "config, expected_pool_connections",
+        [
+            ({}, 40),
+            ({"max_concurrent_per_judge": 20}, 20),
+            ({"judge_pool_connections": 8}, 8),
+        ],
+    )
+    def test_judge_registry_pool_sized_to_concurrency(
+        self, config, expected_pool_connections
+    ):
+        registry = config_module.EvaluationConfig(**config).judge_registry()
+
+        assert registry.max_pool_connections == expected_pool_connections
+
+    def test_judge_registry_rate_limiters(self):
+        registry = config_module.EvaluationConfig.model_validate(
+            {
+                "judge_rate_limits": [
+                    {"model": "openai.gpt-oss-120b-1:0", "requests_per_minute": 100},
+                    {
+                        "model": "openai.gpt-oss-120b-1:0",
+                        "region": "us-east-1",
+                        "tokens_per_minute": 1000,
+                        "max_backoff_seconds": 10,
+                    },
+                ]
+            }
+        ).judge_registry()
+
+        in_region = registry.rate_limiter("openai.gpt-oss-120b-1:0", "us-east-1")
+        elsewhere = registry.rate_limiter("openai.gpt-oss-120b-1:0", "eu-west-1")
+
+        assert in_region.max_backoff_seconds == 10
+        assert elsewhere is not in_region
+        assert elsewhere is registry.rate_limiter(
+            "openai.gpt-oss-120b-1:0", "eu-west-2"
+        )
+
+    def test_judge_registry_routes(self):
+        registry = config_module.EvaluationConfig.model_validate(
+            {
+                "judge_routes": [
+                    {
+                        "model": "openai.gpt-oss-120b-1:0",
+                        "routes": [
+                            {"region": "eu-west-1"},
+                            {
+                                "region": "us-east-1",
+                                "inference_profile": "us.openai.gpt-oss-120b-1:0",
+                            },
+                        ],
+                    }
+                ]
+            }
+        ).judge_registry()
+
+        assert registry.routes == {
+            "openai.gpt-oss-120b-1:0": [
+                BedrockRoute("eu-west-1"),
+                BedrockRoute("us-east-1", "us.openai.gpt-oss-120b-1:0"),
+            ]
+        }
+
+    @pytest.mark.parametrize(
+        "judge_routes, message",
+        [
+            (
+                [{"model": "gpt-4o", "routes": [{"region": "eu-west-1"}]}],
+                "isn't a Bedrock judge model",
+            ),
+            (
+                [{"model": "openai.gpt-oss-120b-1:0", "routes": []}],
+                "at least 1 item",
+            ),
+            (
+                [{"model": "openai.gpt-oss-120b-1:0", "routes": [{"region": "a"}]}] * 2,
+                "more than one entry",
+            ),
+        ],
+    )
+    def test_judge_routes_validation(self, judge_routes, message):
+        with pytest.raises(ValidationError, match=message):
+            config_module.EvaluationConfig.model_validate(
+                {"judge_routes": judge_routes}
+            )
+
+    @pytest.mark.parametrize(
+        "judge_hedging, expected_policy",
+        [
+            ({}, None),
+            ({"enabled": True}, HedgingPolicy()),
+            (
+                {"enabled": True, "percentile": 99, "max_hedge_rate": 0.01},
+                HedgingPolicy(percentile=99, max_hedge_rate=0.01),
+            ),
+        ],
+    )
+    def test_judge_registry_hedging(self, judge_hedging, expected_policy):
+        registry = config_module.EvaluationConfig.model_validate(
+            {"judge_hedging": judge_hedging}
+        ).judge_registry()
+
+        assert registry.hedging == expected_policy
+
+    def test_judge_rate_limits_rejects_duplicate_budgets(self):
+        limit = {"model": "openai.gpt-oss-120b-1:0", "requests_per_minute": 100}
+
+        with pytest.raises(ValidationError, match="more than one budget"):
+            config_module.EvaluationConfig.model_validate(
+                {"judge_rate_limits": [limit, limit]}
+            )
+
+
+class TestFactClassificationCacheConfig:
+    def test_instantiate_cache_in_memory_by_default(self):
+        cache = config_module.FactClassificationCacheConfig().instantiate_cache(run=2)
+
+        assert cache.path is None
+        assert cache.run == 2
+
+    def test_instantiate_cache_persisted(self, mocker, tmp_path):
+        mocker.patch.object(config_module, "project_root", return_value=tmp_path)
+        cache_config = config_module.FactClassificationCacheConfig(
+            persist=True, max_entries=10, ttl_days=1
+        )
+
+        with cache_config.instantiate_cache(run=2) as cache:
+            assert cache.path == (
+                tmp_path / "results" / "fact_classification_cache.sqlite"
+            )
+            assert cache.run == 2
+            assert cache.max_entries == 10
+            assert cache.ttl_seconds == 86400
+
+
+class TestJudgeResponseCacheConfig:
+    def test_instantiate_cache_disabled_by_default(self):
+        assert config_module.JudgeResponseCacheConfig().instantiate_cache() is None
+
+    @pytest.mark.parametrize("per_run, expected_run", [(True, 2), (False, None)])
+    def test_instantiate_cache(self, mocker, tmp_path, per_run, expected_run):
+        mocker.patch.object(config_module, "project_root", return_value=tmp_path)
+        cache_config = config_module.JudgeResponseCacheConfig(
+            enabled=True, max_size_mb=1, per_run=per_run
+        )
+
+        cache = cache_config.instantiate_cache(run=2)
+
+        assert cache is not None
+        assert cache.path == tmp_path / "results" / "judge_response_cache"
+        assert cache.max_size_bytes == 1024 * 1024
+        assert cache.run == expected_run
+
+    def test_llm_judge_uses_response_cache(self, tmp_path):
+        cache = JudgeResponseCache(tmp_path, max_size_bytes=1024)
+        llm_config = LLMJudgeModelConfig(model=LLMJudgeModel.GPT_4O, temperature=0.0)
+
+        model = llm_config.instantiate_llm_judge(cache)
+
+        assert model.a_generate.__name__ == "_caching_a_generate"
+
+
+class TestArtefactStoreConfig:
+    def test_instantiate_stores_per_run_in_memory_by_default(self):
+        stores = config_module.ArtefactStoreConfig().instantiate_stores(n_runs=2)
+
+        assert [store.run for store in stores] == [1, 2]
+        assert all(store.path is None for store in stores)
+
+    def test_instantiate_stores_frozen_across_runs(self):
+        stores = config_module.ArtefactStoreConfig(
+            freeze_across_runs=True
+        ).instantiate_stores(n_runs=2)
+
+        assert stores[0] is stores[1]
+        assert stores[0].run is None
+
+    def test_instantiate_stores_persisted(self, mocker, tmp_path):
+        mocker.patch.object(config_module, "project_root", return_value=tmp_path)
+        store_config = config_module.ArtefactStoreConfig(
+            persist=True, max_entries=10, ttl_days=1
+        )
+
+        [store] = store_config.instantiate_stores(n_runs=1)
+
+        with store:
+            assert store.path == tmp_path / "results" / "artefact_store.sqlite"
+            assert store.max_entries == 10
+            assert store.ttl_seconds == 86400
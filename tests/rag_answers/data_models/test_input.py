@@ -23,7 +23,7 @@ class TestStructuredContext:
         )
 
         flattened_string = structured_context.to_flattened_string()
-        expected_string = "VAT\nTax > VAT\nVAT overview\n\n<p>Some HTML about VAT</p>"
+        expected_string = "VAT\nTax > VAT\nVAT overview\n\nSome HTML about VAT"
         assert flattened_string == expected_string
 
     def test_to_flattened_context_content(self):
@@ -39,10 +39,29 @@ class TestStructuredContext:
         flattened_content = structured_context.to_flattened_context_content()
         expected_content = (
             "Context:\nPage Title: VAT\nPage description: VAT overview\n"
-            "Headings: Tax > VAT\n\nContent:\n<p>Some HTML about VAT</p>"
+            "Headings: Tax > VAT\n\nContent:\nSome HTML about VAT"
         )
         assert flattened_content == expected_content
 
+    def test_text_content_is_converted_once(self, mocker):
+        structured_context = StructuredContext(
+            title="VAT",
+            heading_hierarchy=["Tax", "VAT"],
+            html_content="<h2>VAT</h2><p>Some HTML about VAT</p>",
+            exact_path="https://gov.uk/vat",
+            base_path="https://gov.uk",
+        )
+        html_to_text = mocker.patch(
+            "govuk_chat_evaluation.rag_answers.data_models.input.html_to_text",
+            return_value="## VAT\nSome HTML about VAT",
+        )
+
+        structured_context.to_flattened_string()
+        structured_context.to_flattened_context_content()
+
+        assert structured_context.text_content == "## VAT\nSome HTML about VAT"
+        html_to_text.assert_called_once_with(structured_context.html_content)
+
 
 class TestEvaluationTestCase:
     @pytest.mark.parametrize("ideal_answer", ["Great", None])
@@ -5,6 +5,7 @@ from govuk_chat_evaluation.file_system import OUTPUT_DIR_TIME_FORMAT
 from govuk_chat_evaluation.rag_answers.cli import main
 from govuk_chat_evaluation.rag_answers.data_models import EvaluationTestCase
 from govuk_chat_evaluation.rag_answers.data_models.config import BedrockCredentialsError
+from tests.conftest import stream_generated
 
 # ─── Fixtures
 
@@ -35,7 +36,7 @@ def mock_data_generation(mocker):
 
     return mocker.patch(
         "govuk_chat_evaluation.rag_answers.generate.generate_inputs_to_evaluation_test_cases",
-        return_value=return_value,
+        side_effect=stream_generated(return_value),
     )
 
 
@@ -52,7 +53,7 @@ def mock_output_directory(mock_project_root, frozen_time):
 # ─── Main CLI Tests
 
 
-@pytest.mark.usefixtures("mock_deepeval_evaluate")
+@pytest.mark.usefixtures("mock_evaluate_test_cases")
 def test_main_creates_output_files(mock_output_directory, mock_config_file):
     runner = CliRunner()
     result = runner.invoke(main, [mock_config_file])
@@ -78,7 +79,7 @@ def test_main_passes_claude_generation_model_to_generate_and_write_dataset(
     assert claude_generation_model == "claude_sonnet_4_0"
 
 
-@pytest.mark.usefixtures("mock_deepeval_evaluate")
+@pytest.mark.usefixtures("mock_evaluate_test_cases")
 def test_main_generates_results(
     mock_output_directory, mock_config_file, mock_data_generation, mocker
 ):
@@ -92,7 +93,7 @@ def test_main_generates_results(
     assert generated_file.exists()
 
 
-@pytest.mark.usefixtures("mock_deepeval_evaluate", "mock_output_directory")
+@pytest.mark.usefixtures("mock_evaluate_test_cases", "mock_output_directory")
 def test_main_doesnt_generate_results(mock_config_file, mock_data_generation):
     runner = CliRunner()
     result = runner.invoke(main, [mock_config_file, "--no-generate"])
@@ -101,6 +102,41 @@ def test_main_doesnt_generate_results(mock_config_file, mock_data_generation):
     mock_data_generation.assert_not_called()
 
 
+@pytest.mark.usefixtures("mock_evaluate_test_cases")
+def test_main_streams_generated_results_into_evaluation(
+    mock_output_directory, mock_config_file, mock_data_generation
+):
+    runner = CliRunner()
+    result = runner.invoke(main, [mock_config_file, "--generate", "--stream"])
+
+    assert result.exit_code == 0, result.output
+    mock_data_generation.assert_called_once()
+    assert (mock_output_directory / "generated.jsonl").exists()
+    assert (mock_output_directory / "deepeval_test_run_1_part_1.json").exists()
+    assert (mock_output_directory / "results_summary.csv").exists()
+
+
+@pytest.mark.usefixtures("mock_evaluate_test_cases")
+def test_main_resumes_generation_from_previous_output(
+    mock_config_file, mock_input_data, mock_output_directory, tmp_path, mocker
+):
+    previous_output_dir = tmp_path / "previous"
+    previous_output_dir.mkdir()
+    mock_generate = mocker.patch(
+        "govuk_chat_evaluation.rag_answers.cli.generate_and_write_dataset",
+        return_value=mock_input_data,
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main, [mock_config_file, "--resume", str(previous_output_dir)]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert mock_generate.call_args.kwargs["resume_dir"] == previous_output_dir
+    assert "resume:" not in (mock_output_directory / "config.yaml").read_text()
+
+
 def test_main_exits_on_bedrock_credentials_error(mock_config_file, mocker):
     mocker.patch(
         "govuk_chat_evaluation.rag_answers.cli.evaluate_and_output_results",
@@ -3,30 +3,33 @@ import logging
 from unittest.mock import MagicMock
 
 import pytest
-from deepeval import evaluate as deepeval_evaluate
-from deepeval.evaluate.configs import (
-    AsyncConfig,
-    CacheConfig,
-    DisplayConfig,
-    ErrorConfig,
-)
+from deepeval.evaluate.types import TestResult
 from deepeval.metrics import BaseMetric
-from deepeval.test_run import TestRun as DeepevalTestRun
 
 from govuk_chat_evaluation.file_system import jsonl_to_models
 from govuk_chat_evaluation.rag_answers.data_models import (
     EvaluationTestCase,
+    StructuredContext,
     TaskConfig,
 )
+from govuk_chat_evaluation.rag_answers.data_models.config import (
+    ArtefactStoreConfig,
+    EvaluationConfig,
+    FactClassificationCacheConfig,
+    JudgeResponseCacheConfig,
+)
 from govuk_chat_evaluation.rag_answers.deepeval_evaluate import (
     EvaluationResult,
     convert_deepeval_output_to_evaluation_results,
     run_deepeval_evaluation,
 )
+from govuk_chat_evaluation.rag_answers.evaluation_scheduler import (
+    evaluate_test_cases,
+)
 from tests.conftest import assert_mock_call_matches_signature
 
 
-@pytest.mark.usefixtures("mock_deepeval_evaluate")
+@pytest.mark.usefixtures("mock_evaluate_test_cases")
 class TestRunDeepEvalEvaluation:
     @pytest.fixture
     def mock_test_cases(self, mock_input_data):
@@ -51,39 +54,57 @@ class TestRunDeepEvalEvaluation:
     def mock_task_config(self, mock_input_data, mock_metrics):
         config = MagicMock(spec=TaskConfig)
         config.metric_instances.return_value = mock_metrics
+        config.evaluation = EvaluationConfig()
+        config.fact_classification_cache = FactClassificationCacheConfig()
+        config.judge_response_cache = JudgeResponseCacheConfig()
+        config.artefact_store = ArtefactStoreConfig()
         return config
 
-    def test_runs_evaluate_defaults_to_1_time(
+    def test_evaluates_the_metrics_of_each_run(
         self,
         mock_test_cases,
-        mock_metrics,
         mock_task_config,
-        mock_deepeval_evaluate,
+        mock_evaluate_test_cases,
         mock_project_root,
     ):
-        run_deepeval_evaluation(mock_test_cases, mock_task_config, mock_project_root)
-        assert_mock_call_matches_signature(mock_deepeval_evaluate, deepeval_evaluate)
-        mock_deepeval_evaluate.assert_called_once_with(
-            test_cases=mock_test_cases, metrics=mock_metrics
+        run_metrics = [[MagicMock(spec=BaseMetric)], [MagicMock(spec=BaseMetric)]]
+        mock_task_config.metric_instances.side_effect = run_metrics
+
+        run_deepeval_evaluation(
+            mock_test_cases, mock_task_config, mock_project_root, n_runs=2
+        )
+
+        assert_mock_call_matches_signature(
+            mock_evaluate_test_cases, evaluate_test_cases
+        )
+        mock_evaluate_test_cases.assert_called_once_with(
+            mock_test_cases,
+            run_metrics,
+            max_concurrent=40,
+            max_concurrent_per_judge=None,
+            ignore_errors=True,
         )
 
-    def test_runs_evaluate_n_times(
+    def test_uses_evaluation_config(
         self,
         mock_test_cases,
-        mock_metrics,
         mock_task_config,
-        mock_deepeval_evaluate,
+        mock_evaluate_test_cases,
         mock_project_root,
     ):
-        run_deepeval_evaluation(
-            mock_test_cases, mock_task_config, mock_project_root, n_runs=2
+        mock_task_config.evaluation = EvaluationConfig(
+            max_concurrent=5, max_concurrent_per_judge=2
         )
-        assert_mock_call_matches_signature(mock_deepeval_evaluate, deepeval_evaluate)
-        mock_deepeval_evaluate.assert_called_with(
-            test_cases=mock_test_cases, metrics=mock_metrics
+
+        run_deepeval_evaluation(
+            mock_test_cases, mock_task_config, mock_project_root, ignore_errors=False
         )
 
-        assert mock_deepeval_evaluate.call_count == 2
+        assert mock_evaluate_test_cases.call_args.kwargs == {
+            "max_concurrent": 5,
+            "max_concurrent_per_judge": 2,
+            "ignore_errors": False,
+        }
 
     def test_returns_a_list_for_each_n_runs(
         self, mock_test_cases, mock_task_config, mock_project_root
@@ -92,45 +113,15 @@ class TestRunDeepEvalEvaluation:
             mock_test_cases, mock_task_config, mock_project_root, n_runs=2
         )
         assert len(results) == 2
-
-    def test_accepts_deepeval_options(
-        self,
-        mock_test_cases,
-        mock_metrics,
-        mock_task_config,
-        mock_deepeval_evaluate,
-        mock_project_root,
-    ):
-        run_deepeval_evaluation(
-            mock_test_cases,
-            mock_task_config,
-            mock_project_root,
-            display_config=DisplayConfig(print_results=True),
-            async_config=AsyncConfig(max_concurrent=10),
-            cache_config=CacheConfig(use_cache=True),
-            error_config=ErrorConfig(ignore_errors=False),
-        )
-
-        assert_mock_call_matches_signature(mock_deepeval_evaluate, deepeval_evaluate)
-
-        mock_deepeval_evaluate.assert_called_with(
-            test_cases=mock_test_cases,
-            metrics=mock_metrics,
-            display_config=DisplayConfig(print_results=True),
-            async_config=AsyncConfig(max_concurrent=10),
-            cache_config=CacheConfig(use_cache=True),
-            error_config=ErrorConfig(ignore_errors=False),
-        )
+        assert all(isinstance(result, TestResult) for result in results[0])
+        assert [result.name for result in results[0]] == [
+            "test_case_0",
+            "test_case_1",
+        ]
 
     def test_evaluate_and_output_results_writes_deepeval_test_run(
-        self, mock_test_cases, mock_task_config, mocker, mock_project_root, caplog
+        self, mock_test_cases, mock_task_config, mock_project_root, caplog
     ):
-        test_run = mocker.create_autospec(DeepevalTestRun, instance=True)
-        test_run.model_dump.return_value = {"id": "test-run-123"}
-        mocker.patch(
-            "govuk_chat_evaluation.rag_answers.deepeval_evaluate.global_test_run_manager.get_test_run",
-            return_value=test_run,
-        )
         caplog.set_level(logging.INFO)
 
         n_runs = 2
@@ -144,15 +135,40 @@ class TestRunDeepEvalEvaluation:
 
             with output_path.open() as f:
                 data = json.load(f)
-                assert data == {"id": "test-run-123"}
+                assert [case["name"] for case in data["testCases"]] == [
+                    "test_case_0",
+                    "test_case_1",
+                ]
+                assert data["testPassed"] == 2
+                assert {score["metric"] for score in data["metricsScores"]} == {
+                    "faithfulness",
+                    "bias",
+                }
 
             assert (
-                f"Run {i + 1} done. written to {output_path.relative_to(mock_project_root)}"
+                f"Run written to {output_path.relative_to(mock_project_root)}"
                 in caplog.text
             )
 
-        assert test_run.model_dump.call_count == n_runs
-        test_run.model_dump.assert_called_with(by_alias=True, exclude_none=True)
+    def test_logs_tokens_saved_by_converting_context_html(
+        self, mock_test_cases, mock_task_config, mock_project_root, caplog
+    ):
+        caplog.set_level(logging.INFO)
+        mock_test_cases[0].metadata["structured_contexts"] = [
+            StructuredContext(
+                title="VAT",
+                heading_hierarchy=[],
+                html_content='<div class="govspeak"><p>VAT rates</p></div>',
+                exact_path="/vat",
+                base_path="/vat",
+            )
+        ]
+
+        run_deepeval_evaluation(
+            mock_test_cases, mock_task_config, mock_project_root, n_runs=1
+        )
+
+        assert "saves about 8 of 11 tokens (73%)" in caplog.text
 
     def test_evaluate_and_output_results_raises_if_no_test_run(
         self,
@@ -162,7 +178,7 @@ class TestRunDeepEvalEvaluation:
         mock_project_root,
     ):
         mocker.patch(
-            "govuk_chat_evaluation.rag_answers.deepeval_evaluate.global_test_run_manager.get_test_run",
+            "govuk_chat_evaluation.rag_answers.deepeval_evaluate.TestRunManager.get_test_run",
             return_value=None,
         )
 
@@ -171,7 +187,64 @@ class TestRunDeepEvalEvaluation:
                 mock_test_cases, mock_task_config, mock_project_root, n_runs=1
             )
 
-        assert str(exc_info.value) == "DeepEval test run not found for run 1"
+        assert (
+            str(exc_info.value)
+            == "DeepEval test run not found for deepeval_test_run_1.json"
+        )
+
+    @pytest.mark.parametrize(
+        "freeze_across_runs, expected_stores", [(False, 2), (True, 1)]
+    )
+    def test_artefact_stores_for_runs(
+        self,
+        mock_test_cases,
+        mock_task_config,
+        mock_project_root,
+        freeze_across_runs,
+        expected_stores,
+    ):
+        mock_task_config.artefact_store = ArtefactStoreConfig(
+            freeze_across_runs=freeze_across_runs
+        )
+        mock_task_config.metric_instances.return_value = []
+
+        run_deepeval_evaluation(
+            mock_test_cases, mock_task_config, mock_project_root, n_runs=2
+        )
+
+        stores = {
+            id(call.args[2])
+            for call in mock_task_config.metric_instances.call_args_list
+        }
+        assert len(stores) == expected_stores
+
+    def test_writes_fact_classification_cache_stats(
+        self, mock_test_cases, mock_task_config, mock_project_root
+    ):
+        def metric_instances(
+            fact_classification_cache,
+            judge_response_cache,
+            artefact_store,
+            judge_registry,
+        ):
+            fact_classification_cache.get("model", "answer", "ground truth")
+            return []
+
+        mock_task_config.metric_instances.side_effect = metric_instances
+
+        # a second evaluation in the same output directory, as with streamed
+        # batches, adds to the first's statistics
+        for _ in range(2):
+            run_deepeval_evaluation(
+                mock_test_cases, mock_task_config, mock_project_root, n_runs=2
+            )
+
+        stats_path = mock_project_root / "fact_classification_cache_stats.json"
+        assert json.loads(stats_path.read_text()) == {
+            "hits": 0,
+            "misses": 4,
+            "evictions": 0,
+        }
 
 
 class TestConvertDeepEvalOutput:
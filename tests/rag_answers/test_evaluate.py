@@ -8,7 +8,9 @@ import pytest
 import yaml
 from pandas.testing import assert_series_equal
 
+from govuk_chat_evaluation.file_system import jsonl_to_models
 from govuk_chat_evaluation.rag_answers.data_models import (
+    EvaluationTestCase,
     TaskConfig,
 )
 from govuk_chat_evaluation.rag_answers.deepeval_evaluate import (
@@ -18,6 +20,7 @@ from govuk_chat_evaluation.rag_answers.deepeval_evaluate import (
 from govuk_chat_evaluation.rag_answers.evaluate import (
     AggregatedResults,
     evaluate_and_output_results,
+    stream_evaluate_and_output_results,
 )
 from tests.conftest import assert_csv_exists_with_headers
 
@@ -209,6 +212,34 @@ def test_evaluate_and_output_results_copes_with_empty_data(
     assert "There is no data to evaluate" in caplog.text
 
 
+def test_stream_evaluate_and_output_results_evaluates_each_batch(
+    tmp_path, mock_input_data, mock_evaluation_config, mock_run_deepeval_evaluation
+):
+    models = jsonl_to_models(mock_input_data, EvaluationTestCase)
+
+    stream_evaluate_and_output_results(
+        tmp_path, iter([models[:1], models[1:]]), mock_evaluation_config
+    )
+
+    assert mock_run_deepeval_evaluation.call_count == 2
+    assert [
+        call.kwargs["test_run_suffix"]
+        for call in mock_run_deepeval_evaluation.call_args_list
+    ] == ["_part_1", "_part_2"]
+    assert (tmp_path / "results_summary.csv").exists()
+
+
+def test_stream_evaluate_and_output_results_copes_with_no_batches(
+    tmp_path, mock_evaluation_config, mock_run_deepeval_evaluation, caplog
+):
+    caplog.set_level(logging.ERROR)
+
+    stream_evaluate_and_output_results(tmp_path, iter([]), mock_evaluation_config)
+
+    mock_run_deepeval_evaluation.assert_not_called()
+    assert "There is no data to evaluate" in caplog.text
+
+
 @pytest.mark.usefixtures("mock_run_deepeval_evaluation")
 def test_evaluate_and_output_results_calls_ensure_unique_model_ids(
     tmp_path, mock_input_data, mock_evaluation_config
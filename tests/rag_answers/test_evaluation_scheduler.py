@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+from deepeval.metrics import BaseMetric
+from deepeval.test_case import LLMTestCase
+
+from govuk_chat_evaluation.rag_answers.evaluation_scheduler import (
+    evaluate_test_cases,
+)
+
+
+class ConcurrencyTracker:
+    def __init__(self):
+        self.running: dict[str | None, int] = {}
+        self.max_running: dict[str | None, int] = {}
+        self.max_running_total = 0
+
+    def start(self, judge: str | None):
+        self.running[judge] = self.running.get(judge, 0) + 1
+        self.max_running[judge] = max(
+            self.max_running.get(judge, 0), self.running[judge]
+        )
+        self.max_running_total = max(self.max_running_total, sum(self.running.values()))
+
+    def finish(self, judge: str | None):
+        self.running[judge] -= 1
+
+
+class LengthMetric(BaseMetric):
+    def __init__(
+        self,
+        name: str = "length",
+        threshold: float = 0.5,
+        judge: str = "judge",
+        raise_error: str | None = None,
+        tracker: ConcurrencyTracker | None = None,
+    ):
+        self.name = name
+        self.threshold = threshold
+        self.judge = judge
+        self.evaluation_model = judge
+        # attributes are named after the arguments for DeepEval's copy_metrics
+        self.raise_error = raise_error
+        self.tracker = tracker or ConcurrencyTracker()
+
+    async def a_measure(self, test_case: LLMTestCase, *args, **kwargs) -> float:
+        self.tracker.start(self.evaluation_model)
+        try:
+            await asyncio.sleep(0.01)
+            if self.raise_error:
+                raise RuntimeError(self.raise_error)
+            score = len(test_case.actual_output or "") / 10
+            self.score = score
+            self.success = score >= (self.threshold or 0)
+            self.evaluation_cost = 0.1
+            return score
+        finally:
+            self.tracker.finish(self.evaluation_model)
+
+    def measure(self, test_case: LLMTestCase, *args, **kwargs) -> float:
+        raise NotImplementedError
+
+    def is_successful(self) -> bool:
+        return bool(self.success)
+
+    @property
+    def __name__(self):  # type: ignore[override]
+        return self.name
+
+
+@pytest.fixture
+def cases():
+    return [
+        LLMTestCase(name=f"case_{i}", input=f"Question {i}", actual_output="x" * i)
+        for i in range(1, 5)
+    ]
+
+
+class TestEvaluateTestCases:
+    @pytest.mark.asyncio
+    async def test_returns_metric_data_for_each_run_and_case(self, cases):
+        run_metrics = [
+            [LengthMetric("first"), LengthMetric("second", threshold=0.3)],
+            [LengthMetric("first"), LengthMetric("second", threshold=0.3)],
+        ]
+
+        runs = await evaluate_test_cases(cases, run_metrics, max_concurrent=5)
+
+        assert len(runs) == 2
+        for run in runs:
+            assert [api_test_case.name for api_test_case in run] == [
+                "case_1",
+                "case_2",
+                "case_3",
+                "case_4",
+            ]
+            last_case = run[3]
+            assert last_case.metrics_data is not None
+            assert [(m.name, m.score) for m in last_case.metrics_data] == [
+                ("first", 0.4),
+                ("second", 0.4),
+            ]
+            assert last_case.evaluation_cost == pytest.approx(0.2)
+            assert [api_test_case.success for api_test_case in run] == [
+                False,
+                False,
+                False,
+                False,
+            ]
+
+    @pytest.mark.asyncio
+    async def test_does_not_change_the_given_metrics(self, cases):
+        metric = LengthMetric()
+
+        await evaluate_test_cases(cases, [[metric]], max_concurrent=5)
+
+        assert metric.score is None
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrency(self, cases):
+        tracker = ConcurrencyTracker()
+        run_metrics = [
+            [LengthMetric(judge="a", tracker=tracker)],
+            [LengthMetric(judge="b", tracker=tracker)],
+        ]
+
+        await evaluate_test_cases(cases, run_metrics, max_concurrent=3)
+
+        assert tracker.max_running_total == 3
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrency_per_judge(self, cases):
+        tracker = ConcurrencyTracker()
+        run_metrics = [
+            [
+                LengthMetric("first", judge="a", tracker=tracker),
+                LengthMetric("second", judge="b", tracker=tracker),
+            ]
+        ]
+
+        await evaluate_test_cases(
+            cases, run_metrics, max_concurrent=8, max_concurrent_per_judge=2
+        )
+
+        assert tracker.max_running == {"a": 2, "b": 2}
+        assert tracker.max_running_total == 4
+
+    @pytest.mark.asyncio
+    async def test_records_metric_errors(self, cases):
+        runs = await evaluate_test_cases(
+            cases, [[LengthMetric(raise_error="Judge failed")]], max_concurrent=5
+        )
+
+        metrics_data = runs[0][0].metrics_data
+        assert metrics_data is not None
+        assert metrics_data[0].error == "Judge failed"
+        assert metrics_data[0].success is False
+
+    @pytest.mark.asyncio
+    async def test_raises_metric_errors_unless_ignored(self, cases):
+        with pytest.raises(RuntimeError, match="Judge failed"):
+            await evaluate_test_cases(
+                cases,
+                [[LengthMetric(raise_error="Judge failed")]],
+                max_concurrent=5,
+                ignore_errors=False,
+            )
@@ -1,8 +1,11 @@
+import asyncio
 import json
+import threading
 from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from govuk_chat_evaluation.file_system import jsonl_to_models
 from govuk_chat_evaluation.rag_answers.data_models import (
     EvaluationTestCase,
     GenerateInput,
@@ -11,6 +14,7 @@ from govuk_chat_evaluation.rag_answers.data_models import (
 from govuk_chat_evaluation.rag_answers.generate import (
     generate_and_write_dataset,
     generate_inputs_to_evaluation_test_cases,
+    stream_generated_dataset,
 )
 
 
@@ -187,3 +191,123 @@ def test_generate_and_write_dataset_calls_ensure_unique_model_ids(
         mock.side_effect = lambda inputs: inputs
         generate_and_write_dataset(mock_input_data, None, mock_project_root)
         mock.assert_called_once()
+
+
+def test_generate_and_write_dataset_resumes_from_previous_output(
+    run_rake_task_mock, mock_project_root
+):
+    input_path = mock_project_root / "input.jsonl"
+    input_path.write_text(
+        '{"id": "question-1", "question": "Question 1"}\n'
+        '{"id": "question-2", "question": "Question 2"}\n'
+    )
+    previous_output = generate_and_write_dataset(input_path, None, mock_project_root)
+    first_generated = previous_output.read_text().splitlines()[0]
+    previous_output.write_text(first_generated + "\n")
+    run_rake_task_mock.reset_mock()
+
+    output_dir = mock_project_root / "resumed"
+    output_dir.mkdir()
+    path = generate_and_write_dataset(
+        input_path, None, output_dir, resume_dir=mock_project_root
+    )
+
+    assert run_rake_task_mock.call_count == 1
+    generated = jsonl_to_models(path, EvaluationTestCase)
+    assert sorted(model.question for model in generated) == [
+        "Question 1",
+        "Question 2",
+    ]
+
+
+def test_generate_and_write_dataset_resumes_inputs_without_ids_by_question(
+    run_rake_task_mock, mock_project_root
+):
+    input_path = mock_project_root / "input.jsonl"
+    input_path.write_text('{"question": "Question 1"}\n{"question": "Question 2"}\n')
+    previous_output = generate_and_write_dataset(input_path, None, mock_project_root)
+    first_generated = previous_output.read_text().splitlines()[0]
+    previous_output.write_text(first_generated + "\n")
+    run_rake_task_mock.reset_mock()
+
+    output_dir = mock_project_root / "resumed"
+    output_dir.mkdir()
+    path = generate_and_write_dataset(
+        input_path, None, output_dir, resume_dir=mock_project_root
+    )
+
+    assert run_rake_task_mock.call_count == 1
+    generated = jsonl_to_models(path, EvaluationTestCase)
+    assert sorted(model.question for model in generated) == [
+        "Question 1",
+        "Question 2",
+    ]
+
+
+@pytest.mark.usefixtures("run_rake_task_mock")
+def test_stream_generated_dataset_yields_batches_and_writes_dataset(
+    mock_input_data, mock_project_root
+):
+    batches = list(stream_generated_dataset(mock_input_data, None, mock_project_root))
+
+    assert len(batches) == 1
+    assert sorted(test_case.question for test_case in batches[0]) == [
+        "Question 1",
+        "Question 2",
+    ]
+    generated = jsonl_to_models(
+        mock_project_root / "generated.jsonl", EvaluationTestCase
+    )
+    assert len(generated) == 2
+
+
+@pytest.mark.usefixtures("run_rake_task_mock")
+def test_stream_generated_dataset_yields_batches_of_min_batch_size(
+    mock_input_data, mock_project_root
+):
+    batches = list(
+        stream_generated_dataset(
+            mock_input_data, None, mock_project_root, min_batch_size=1
+        )
+    )
+
+    assert sum(len(batch) for batch in batches) == 2
+    assert all(batch for batch in batches)
+
+
+def test_stream_generated_dataset_raises_generation_errors(
+    mock_input_data, mock_project_root, mocker
+):
+    mocker.patch(
+        "govuk_chat_evaluation.rag_answers.generate.generate_inputs_to_evaluation_test_cases",
+        side_effect=RuntimeError("Contrived failure"),
+    )
+
+    with pytest.raises(RuntimeError, match="Contrived failure"):
+        list(stream_generated_dataset(mock_input_data, None, mock_project_root))
+
+
+def test_stream_generated_dataset_stops_generating_when_closed(
+    run_rake_task_mock, mock_input_data, mock_project_root
+):
+    generate_answer = run_rake_task_mock.side_effect
+    cancelled = threading.Event()
+
+    async def run_rake_task(task_name, env):
+        if env["INPUT"] == "Question 2":
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return generate_answer()
+
+    run_rake_task_mock.side_effect = run_rake_task
+
+    batches = stream_generated_dataset(
+        mock_input_data, None, mock_project_root, min_batch_size=1
+    )
+    assert [test_case.question for test_case in next(batches)] == ["Question 1"]
+    batches.close()
+
+    assert cancelled.is_set()
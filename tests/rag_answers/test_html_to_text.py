@@ -0,0 +1,55 @@
+import pytest
+
+from govuk_chat_evaluation.rag_answers.html_to_text import html_to_text
+
+
+class TestHtmlToText:
+    def test_keeps_headings_and_paragraphs(self):
+        html = '<div class="govspeak"><h2 id="apply">Apply</h2><p>Apply  <a href="/apply">online</a>.</p></div>'
+
+        assert html_to_text(html) == "## Apply\nApply online."
+
+    def test_keeps_lists(self):
+        html = "<ul><li>first</li><li>second<ol><li><p>nested</p></li></ol></li></ul>"
+
+        assert html_to_text(html) == "- first\n- second\n  1. nested"
+
+    def test_keeps_tables(self):
+        html = (
+            "<table><thead><tr><th>Band</th><th>Rate</th></tr></thead>"
+            "<tbody><tr><td><p>Basic</p></td><td>20%</td></tr></tbody></table>"
+        )
+
+        assert html_to_text(html) == "| Band | Rate |\n| --- | --- |\n| Basic | 20% |"
+
+    @pytest.mark.parametrize(
+        "cell, expected",
+        [
+            ("<p>Basic</p><p>rate</p>", "Basic / rate"),
+            ("£100<br>per week", "£100 / per week"),
+            ("1<br>2", "1 / 2"),
+            ("<ul><li>a</li><li>b</li></ul>", "a / b"),
+        ],
+    )
+    def test_keeps_blocks_apart_in_table_cells(self, cell, expected):
+        html = f"<table><tr><th>Band</th></tr><tr><td>{cell}</td></tr></table>"
+
+        assert html_to_text(html) == f"| Band |\n| --- |\n| {expected} |"
+
+    def test_decodes_entities_and_removes_scripts(self):
+        html = "<p>You&rsquo;re eligible</p><script>track()</script><style>p {}</style>"
+
+        assert html_to_text(html) == "You’re eligible"
+
+    def test_plain_text_is_unchanged(self):
+        assert html_to_text("No markup here") == "No markup here"
+
+    def test_keeps_the_lines_of_plain_text(self):
+        text = "Eligibility:\n\n-  over 18\n-\tresident in the UK\n"
+
+        assert html_to_text(text) == "Eligibility:\n\n- over 18\n- resident in the UK"
+
+    def test_keeps_the_lines_of_preformatted_text(self):
+        html = "<p>Write to:\n</p><pre>\nHMRC\nBX9  1AS\n</pre><p>or\n call</p>"
+
+        assert html_to_text(html) == "Write to:\nHMRC\nBX9 1AS\nor call"
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+from deepeval.models.base_model import DeepEvalBaseLLM
+
+from govuk_chat_evaluation.rag_answers.judge_hedging import (
+    HedgingPolicy,
+    JudgeHedger,
+    attach_hedging_to_model,
+)
+
+PROMPT = "prompt"
+PROMPT_TOKENS = 2
+
+
+def primed_hedger(latency: float = 0.01, max_hedge_rate: float = 1) -> JudgeHedger:
+    """A hedger that has seen enough requests to hedge PROMPT"""
+    hedger = JudgeHedger(HedgingPolicy(max_hedge_rate=max_hedge_rate))
+    for _ in range(hedger.policy.min_samples):
+        hedger.record_latency(PROMPT_TOKENS, latency)
+    hedger.requests = hedger.policy.min_samples
+    return hedger
+
+
+class TestJudgeHedger:
+    def test_no_hedge_delay_without_enough_latencies(self):
+        hedger = JudgeHedger(HedgingPolicy(min_samples=3))
+        hedger.record_latency(100, 1.0)
+        hedger.record_latency(100, 2.0)
+
+        assert hedger.hedge_delay(100) is None
+
+    def test_hedge_delay_is_the_percentile_for_the_prompt_size(self):
+        hedger = JudgeHedger(HedgingPolicy(percentile=90, min_samples=10))
+        for latency in range(1, 11):
+            hedger.record_latency(100, float(latency))
+            hedger.record_latency(1000, latency * 10.0)
+
+        assert hedger.hedge_delay(100) == 9.0
+        # prompts of a similar size share latencies
+        assert hedger.hedge_delay(120) == 9.0
+        assert hedger.hedge_delay(1000) == 90.0
+
+    def test_try_hedge_is_capped_by_the_hedge_rate(self):
+        hedger = JudgeHedger(HedgingPolicy(max_hedge_rate=0.1))
+        hedger.requests = 20
+
+        assert [hedger.try_hedge() for _ in range(3)] == [True, True, False]
+        assert hedger.hedges == 2
+
+    def test_log_stats(self, caplog):
+        hedger = JudgeHedger(HedgingPolicy())
+        hedger.requests = 40
+        hedger.hedges = 2
+        hedger.hedge_wins = 1
+        hedger.extra_cost = 0.0125
+
+        with caplog.at_level("INFO"):
+            hedger.log_stats("judge")
+
+        assert (
+            "Hedged 2 of 40 requests to judge (5.0%), the hedge returned first "
+            "1 times, costing about $0.0125 extra"
+        ) in caplog.text
+
+
+class TestAttachHedgingToModel:
+    @pytest.fixture
+    def make_model(self, mocker):
+        def _make(outcomes, hedger):
+            """outcomes are (seconds, result) for each call, where a result
+            that's an exception is raised"""
+            calls = iter(outcomes)
+
+            async def generate(prompt, schema=None):
+                seconds, result = next(calls)
+                await asyncio.sleep(seconds)
+                if isinstance(result, Exception):
+                    raise result
+                return result
+
+            original = mocker.AsyncMock(side_effect=generate)
+            model = mocker.create_autospec(DeepEvalBaseLLM, instance=True)
+            model.a_generate = original
+            attach_hedging_to_model(model, hedger)
+            return model, original
+
+        return _make
+
+    @pytest.mark.asyncio
+    async def test_uses_the_hedge_when_it_returns_first(self, make_model):
+        hedger = primed_hedger()
+        model, original = make_model([(1, ("slow", 0.2)), (0, ("hedge", 0.1))], hedger)
+
+        assert await model.a_generate(PROMPT) == ("hedge", 0.1)
+        assert original.await_count == 2
+        assert (hedger.hedges, hedger.hedge_wins) == (1, 1)
+        assert hedger.extra_cost == pytest.approx(0.1)
+
+    @pytest.mark.asyncio
+    async def test_does_not_hedge_quick_requests(self, make_model):
+        hedger = primed_hedger(latency=1)
+        model, original = make_model([(0, ("quick", 0.1))], hedger)
+
+        assert await model.a_generate(PROMPT) == ("quick", 0.1)
+        assert original.await_count == 1
+        assert hedger.hedges == 0
+
+    @pytest.mark.asyncio
+    async def test_does_not_hedge_without_enough_latencies(self, make_model):
+        hedger = JudgeHedger(HedgingPolicy(max_hedge_rate=1))
+        model, original = make_model([(0.05, ("slow", 0.1))], hedger)
+
+        assert await model.a_generate(PROMPT) == ("slow", 0.1)
+        assert original.await_count == 1
+        assert hedger.hedge_delay(PROMPT_TOKENS) is None
+
+    @pytest.mark.asyncio
+    async def test_does_not_hedge_over_the_hedge_rate(self, make_model):
+        hedger = primed_hedger(max_hedge_rate=0.01)
+        model, original = make_model([(0.05, ("slow", 0.1))], hedger)
+
+        assert await model.a_generate(PROMPT) == ("slow", 0.1)
+        assert original.await_count == 1
+        assert hedger.hedges == 0
+
+    @pytest.mark.asyncio
+    async def test_waits_for_the_request_when_the_hedge_fails(self, make_model):
+        hedger = primed_hedger()
+        model, _ = make_model(
+            [(0.05, ("slow", 0.2)), (0, ValueError("invalid JSON"))], hedger
+        )
+
+        assert await model.a_generate(PROMPT) == ("slow", 0.2)
+        assert hedger.hedge_wins == 0
+
+    @pytest.mark.asyncio
+    async def test_raises_the_requests_error_when_both_fail(self, make_model):
+        hedger = primed_hedger()
+        model, _ = make_model(
+            [(0.05, ValueError("request")), (0, ValueError("hedge"))], hedger
+        )
+
+        with pytest.raises(ValueError, match="request"):
+            await model.a_generate(PROMPT)
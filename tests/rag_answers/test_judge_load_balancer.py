@@ -0,0 +1,302 @@
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import cast
+from urllib.parse import unquote
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+from deepeval.config.settings import get_settings
+from deepeval.models.llms.amazon_bedrock_model import AmazonBedrockModel
+from deepeval.test_case import LLMTestCase
+from tenacity import Future, RetryError
+
+from govuk_chat_evaluation.rag_answers import judge_load_balancer
+from govuk_chat_evaluation.rag_answers.custom_deepeval.metrics import (
+    AbsenceOfFactualContradictions,
+)
+from govuk_chat_evaluation.rag_answers.data_models import (
+    LLMJudgeModel,
+    LLMJudgeModelConfig,
+)
+from govuk_chat_evaluation.rag_answers.data_models.config import EvaluationConfig
+from govuk_chat_evaluation.rag_answers.judge_load_balancer import (
+    BedrockRoute,
+    LoadBalancedBedrockModel,
+    is_route_failure,
+)
+
+
+def client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "Converse")
+
+
+def retry_error(exc: Exception) -> RetryError:
+    attempt = Future(attempt_number=1)
+    attempt.set_exception(exc)
+    return RetryError(attempt)
+
+
+@pytest.fixture
+def make_balanced_model(mocker):
+    def _make(*outcomes_per_route):
+        routes = []
+        for index, outcomes in enumerate(outcomes_per_route):
+            model = mocker.create_autospec(AmazonBedrockModel, instance=True)
+            model.a_generate = mocker.AsyncMock(side_effect=list(outcomes))
+            routes.append((BedrockRoute(f"region-{index}"), model))
+
+        return LoadBalancedBedrockModel("judge", routes), [m for _, m in routes]
+
+    return _make
+
+
+@pytest.fixture
+def first_candidate(mocker):
+    """Choose the first route that's a candidate, rather than at random"""
+    return mocker.patch.object(
+        judge_load_balancer.random,
+        "choices",
+        side_effect=lambda candidates, weights: [candidates[0]],
+    )
+
+
+class TestLoadBalancedBedrockModel:
+    def test_requires_a_route(self):
+        with pytest.raises(ValueError, match="at least one route"):
+            LoadBalancedBedrockModel("judge", [])
+
+    @pytest.mark.asyncio
+    async def test_fails_over_to_another_route(
+        self, make_balanced_model, first_candidate
+    ):
+        model, (first, second) = make_balanced_model(
+            [client_error("ThrottlingException")], [("output", 0.1)] * 2
+        )
+
+        assert await model.a_generate("prompt") == ("output", 0.1)
+        # the throttled route is cooling down, so the next request avoids it
+        assert await model.a_generate("prompt") == ("output", 0.1)
+
+        assert first.a_generate.await_count == 1
+        assert second.a_generate.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_raises_when_every_route_fails(
+        self, make_balanced_model, first_candidate
+    ):
+        model, routes = make_balanced_model(
+            [client_error("ThrottlingException")],
+            [EndpointConnectionError(endpoint_url="https://bedrock")],
+        )
+
+        with pytest.raises(EndpointConnectionError):
+            await model.a_generate("prompt")
+
+        assert all(route.a_generate.await_count == 1 for route in routes)
+
+    @pytest.mark.asyncio
+    async def test_raises_other_errors_without_failing_over(
+        self, make_balanced_model, first_candidate
+    ):
+        model, (_, second) = make_balanced_model(
+            [ValueError("invalid JSON")], [("output", 0.1)]
+        )
+
+        with pytest.raises(ValueError):
+            await model.a_generate("prompt")
+
+        second.a_generate.assert_not_awaited()
+
+    def test_weights_routes_by_latency_and_error_rate(
+        self, make_balanced_model, first_candidate
+    ):
+        model, _ = make_balanced_model([], [], [])
+        model._stats[0].record_success(1.0)
+        model._stats[1].record_success(4.0)
+        model._stats[2].record_success(1.0)
+        model._stats[2].record_failure()
+
+        model._choose_route(set())
+
+        _, weights = first_candidate.call_args.args
+        assert weights == pytest.approx([1.0, 0.25, 0.8])
+
+    def test_routes_without_a_latency_are_weighted_as_the_average(
+        self, make_balanced_model, first_candidate
+    ):
+        model, _ = make_balanced_model([], [], [])
+        model._stats[0].record_success(1.0)
+        model._stats[1].record_success(3.0)
+
+        model._choose_route(set())
+
+        _, weights = first_candidate.call_args.args
+        assert weights == pytest.approx([1.0, 1 / 3, 0.5])
+
+    def test_get_model_name_is_the_judge_model(self, make_balanced_model):
+        model, _ = make_balanced_model([])
+
+        assert model.get_model_name() == "judge"
+
+
+@pytest.mark.parametrize(
+    "exc, expected",
+    [
+        (client_error("ThrottlingException"), True),
+        (client_error("ServiceUnavailableException"), True),
+        (EndpointConnectionError(endpoint_url="https://bedrock"), True),
+        (client_error("ValidationException"), False),
+        (ValueError("invalid JSON"), False),
+        (retry_error(client_error("ServiceUnavailableException")), True),
+    ],
+)
+def test_is_route_failure(exc, expected):
+    assert is_route_failure(exc) is expected
+
+
+class StubBedrock(ThreadingHTTPServer):
+    """A local Bedrock runtime endpoint that answers Converse requests with
+    answer, or throttles every request"""
+
+    def __init__(self, throttle: bool, answer: str = "answer"):
+        super().__init__(("127.0.0.1", 0), StubBedrockHandler)
+        self.throttle = throttle
+        self.answer = answer
+        self.model_ids: list[str] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubBedrockHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        stub = cast(StubBedrock, self.server)
+        self.rfile.read(int(self.headers["Content-Length"]))
+        stub.model_ids.append(unquote(self.path.split("/")[2]))
+
+        if stub.throttle:
+            status = 429
+            headers = {"x-amzn-ErrorType": "ThrottlingException"}
+            body = {"message": "Too many requests"}
+        else:
+            status = 200
+            headers = {}
+            body = {
+                "output": {
+                    "message": {"role": "assistant", "content": [{"text": stub.answer}]}
+                },
+                "stopReason": "end_turn",
+                "usage": {"inputTokens": 10, "outputTokens": 2, "totalTokens": 12},
+                "metrics": {"latencyMs": 1},
+            }
+
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_bedrock() -> Iterator[tuple[StubBedrock, StubBedrock]]:
+    stubs = (StubBedrock(throttle=True), StubBedrock(throttle=False))
+    threads = [threading.Thread(target=stub.serve_forever) for stub in stubs]
+    for thread in threads:
+        thread.start()
+
+    yield stubs
+
+    for stub, thread in zip(stubs, threads):
+        stub.shutdown()
+        stub.server_close()
+        thread.join()
+
+
+@pytest.fixture
+def stub_routes_registry(stub_bedrock, monkeypatch):
+    """A judge registry routing GPT OSS 120B to the throttled stub endpoint and
+    the available one"""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    # fail over straight away rather than retrying the throttled stub
+    monkeypatch.setattr(get_settings(), "DEEPEVAL_RETRY_MAX_ATTEMPTS", 1)
+    throttled, available = stub_bedrock
+    return EvaluationConfig.model_validate(
+        {
+            "judge_routes": [
+                {
+                    "model": "openai.gpt-oss-120b-1:0",
+                    "routes": [
+                        {"region": "eu-west-1", "endpoint_url": throttled.url},
+                        {
+                            "region": "us-west-2",
+                            "inference_profile": "us.openai.gpt-oss-120b-1:0",
+                            "endpoint_url": available.url,
+                        },
+                    ],
+                }
+            ]
+        }
+    ).judge_registry()
+
+
+@pytest.mark.asyncio
+async def test_balances_requests_across_stub_endpoints(
+    stub_bedrock, stub_routes_registry, first_candidate
+):
+    throttled, available = stub_bedrock
+    judge = LLMJudgeModelConfig(model=LLMJudgeModel.GPT_OSS_120B).instantiate_llm_judge(
+        judge_registry=stub_routes_registry
+    )
+    try:
+        output, _ = await judge.a_generate("prompt")
+    finally:
+        await stub_routes_registry.close()
+
+    assert output == "answer"
+    assert throttled.model_ids
+    assert set(throttled.model_ids) == {"openai.gpt-oss-120b-1:0"}
+    assert available.model_ids == ["us.openai.gpt-oss-120b-1:0"]
+
+
+@pytest.mark.asyncio
+async def test_measures_a_metric_with_stub_endpoints(
+    stub_bedrock, stub_routes_registry, first_candidate
+):
+    _, available = stub_bedrock
+    # an answer that suits each of the metric's schemas
+    available.answer = json.dumps(
+        {
+            "truths": ["Einstein won the Nobel Prize"],
+            "claims": ["Einstein won the Nobel Prize"],
+            "verdicts": [{"verdict": "yes"}],
+            "reason": "No contradictions",
+        }
+    )
+    judge = LLMJudgeModelConfig(model=LLMJudgeModel.GPT_OSS_120B).instantiate_llm_judge(
+        judge_registry=stub_routes_registry
+    )
+    metric = AbsenceOfFactualContradictions(model=judge)
+    test_case = LLMTestCase(
+        input="What did Einstein win?",
+        actual_output="Einstein won the Nobel Prize.",
+        expected_output="Einstein won the Nobel Prize in 1921.",
+    )
+    try:
+        score = await metric.a_measure(test_case, _show_indicator=False)
+    finally:
+        await stub_routes_registry.close()
+
+    assert metric.using_native_model
+    assert score == 1.0
+    assert metric.reason == "No contradictions"
+    assert metric.evaluation_cost is not None
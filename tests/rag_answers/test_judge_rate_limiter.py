@@ -0,0 +1,195 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from botocore.exceptions import ClientError
+from deepeval.models.base_model import DeepEvalBaseLLM
+from openai import RateLimitError
+from tenacity import Future, RetryError
+
+from govuk_chat_evaluation.rag_answers import judge_rate_limiter
+from govuk_chat_evaluation.rag_answers.judge_rate_limiter import (
+    JudgeRateLimiter,
+    attach_rate_limiter_to_model,
+    is_throttling_error,
+)
+
+
+def client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "Converse")
+
+
+def retry_error(exc: Exception) -> RetryError:
+    attempt = Future(attempt_number=1)
+    attempt.set_exception(exc)
+    return RetryError(attempt)
+
+
+@pytest.fixture
+def clock(mocker):
+    """A fake clock that asyncio.sleep advances, with jitter removed"""
+    now = [1000.0]
+    sleeps: list[float] = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    mocker.patch.object(judge_rate_limiter.time, "monotonic", lambda: now[0])
+    mocker.patch.object(judge_rate_limiter.asyncio, "sleep", sleep)
+    mocker.patch.object(judge_rate_limiter.random, "uniform", lambda a, b: b)
+    return sleeps
+
+
+class TestJudgeRateLimiter:
+    @pytest.mark.asyncio
+    async def test_waits_when_requests_are_over_budget(self, clock):
+        limiter = JudgeRateLimiter(requests_per_minute=60)
+
+        for _ in range(60):
+            await limiter.acquire(tokens=100)
+        assert clock == []
+
+        await limiter.acquire(tokens=100)
+        assert clock == [pytest.approx(1.0)]
+        assert limiter.waited_seconds == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_waits_when_tokens_are_over_budget(self, clock):
+        limiter = JudgeRateLimiter(tokens_per_minute=6000)
+
+        await limiter.acquire(tokens=6000)
+        await limiter.acquire(tokens=1000)
+
+        assert clock == [pytest.approx(10.0)]
+
+    @pytest.mark.asyncio
+    async def test_requests_larger_than_the_token_budget_wait_for_all_of_it(
+        self, clock
+    ):
+        limiter = JudgeRateLimiter(tokens_per_minute=6000)
+
+        await limiter.acquire(tokens=6000)
+        await limiter.acquire(tokens=100_000)
+
+        assert clock == [pytest.approx(60.0)]
+
+    @pytest.mark.asyncio
+    async def test_throttling_pauses_requests_and_slows_the_rate(self, clock):
+        limiter = JudgeRateLimiter(requests_per_minute=60)
+
+        assert limiter.record_throttling() == 1.0
+        # requests throttled during the pause share it
+        assert limiter.record_throttling() == 1.0
+        await limiter.acquire(tokens=100)
+
+        # the bucket is emptied and refills at half the rate
+        assert clock == [pytest.approx(2.0)]
+        assert limiter.throttled == 2
+
+    @pytest.mark.asyncio
+    async def test_backoff_doubles_while_throttling_continues(self, clock):
+        limiter = JudgeRateLimiter(max_backoff_seconds=3)
+
+        pauses = []
+        for _ in range(4):
+            pauses.append(limiter.record_throttling())
+            await limiter.acquire(tokens=100)
+
+        assert pauses == [1.0, 2.0, 3.0, 3.0]
+
+        limiter.record_success()
+        assert limiter.record_throttling() == 1.0
+
+    def test_log_stats(self, caplog):
+        limiter = JudgeRateLimiter()
+        limiter.record_throttling()
+
+        with caplog.at_level("INFO"):
+            limiter.log_stats("judge")
+
+        assert "Rate limiter for judge waited 0.0s and was throttled 1 times" in (
+            caplog.text
+        )
+
+
+@pytest.mark.parametrize(
+    "exc, expected",
+    [
+        (client_error("ThrottlingException"), True),
+        (client_error("ServiceQuotaExceededException"), True),
+        (client_error("ValidationException"), False),
+        (
+            RateLimitError(
+                "Rate limit", response=MagicMock(status_code=429), body=None
+            ),
+            True,
+        ),
+        (ValueError("invalid JSON"), False),
+        (retry_error(client_error("ThrottlingException")), True),
+        (retry_error(ValueError("invalid JSON")), False),
+    ],
+)
+def test_is_throttling_error(exc, expected):
+    assert is_throttling_error(exc) is expected
+
+
+class TestAttachRateLimiterToModel:
+    @pytest.fixture
+    def make_model(self, mocker):
+        def _make(outcomes, limiter, max_attempts=3):
+            original = mocker.AsyncMock(side_effect=list(outcomes))
+            model = mocker.create_autospec(DeepEvalBaseLLM, instance=True)
+            model.a_generate = original
+            model.get_model_name.return_value = "judge"
+            attach_rate_limiter_to_model(model, limiter, max_attempts=max_attempts)
+            return model, original
+
+        return _make
+
+    @pytest.mark.asyncio
+    async def test_retries_throttled_requests_after_the_pause(self, clock, make_model):
+        limiter = JudgeRateLimiter()
+        model, original = make_model(
+            [client_error("ThrottlingException"), ("output", 0.1)], limiter
+        )
+
+        assert await model.a_generate("prompt") == ("output", 0.1)
+        assert original.await_count == 2
+        assert clock == [pytest.approx(1.0)]
+        assert limiter.throttled == 1
+
+    @pytest.mark.asyncio
+    async def test_raises_after_max_attempts(self, clock, make_model):
+        limiter = JudgeRateLimiter()
+        model, original = make_model(
+            [client_error("ThrottlingException")] * 2, limiter, max_attempts=2
+        )
+
+        with pytest.raises(ClientError):
+            await model.a_generate("prompt")
+        assert original.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_raises_other_errors_immediately(self, clock, make_model):
+        limiter = JudgeRateLimiter()
+        model, original = make_model([client_error("ValidationException")], limiter)
+
+        with pytest.raises(ClientError):
+            await model.a_generate("prompt")
+        assert original.await_count == 1
+        assert limiter.throttled == 0
+
+    @pytest.mark.asyncio
+    async def test_models_sharing_a_limiter_share_the_budget(self, clock, make_model):
+        limiter = JudgeRateLimiter(requests_per_minute=2)
+        first, _ = make_model([("output", 0.1)] * 2, limiter)
+        second, _ = make_model([("output", 0.1)], limiter)
+
+        await asyncio.gather(
+            first.a_generate("prompt"),
+            second.a_generate("prompt"),
+            first.a_generate("prompt"),
+        )
+
+        assert clock == [pytest.approx(30.0)]
@@ -0,0 +1,141 @@
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock
+
+import pytest
+from deepeval.models import DeepEvalBaseLLM
+
+from govuk_chat_evaluation.rag_answers.judge_hedging import HedgingPolicy
+from govuk_chat_evaluation.rag_answers.judge_rate_limiter import JudgeRateLimiter
+from govuk_chat_evaluation.rag_answers.judge_registry import (
+    JudgeRegistry,
+    PooledAmazonBedrockModel,
+)
+
+
+@pytest.fixture
+def pooled_model(mocker):
+    model = PooledAmazonBedrockModel(
+        model="openai.gpt-oss-120b-1:0",
+        region="eu-west-1",
+        max_pool_connections=5,
+    )
+    client = MagicMock()
+    exits = []
+
+    @asynccontextmanager
+    async def create_client(service_name, **kwargs):
+        yield client
+        exits.append(service_name)
+
+    mocker.patch.object(model._session, "create_client", side_effect=create_client)
+    return model, client, exits
+
+
+class TestPooledAmazonBedrockModel:
+    @pytest.mark.asyncio
+    async def test_reuses_one_client(self, pooled_model):
+        model, client, _ = pooled_model
+
+        for _ in range(3):
+            async with model._get_client() as used_client:
+                assert used_client is client
+
+        model._session.create_client.assert_called_once()
+        config = model._session.create_client.call_args.kwargs["config"]
+        assert config.max_pool_connections == 5
+
+    @pytest.mark.asyncio
+    async def test_copies_share_the_client(self, pooled_model):
+        model, client, _ = pooled_model
+
+        async with model._get_client():
+            pass
+        async with JudgeRegistry().get("key", lambda: model)._get_client() as copy:
+            assert copy is client
+
+        model._session.create_client.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_close_closes_the_client(self, pooled_model):
+        model, _, exits = pooled_model
+
+        async with model._get_client():
+            pass
+        await model.close()
+
+        assert exits == ["bedrock-runtime"]
+
+        async with model._get_client():
+            pass
+        assert model._session.create_client.call_count == 2
+
+
+class TestJudgeRegistry:
+    def test_get_creates_each_judge_once(self):
+        registry = JudgeRegistry()
+        create = MagicMock(side_effect=lambda: MagicMock(spec=DeepEvalBaseLLM))
+
+        first = registry.get(("model", 0.0), create)
+        second = registry.get(("model", 0.0), create)
+        other = registry.get(("model", 0.5), create)
+
+        assert create.call_count == 2
+        assert first is not second
+        assert other is not first
+
+    def test_get_returns_copies_that_can_be_wrapped_separately(self):
+        registry = JudgeRegistry()
+        judge = MagicMock(spec=DeepEvalBaseLLM)
+
+        first = registry.get("key", lambda: judge)
+        first.a_generate = MagicMock()
+
+        assert registry.get("key", lambda: judge).a_generate is judge.a_generate
+
+    @pytest.mark.asyncio
+    async def test_close_closes_pooled_judges(self, mocker):
+        registry = JudgeRegistry()
+        judge = PooledAmazonBedrockModel(
+            model="openai.gpt-oss-120b-1:0", region="eu-west-1"
+        )
+        close = mocker.patch.object(judge, "close")
+        registry.get("key", lambda: judge)
+
+        await registry.close()
+
+        close.assert_awaited_once()
+
+    def test_rate_limiter_falls_back_to_the_models_limiter_for_every_region(self):
+        in_region = JudgeRateLimiter()
+        every_region = JudgeRateLimiter()
+        registry = JudgeRegistry(
+            rate_limiters={
+                ("model", "us-east-1"): in_region,
+                ("model", None): every_region,
+            }
+        )
+
+        assert registry.rate_limiter("model", "us-east-1") is in_region
+        assert registry.rate_limiter("model", "eu-west-1") is every_region
+
+    def test_rate_limiter_shared_per_model_and_region_without_configuration(self):
+        registry = JudgeRegistry()
+
+        limiter = registry.rate_limiter("model", "eu-west-1")
+
+        assert registry.rate_limiter("model", "eu-west-1") is limiter
+        assert registry.rate_limiter("model", "us-east-1") is not limiter
+        assert registry.rate_limiter("other-model", "eu-west-1") is not limiter
+
+    def test_hedger_shared_per_model_with_a_hedging_policy(self):
+        registry = JudgeRegistry(hedging=HedgingPolicy(max_hedge_rate=0.1))
+
+        hedger = registry.hedger("model")
+
+        assert hedger is not None
+        assert hedger.policy.max_hedge_rate == 0.1
+        assert registry.hedger("model") is hedger
+        assert registry.hedger("other-model") is not hedger
+
+    def test_no_hedger_without_a_hedging_policy(self):
+        assert JudgeRegistry().hedger("model") is None
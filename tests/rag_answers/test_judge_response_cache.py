@@ -0,0 +1,124 @@
+import logging
+
+import pytest
+from deepeval.models.base_model import DeepEvalBaseLLM
+from pydantic import BaseModel
+
+from govuk_chat_evaluation.rag_answers.judge_response_cache import (
+    JudgeResponseCache,
+    attach_judge_response_cache_to_model,
+)
+
+
+class Verdict(BaseModel):
+    verdict: str
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return JudgeResponseCache(tmp_path / "cache", max_size_bytes=1024 * 1024, run=1)
+
+
+@pytest.fixture
+def make_cached_model(mocker):
+    def _make(cache, return_value, temperature=0.0):
+        original = mocker.AsyncMock(return_value=return_value)
+        model = mocker.create_autospec(DeepEvalBaseLLM, instance=True)
+        model.get_model_name.return_value = "judge-model"
+        model.a_generate = original
+        attach_judge_response_cache_to_model(model, cache, temperature)
+        return model, original
+
+    return _make
+
+
+class TestJudgeResponseCache:
+    def test_key_depends_on_prompt_model_temperature_schema_and_run(
+        self, tmp_path, cache
+    ):
+        key = cache.key("prompt", "model", 0.0, Verdict)
+
+        assert key == cache.key("prompt", "model", 0.0, Verdict)
+        assert key != cache.key("other prompt", "model", 0.0, Verdict)
+        assert key != cache.key("prompt", "other model", 0.0, Verdict)
+        assert key != cache.key("prompt", "model", 0.5, Verdict)
+        assert key != cache.key("prompt", "model", 0.0, None)
+
+        other_run = JudgeResponseCache(tmp_path, max_size_bytes=1024, run=2)
+        assert key != other_run.key("prompt", "model", 0.0, Verdict)
+
+    def test_logs_hits_and_misses(self, cache, caplog):
+        caplog.set_level(logging.INFO)
+        with cache:
+            cache.get("key")
+
+        assert "Judge response cache had 0 hits and 1 misses" in caplog.text
+
+
+class TestAttachJudgeResponseCacheToModel:
+    @pytest.mark.asyncio
+    async def test_returns_cached_schema_responses_without_cost(
+        self, cache, make_cached_model
+    ):
+        model, original = make_cached_model(cache, (Verdict(verdict="yes"), 0.2))
+
+        assert await model.a_generate("prompt", schema=Verdict) == (
+            Verdict(verdict="yes"),
+            0.2,
+        )
+        assert await model.a_generate("prompt", schema=Verdict) == (
+            Verdict(verdict="yes"),
+            0.0,
+        )
+        original.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_returns_cached_text_responses(self, cache, make_cached_model):
+        model, original = make_cached_model(cache, "a response")
+
+        assert await model.a_generate("prompt") == "a response"
+        assert await model.a_generate("prompt") == "a response"
+        original.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_responses_are_shared_between_models_with_the_same_cache(
+        self, cache, make_cached_model
+    ):
+        first_model, _ = make_cached_model(cache, "first")
+        second_model, second_original = make_cached_model(cache, "second")
+
+        await first_model.a_generate("prompt")
+
+        assert await second_model.a_generate("prompt") == "first"
+        second_original.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_different_temperatures_are_not_shared(
+        self, cache, make_cached_model
+    ):
+        first_model, _ = make_cached_model(cache, "first", temperature=0.0)
+        second_model, _ = make_cached_model(cache, "second", temperature=0.5)
+
+        await first_model.a_generate("prompt")
+
+        assert await second_model.a_generate("prompt") == "second"
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, cache, make_cached_model):
+        model, original = make_cached_model(cache, "ok")
+        original.side_effect = [ValueError("invalid JSON"), "ok"]
+
+        with pytest.raises(ValueError):
+            await model.a_generate("prompt")
+
+        assert await model.a_generate("prompt") == "ok"
+        assert original.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_multimodal_prompts_are_not_cached(self, cache, make_cached_model):
+        model, original = make_cached_model(cache, "ok")
+
+        await model.a_generate(["prompt", "image"])
+        await model.a_generate(["prompt", "image"])
+
+        assert original.await_count == 2
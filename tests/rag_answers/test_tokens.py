@@ -0,0 +1,8 @@
+import pytest
+
+from govuk_chat_evaluation.rag_answers.tokens import estimate_tokens
+
+
+@pytest.mark.parametrize("text, expected", [("", 0), ("abcd", 1), ("abcde", 2)])
+def test_estimate_tokens(text, expected):
+    assert estimate_tokens(text) == expected
@@ -8,6 +8,7 @@ from govuk_chat_evaluation.retrieval.evaluate import (
     EvaluationResult,
     SearchResult,
 )
+from tests.conftest import stream_generated
 
 
 @pytest.fixture(autouse=True)
@@ -66,7 +67,7 @@ def mock_data_generation(mocker):
 
     return mocker.patch(
         "govuk_chat_evaluation.retrieval.generate.generate_inputs_to_evaluation_results",
-        return_value=return_value,
+        side_effect=stream_generated(return_value),
     )
 
 
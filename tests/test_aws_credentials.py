@@ -1,6 +1,11 @@
+from datetime import UTC, datetime
+
+import pytest
 from botocore.exceptions import ClientError, NoCredentialsError
 
+from govuk_chat_evaluation import aws_credentials
 from govuk_chat_evaluation.aws_credentials import (
+    aws_credentials_expiry,
     check_aws_credentials,
 )
 
@@ -63,3 +68,73 @@ def test_check_aws_credentials_client_error(mocker):
     assert result.ok is False
     assert result.error is not None
     assert "ExpiredToken" in result.error
+
+
+@pytest.fixture(autouse=True)
+def clear_valid_credentials(mocker):
+    mocker.patch.object(aws_credentials, "_valid_credentials", set())
+
+
+def mock_session_with_credentials(mocker, token):
+    mock_session = mocker.Mock()
+    mock_session.get_credentials.return_value = mocker.Mock(
+        access_key="AKIA", token=token
+    )
+    mocker.patch(
+        "govuk_chat_evaluation.aws_credentials.Session", return_value=mock_session
+    )
+    return mock_session
+
+
+def test_check_aws_credentials_caches_valid_credentials(mocker):
+    mock_session = mock_session_with_credentials(mocker, "token")
+
+    assert check_aws_credentials(region="eu-west-1").ok
+    assert check_aws_credentials(region="eu-west-1").ok
+    mock_session.create_client.assert_called_once()
+
+    # a refreshed session token is checked again
+    mock_session.get_credentials.return_value.token = "new-token"
+    assert check_aws_credentials(region="eu-west-1").ok
+    assert mock_session.create_client.call_count == 2
+
+
+def test_check_aws_credentials_checks_invalid_credentials_again(mocker):
+    mock_session = mock_session_with_credentials(mocker, "token")
+    mock_session.create_client.return_value.get_caller_identity.side_effect = [
+        NoCredentialsError(),
+        {},
+    ]
+
+    assert not check_aws_credentials(region="eu-west-1").ok
+    assert check_aws_credentials(region="eu-west-1").ok
+
+
+class TestAwsCredentialsExpiry:
+    @pytest.mark.parametrize(
+        "contents, expected",
+        [
+            (
+                "AWS_CREDENTIAL_EXPIRATION=2026-10-17T12:00:00Z\n",
+                datetime(2026, 10, 17, 12, tzinfo=UTC),
+            ),
+            (
+                "AWS_SESSION_EXPIRATION=2026-10-17T13:00:00+01:00\n",
+                datetime(2026, 10, 17, 12, tzinfo=UTC),
+            ),
+            (
+                "AWS_SESSION_EXPIRATION=2026-10-17T12:00:00\n",
+                datetime(2026, 10, 17, 12, tzinfo=UTC),
+            ),
+            ("AWS_ACCESS_KEY_ID=AKIA\n", None),
+            ("AWS_SESSION_EXPIRATION=tomorrow\n", None),
+        ],
+    )
+    def test_reads_expiry_from_env_file(self, tmp_path, contents, expected):
+        env_path = tmp_path / ".env.aws"
+        env_path.write_text(contents)
+
+        assert aws_credentials_expiry(env_path) == expected
+
+    def test_no_env_file(self, tmp_path):
+        assert aws_credentials_expiry(tmp_path / ".env.aws") is None
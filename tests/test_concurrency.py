@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from govuk_chat_evaluation.concurrency import AdaptiveConcurrencyLimiter
+
+
+async def run_operations(limiter, count, *, fail=False):
+    for _ in range(count):
+        try:
+            async with limiter.slot():
+                if fail:
+                    raise RuntimeError("Contrived failure")
+        except RuntimeError:
+            pass
+
+
+def test_adaptive_concurrency_limiter_validates_limits():
+    with pytest.raises(ValueError, match="Concurrency limits"):
+        AdaptiveConcurrencyLimiter(0, 5)
+
+    with pytest.raises(ValueError, match="Concurrency limits"):
+        AdaptiveConcurrencyLimiter(5, 2)
+
+
+def test_adaptive_concurrency_limiter_clamps_initial_limit():
+    assert AdaptiveConcurrencyLimiter(2, 4, initial_limit=10).limit == 4
+    assert AdaptiveConcurrencyLimiter(2, 4, initial_limit=1).limit == 2
+    assert AdaptiveConcurrencyLimiter(2, 4).limit == 4
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_limiter_limits_concurrent_operations():
+    limiter = AdaptiveConcurrencyLimiter(2, 2)
+    running = 0
+    max_running = 0
+
+    async def operation():
+        nonlocal running, max_running
+        async with limiter.slot():
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(operation() for _ in range(6)))
+
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_limiter_increases_limit_on_success():
+    limiter = AdaptiveConcurrencyLimiter(1, 3, initial_limit=1)
+
+    await run_operations(limiter, 1)
+    assert limiter.limit == 2
+
+    await run_operations(limiter, 2)
+    assert limiter.limit == 3
+
+    await run_operations(limiter, 10)
+    assert limiter.limit == 3
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_limiter_halves_limit_on_failure():
+    limiter = AdaptiveConcurrencyLimiter(2, 8)
+
+    await run_operations(limiter, 1, fail=True)
+    assert limiter.limit == 4
+
+    # a further decrease only happens after a limit's worth of completions
+    await run_operations(limiter, 3, fail=True)
+    assert limiter.limit == 4
+
+    await run_operations(limiter, 1, fail=True)
+    assert limiter.limit == 2
+
+    await run_operations(limiter, 10, fail=True)
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_limiter_decreases_limit_on_rising_latency(
+    mocker,
+):
+    # start and end times for three operations, the last one being slow
+    mocker.patch(
+        "govuk_chat_evaluation.concurrency.time.perf_counter",
+        side_effect=[0.0, 1.0, 1.0, 2.0, 2.0, 32.0],
+    )
+    limiter = AdaptiveConcurrencyLimiter(1, 8, initial_limit=8)
+
+    await run_operations(limiter, 2)
+    assert limiter.limit == 8
+
+    await run_operations(limiter, 1)
+    assert limiter.limit == 4
@@ -8,6 +8,8 @@ from pydantic import BaseModel, Field
 
 from govuk_chat_evaluation.config import (
     BaseConfig,
+    GenerationConfig,
+    Shard,
     apply_click_options_to_command,
     config_from_cli_args,
 )
@@ -98,3 +100,42 @@ def test_config_from_cli_args_overrides_config_data_with_cli_args():
 
     assert config.option == "test_value"
     assert config.flag is False
+
+
+class TestGenerationConfig:
+    def test_defaults_to_a_rake_task_per_item(self):
+        config = GenerationConfig()
+
+        assert config.workers is None
+        assert config.batch_size is None
+
+    def test_workers_and_batch_size_are_mutually_exclusive(self):
+        with pytest.raises(ValueError, match="can't be used together"):
+            GenerationConfig(workers=2, batch_size=10)
+
+    def test_min_concurrent_cant_exceed_max_concurrent(self):
+        with pytest.raises(ValueError, match="min_concurrent can't be greater"):
+            GenerationConfig(min_concurrent=6, max_concurrent=5)
+
+
+class TestShard:
+    class ShardedConfig(BaseConfig):
+        shard: BaseConfig.GenericFields.shard = None
+
+    def test_parses_and_serialises_as_number_over_total(self):
+        config = self.ShardedConfig.model_validate({"shard": "2/4"})
+
+        assert config.shard == Shard(2, 4)
+        assert config.model_dump(mode="json") == {"shard": "2/4"}
+
+    @pytest.mark.parametrize("shard", ["2", "a/4", "0/4", "5/4"])
+    def test_rejects_invalid_shards(self, shard):
+        with pytest.raises(ValueError):
+            self.ShardedConfig(shard=shard)
+
+    def test_select_splits_items_between_shards(self):
+        items = list(range(10))
+
+        shards = [Shard(number, 3).select(items) for number in range(1, 4)]
+
+        assert shards == [[0, 3, 6, 9], [1, 4, 7], [2, 5, 8]]
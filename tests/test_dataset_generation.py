@@ -1,9 +1,66 @@
+import asyncio
 import json
+import logging
+import signal
+import sys
+import textwrap
+import threading
+from pathlib import Path
 from unittest.mock import ANY, AsyncMock
 
 import pytest
 
-from govuk_chat_evaluation.dataset_generation import generate_dataset, run_rake_task
+from govuk_chat_evaluation.config import GenerationConfig
+from govuk_chat_evaluation.dataset_generation import (
+    FailedGeneration,
+    RakeTaskBatcher,
+    RakeWorkerPool,
+    generate_dataset,
+    run_rake_task,
+    run_rake_task_batch,
+    stop_generation_on,
+)
+
+FAKE_WORKER_SCRIPT = textwrap.dedent(
+    """
+    import json
+    import sys
+    import time
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        input = request["env"].get("INPUT")
+        if input == "exit":
+            sys.exit(1)
+        elif input == "stuck":
+            time.sleep(60)
+        elif input == "fail":
+            response = {"error": "Contrived failure"}
+        else:
+            response = {"result": {"task": request["task"], "input": input}}
+        print(json.dumps(response), flush=True)
+    """
+)
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(mocker):
+    mocker.patch("govuk_chat_evaluation.dataset_generation.RETRY_BASE_DELAY_SECONDS", 0)
+
+
+@pytest.fixture
+def fake_worker_process(mocker):
+    """Replace the GOV.UK Chat worker rake task with a Python script that
+    speaks the same JSON lines protocol"""
+    create_subprocess_exec = asyncio.create_subprocess_exec
+
+    async def start_fake_worker(*_args, **kwargs):
+        kwargs.pop("cwd")
+        return await create_subprocess_exec(
+            sys.executable, "-c", FAKE_WORKER_SCRIPT, **kwargs
+        )
+
+    return mocker.patch("asyncio.create_subprocess_exec", side_effect=start_fake_worker)
 
 
 @pytest.mark.asyncio
@@ -28,6 +85,7 @@ async def test_run_rake_task_success(mocker):
         env=ANY,
         stdout=ANY,
         stderr=ANY,
+        start_new_session=True,
     )
 
     assert result == {"result": "success"}
@@ -67,6 +125,60 @@ async def test_run_rake_task_failure(mocker):
     assert "Error occurred" in str(exc_info.value)
 
 
+@pytest.mark.asyncio
+async def test_run_rake_task_kills_process_when_cancelled(mocker):
+    create_subprocess_exec = asyncio.create_subprocess_exec
+    processes = []
+
+    async def start_stuck_process(*_args, **kwargs):
+        kwargs.pop("cwd")
+        process = await create_subprocess_exec(
+            sys.executable, "-c", "import time; time.sleep(60)", **kwargs
+        )
+        processes.append(process)
+        return process
+
+    mocker.patch("asyncio.create_subprocess_exec", side_effect=start_stuck_process)
+
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.5):
+            await run_rake_task("task_name")
+
+    assert processes[0].returncode == -signal.SIGKILL
+
+
+@pytest.fixture
+def fake_govuk_chat(monkeypatch, tmp_path):
+    """Run rake tasks with the fake GOV.UK Chat rake stand-in"""
+    script = Path(__file__).parent.parent / "scripts" / "fake_govuk_chat_rake.py"
+    monkeypatch.setenv("GOVUK_CHAT_RAKE_COMMAND", f"{sys.executable} {script}")
+    monkeypatch.setenv("GOVUK_CHAT_DIR", str(tmp_path))
+    monkeypatch.setenv("FAKE_RAKE_LATENCY_SECONDS", "0")
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("fake_govuk_chat")
+@pytest.mark.parametrize(
+    "config",
+    [
+        GenerationConfig(),
+        GenerationConfig(workers=2),
+        GenerationConfig(batch_size=2),
+    ],
+    ids=["process", "workers", "batch"],
+)
+async def test_generate_dataset_with_fake_govuk_chat(config):
+    async def generator_func(item):
+        return await run_rake_task(
+            "evaluation:search_results_for_question",
+            {"INPUT": item, "OPENSEARCH_INDEX": "index"},
+        )
+
+    results = await generate_dataset(["q1", "q2", "q3"], generator_func, config=config)
+
+    assert [result["opensearch_index"] for result in results] == ["index"] * 3
+
+
 @pytest.mark.asyncio
 async def test_generate_dataset():
     async def mock_generation_func(item):
@@ -91,6 +203,27 @@ async def test_generate_dataset():
     assert sorted_result == expected_result
 
 
+@pytest.mark.asyncio
+async def test_generate_dataset_passes_results_to_on_generated():
+    async def mock_generation_func(item):
+        if item == "question2":
+            return None
+        return {"input": item}
+
+    generated = []
+    result = await generate_dataset(
+        ["question1", "question2", "question3"],
+        mock_generation_func,
+        on_generated=generated.append,
+    )
+
+    assert result == []
+    assert sorted(generated, key=lambda x: x["input"]) == [
+        {"input": "question1"},
+        {"input": "question3"},
+    ]
+
+
 @pytest.mark.asyncio
 async def test_generate_dataset_failure_raises_error():
     async def mock_generation_func(item):
@@ -102,3 +235,286 @@ async def test_generate_dataset_failure_raises_error():
 
     with pytest.raises(RuntimeError, match="Contrived failure"):
         await generate_dataset(ground_truth, mock_generation_func)
+
+
+@pytest.mark.asyncio
+async def test_generate_dataset_retries_failed_items():
+    attempts = {"flaky": 0}
+
+    async def mock_generation_func(item):
+        attempts[item] += 1
+        if attempts[item] < 3:
+            raise RuntimeError("Contrived failure")
+        return {"input": item}
+
+    result = await generate_dataset(
+        ["flaky"], mock_generation_func, config=GenerationConfig(max_attempts=3)
+    )
+
+    assert result == [{"input": "flaky"}]
+    assert attempts["flaky"] == 3
+
+
+@pytest.mark.asyncio
+async def test_generate_dataset_passes_items_that_keep_failing_to_on_failed():
+    async def mock_generation_func(item):
+        if item == "fail":
+            raise RuntimeError("Contrived failure")
+        return {"input": item}
+
+    failed = []
+    result = await generate_dataset(
+        ["question1", "fail", "question3"],
+        mock_generation_func,
+        config=GenerationConfig(max_attempts=2),
+        on_failed=failed.append,
+    )
+
+    assert sorted(result, key=lambda r: r["input"]) == [
+        {"input": "question1"},
+        {"input": "question3"},
+    ]
+    assert failed == [
+        FailedGeneration(
+            input="fail", error="RuntimeError('Contrived failure')", attempts=2
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_generate_dataset_records_timed_out_items(caplog):
+    caplog.set_level(logging.INFO)
+
+    async def mock_generation_func(item):
+        if item == "stuck":
+            await asyncio.sleep(60)
+        return {"input": item}
+
+    failed = []
+    result = await generate_dataset(
+        ["question1", "stuck"],
+        mock_generation_func,
+        config=GenerationConfig(timeout=0.1, max_attempts=1),
+        on_failed=failed.append,
+    )
+
+    assert result == [{"input": "question1"}]
+    assert [f.failure_type for f in failed] == ["timeout"]
+    assert "1 generation attempts timed out after 0.1s" in caplog.text
+    assert "Generation attempt durations over 2 attempts" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_generate_dataset_with_cache_reuses_rake_task_results(mocker, tmp_path):
+    mocker.patch(
+        "govuk_chat_evaluation.dataset_generation.govuk_chat_revision",
+        return_value="abc123",
+    )
+    run_rake_process = mocker.patch(
+        "govuk_chat_evaluation.dataset_generation._run_rake_process",
+        side_effect=lambda _task, env: json.dumps({"output": env["INPUT"]}),
+    )
+
+    async def generator_func(item):
+        return await run_rake_task("task_name", {"INPUT": item})
+
+    config = GenerationConfig(cache=True, cache_path=tmp_path)
+    first = await generate_dataset(["q1", "q2"], generator_func, config=config)
+    second = await generate_dataset(["q1", "q2", "q3"], generator_func, config=config)
+
+    assert sorted(first, key=lambda r: r["output"]) == [
+        {"output": "q1"},
+        {"output": "q2"},
+    ]
+    assert len(second) == 3
+    assert run_rake_process.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_rake_worker_pool_runs_rake_tasks_on_workers(fake_worker_process):
+    async with RakeWorkerPool(2):
+        results = await asyncio.gather(
+            *(run_rake_task("task_name", {"INPUT": f"q{i}"}) for i in range(5))
+        )
+
+    assert results == [{"task": "task_name", "input": f"q{i}"} for i in range(5)]
+    assert fake_worker_process.call_count == 2
+    assert fake_worker_process.call_args[0][:4] == (
+        "bundle",
+        "exec",
+        "rake",
+        "evaluation:worker",
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("fake_worker_process")
+async def test_rake_worker_pool_raises_worker_errors():
+    async with RakeWorkerPool(1):
+        with pytest.raises(RuntimeError, match="Contrived failure"):
+            await run_rake_task("task_name", {"INPUT": "fail"})
+
+        # the worker is still usable after an error
+        result = await run_rake_task("task_name", {"INPUT": "q1"})
+
+    assert result == {"task": "task_name", "input": "q1"}
+
+
+@pytest.mark.asyncio
+async def test_rake_worker_pool_replaces_exited_workers(fake_worker_process):
+    async with RakeWorkerPool(1):
+        with pytest.raises(RuntimeError, match="worker exited unexpectedly"):
+            await run_rake_task("task_name", {"INPUT": "exit"})
+
+        result = await run_rake_task("task_name", {"INPUT": "q1"})
+
+    assert result == {"task": "task_name", "input": "q1"}
+    assert fake_worker_process.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_dataset_with_workers_uses_worker_pool(fake_worker_process):
+    async def generator_func(item):
+        return await run_rake_task("task_name", {"INPUT": item})
+
+    result = await generate_dataset(
+        ["question1", "question2", "question3"],
+        generator_func,
+        config=GenerationConfig(workers=2),
+    )
+
+    assert sorted(r["input"] for r in result) == ["question1", "question2", "question3"]
+    assert fake_worker_process.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_dataset_with_workers_replaces_timed_out_workers(
+    fake_worker_process,
+):
+    async def generator_func(item):
+        return await run_rake_task("task_name", {"INPUT": item})
+
+    failed = []
+    result = await generate_dataset(
+        ["stuck", "question1"],
+        generator_func,
+        config=GenerationConfig(workers=1, timeout=2, max_attempts=1),
+        on_failed=failed.append,
+    )
+
+    assert [f.failure_type for f in failed] == ["timeout"]
+    assert result == [{"task": "task_name", "input": "question1"}]
+    assert fake_worker_process.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_dataset_stops_when_the_stop_event_is_set():
+    stop = threading.Event()
+    cancelled = []
+
+    async def generator_func(item):
+        stop.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+
+    with stop_generation_on(stop), pytest.raises(asyncio.CancelledError):
+        await generate_dataset(["question1", "question2"], generator_func)
+
+    assert sorted(cancelled) == ["question1", "question2"]
+
+
+@pytest.mark.asyncio
+async def test_run_rake_task_batch_passes_inputs_as_jsonl_file(mocker):
+    inputs_received = []
+
+    def communicate():
+        env = mock_subprocess_exec.call_args[1]["env"]
+        with open(env["INPUT_PATH"]) as file:
+            inputs_received.extend(json.loads(line) for line in file)
+        return (b'{"result": 1}\n{"result": 2}\n', b"")
+
+    mock_subprocess_exec = mocker.patch("asyncio.create_subprocess_exec")
+    mock_process = AsyncMock()
+    mock_process.communicate.side_effect = communicate
+    mock_process.returncode = 0
+    mock_subprocess_exec.return_value = mock_process
+
+    results = await run_rake_task_batch(
+        "task_name", [{"INPUT": "question1"}, {"INPUT": "question2"}]
+    )
+
+    assert inputs_received == [{"INPUT": "question1"}, {"INPUT": "question2"}]
+    assert results == [{"result": 1}, {"result": 2}]
+
+
+@pytest.mark.asyncio
+async def test_run_rake_task_batch_raises_on_missing_results(mocker):
+    mock_subprocess_exec = mocker.patch("asyncio.create_subprocess_exec")
+    mock_process = AsyncMock()
+    mock_process.communicate.return_value = (b'{"result": 1}\n', b"")
+    mock_process.returncode = 0
+    mock_subprocess_exec.return_value = mock_process
+
+    with pytest.raises(RuntimeError, match="Expected 2 results"):
+        await run_rake_task_batch("task_name", [{"INPUT": "q1"}, {"INPUT": "q2"}])
+
+
+@pytest.mark.asyncio
+async def test_rake_task_batcher_runs_rake_tasks_in_batches(mocker):
+    async def batch_side_effect(task_name, env_vars_batch):
+        return [f"{task_name}-{env['INPUT']}" for env in env_vars_batch]
+
+    mock_run_batch = mocker.patch(
+        "govuk_chat_evaluation.dataset_generation.run_rake_task_batch",
+        side_effect=batch_side_effect,
+    )
+
+    async with RakeTaskBatcher(batch_size=2, linger=0.01):
+        results = await asyncio.gather(
+            *(run_rake_task("task_name", {"INPUT": f"q{i}"}) for i in range(3))
+        )
+
+    assert results == ["task_name-q0", "task_name-q1", "task_name-q2"]
+    assert [len(call.args[1]) for call in mock_run_batch.call_args_list] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_rake_task_batcher_raises_batch_errors_to_each_caller(mocker):
+    mocker.patch(
+        "govuk_chat_evaluation.dataset_generation.run_rake_task_batch",
+        side_effect=RuntimeError("Contrived failure"),
+    )
+
+    async with RakeTaskBatcher(batch_size=2):
+        results = await asyncio.gather(
+            run_rake_task("task_name", {"INPUT": "q1"}),
+            run_rake_task("task_name", {"INPUT": "q2"}),
+            return_exceptions=True,
+        )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_generate_dataset_with_batch_size_batches_rake_tasks(mocker):
+    async def batch_side_effect(_task_name, env_vars_batch):
+        return [env["INPUT"] for env in env_vars_batch]
+
+    mock_run_batch = mocker.patch(
+        "govuk_chat_evaluation.dataset_generation.run_rake_task_batch",
+        side_effect=batch_side_effect,
+    )
+
+    async def generator_func(item):
+        return await run_rake_task("task_name", {"INPUT": item})
+
+    ground_truth = [f"question{i}" for i in range(4)]
+    result = await generate_dataset(
+        ground_truth, generator_func, config=GenerationConfig(batch_size=4)
+    )
+
+    assert sorted(result) == ground_truth
+    mock_run_batch.assert_called_once()
@@ -9,6 +9,7 @@ from pydantic import BaseModel
 
 from govuk_chat_evaluation.config import BaseConfig
 from govuk_chat_evaluation.file_system import (
+    GeneratedOutputWriter,
     create_output_directory,
     jsonl_to_models,
     project_root,
@@ -67,6 +68,64 @@ def test_write_generated_to_output(mock_project_root):
     assert len(lines) == 2
 
 
+class TestGeneratedOutputWriter:
+    def test_writes_models_as_jsonl(self, mock_project_root):
+        with GeneratedOutputWriter(mock_project_root) as output:
+            output.write(SampleModel(name="Alice", age=30))
+            output.write(SampleModel(name="Bob", age=25))
+
+        assert output.path == mock_project_root / "generated.jsonl"
+        assert output.count == 2
+        assert jsonl_to_models(output.path, SampleModel) == [
+            SampleModel(name="Alice", age=30),
+            SampleModel(name="Bob", age=25),
+        ]
+
+    def test_flushes_in_batches(self, mock_project_root):
+        with GeneratedOutputWriter(mock_project_root, flush_every=2) as output:
+            output.write(SampleModel(name="Alice", age=30))
+            assert output.path.read_text() == ""
+
+            output.write(SampleModel(name="Bob", age=25))
+            assert len(output.path.read_text().splitlines()) == 2
+
+    def test_resume_from_copies_previous_data_and_returns_remaining_inputs(
+        self, mock_project_root
+    ):
+        previous_dir = mock_project_root / "previous"
+        previous_dir.mkdir()
+        (previous_dir / "generated.jsonl").write_text(
+            '{"name": "Alice", "age": 30}\n{"name": "Bo'
+        )
+        output_dir = mock_project_root / "current"
+        output_dir.mkdir()
+        inputs = [SampleModel(name="Alice", age=30), SampleModel(name="Bob", age=25)]
+
+        with GeneratedOutputWriter(output_dir) as output:
+            remaining = output.resume_from(previous_dir, inputs, key="name")
+
+        assert remaining == [SampleModel(name="Bob", age=25)]
+        assert jsonl_to_models(output.path, SampleModel) == [
+            SampleModel(name="Alice", age=30)
+        ]
+
+    def test_resume_from_a_run_without_generated_data_returns_all_inputs(
+        self, mock_project_root, caplog
+    ):
+        previous_dir = mock_project_root / "previous"
+        previous_dir.mkdir()
+        output_dir = mock_project_root / "current"
+        output_dir.mkdir()
+        inputs = [SampleModel(name="Alice", age=30), SampleModel(name="Bob", age=25)]
+
+        with GeneratedOutputWriter(output_dir) as output:
+            remaining = output.resume_from(previous_dir, inputs, key="name")
+
+        assert remaining == inputs
+        assert output.path.read_text() == ""
+        assert f"No generated.jsonl in {previous_dir} to resume from" in caplog.text
+
+
 def test_write_config_file_for_reuse(mock_project_root):
     config = SampleConfig(what="Testing config", path=Path("path/to/item"))
     config_path = write_config_file_for_reuse(mock_project_root, config)
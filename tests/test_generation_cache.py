@@ -0,0 +1,89 @@
+import logging
+import os
+import subprocess
+
+import pytest
+
+from govuk_chat_evaluation.generation_cache import (
+    CACHE_MISS,
+    GenerationCache,
+    active_generation_cache,
+    govuk_chat_revision,
+)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return GenerationCache(tmp_path / "cache", "abc123", max_size_bytes=1024)
+
+
+class TestGenerationCache:
+    def test_key_depends_on_task_env_vars_and_revision(self, tmp_path, cache):
+        key = cache.key("task", {"INPUT": "a", "OPENSEARCH_INDEX": "index"})
+
+        assert key == cache.key("task", {"OPENSEARCH_INDEX": "index", "INPUT": "a"})
+        assert key != cache.key(
+            "other_task", {"INPUT": "a", "OPENSEARCH_INDEX": "index"}
+        )
+        assert key != cache.key("task", {"INPUT": "b", "OPENSEARCH_INDEX": "index"})
+
+        other_revision = GenerationCache(tmp_path, "def456", max_size_bytes=1024)
+        assert key != other_revision.key(
+            "task", {"INPUT": "a", "OPENSEARCH_INDEX": "index"}
+        )
+
+    def test_get_returns_set_values_and_counts_hits_and_misses(self, cache):
+        with cache:
+            assert cache.get("key") is CACHE_MISS
+            cache.set("key", {"answer": "hello"})
+            assert cache.get("key") == {"answer": "hello"}
+
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_is_active_only_within_context(self, cache):
+        with cache:
+            assert active_generation_cache() is cache
+
+        assert active_generation_cache() is None
+
+    def test_evicts_least_recently_used_entries_over_max_size(self, tmp_path):
+        cache = GenerationCache(tmp_path, "abc123", max_size_bytes=250)
+        with cache:
+            for i, key in enumerate(["old", "recent", "new"]):
+                cache.set(key, "x" * 100)
+                os.utime(cache._entry_path(key), (i, i))
+
+        assert cache.get("old") is CACHE_MISS
+        assert cache.get("recent") is not CACHE_MISS
+        assert cache.get("new") is not CACHE_MISS
+
+    def test_logs_hits_and_misses(self, cache, caplog):
+        caplog.set_level(logging.INFO)
+        with cache:
+            cache.get("key")
+
+        assert "Generation cache had 0 hits and 1 misses" in caplog.text
+
+
+def test_govuk_chat_revision_includes_uncommitted_changes(tmp_path):
+    def git(*args):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init")
+    (tmp_path / "file.rb").write_text("puts 1")
+    git("add", ".")
+    git(
+        "-c",
+        "user.name=test",
+        "-c",
+        "user.email=test@example.com",
+        "commit",
+        "-m",
+        "init",
+    )
+
+    revision = govuk_chat_revision(tmp_path)
+    assert len(revision) == 40
+
+    (tmp_path / "file.rb").write_text("puts 2")
+    assert govuk_chat_revision(tmp_path).startswith(f"{revision}-dirty-")
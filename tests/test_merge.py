@@ -0,0 +1,99 @@
+import json
+import logging
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from govuk_chat_evaluation.merge import main, merge_generated
+
+
+@pytest.fixture
+def input_path(mock_project_root):
+    path = mock_project_root / "input.jsonl"
+    path.write_text(
+        "".join(
+            json.dumps({"id": f"question-{i}", "question": f"Question {i}"}) + "\n"
+            for i in range(1, 4)
+        )
+    )
+    return path
+
+
+@pytest.fixture
+def make_shard_dir(mock_project_root, input_path):
+    def make_shard_dir(shard, generated_ids):
+        shard_dir = mock_project_root / f"shard-{shard.replace('/', '-of-')}"
+        shard_dir.mkdir()
+        (shard_dir / "config.yaml").write_text(
+            yaml.dump({"shard": shard, "input_path": str(input_path)})
+        )
+        (shard_dir / "generated.jsonl").write_text(
+            "".join(
+                json.dumps({"id": id, "question": "Question"}) + "\n"
+                for id in generated_ids
+            )
+        )
+        return shard_dir
+
+    return make_shard_dir
+
+
+@pytest.fixture
+def output_dir(mock_project_root):
+    output_dir = mock_project_root / "merged"
+    output_dir.mkdir()
+    return output_dir
+
+
+def test_merge_generated_combines_shards(make_shard_dir, output_dir):
+    shard_dirs = [
+        make_shard_dir("1/2", ["question-1", "question-3"]),
+        make_shard_dir("2/2", ["question-2"]),
+    ]
+
+    path = merge_generated(shard_dirs, output_dir)
+
+    ids = [json.loads(line)["id"] for line in path.read_text().splitlines()]
+    assert sorted(ids) == ["question-1", "question-2", "question-3"]
+
+
+def test_merge_generated_raises_on_missing_shards(make_shard_dir, output_dir):
+    shard_dirs = [make_shard_dir("1/3", ["question-1"])]
+
+    with pytest.raises(ValueError, match="Missing shards: 2/3, 3/3"):
+        merge_generated(shard_dirs, output_dir)
+
+
+def test_merge_generated_raises_on_duplicate_ids(make_shard_dir, output_dir):
+    shard_dirs = [
+        make_shard_dir("1/2", ["question-1", "question-3"]),
+        make_shard_dir("2/2", ["question-2", "question-3"]),
+    ]
+
+    with pytest.raises(ValueError, match="Duplicate IDs found in inputs: question-3"):
+        merge_generated(shard_dirs, output_dir)
+
+
+def test_merge_generated_warns_about_missing_ids(make_shard_dir, output_dir, caplog):
+    caplog.set_level(logging.WARNING)
+    shard_dirs = [
+        make_shard_dir("1/2", ["question-1"]),
+        make_shard_dir("2/2", ["question-2"]),
+    ]
+    (shard_dirs[0] / "failed.jsonl").write_text('{"input": {"id": "question-3"}}\n')
+
+    merge_generated(shard_dirs, output_dir)
+
+    assert "1 items failed to generate in shard 1/2" in caplog.text
+    assert "Missing generated ids: question-3" in caplog.text
+
+
+@pytest.mark.usefixtures("frozen_time")
+def test_main_reports_errors(make_shard_dir):
+    shard_dir = make_shard_dir("1/2", ["question-1"])
+
+    result = CliRunner().invoke(main, [str(shard_dir)])
+
+    assert result.exit_code == 1
+    assert "Missing shards: 2/2" in result.output
@@ -5,6 +5,7 @@ from click.testing import CliRunner
 from govuk_chat_evaluation.file_system import OUTPUT_DIR_TIME_FORMAT
 from govuk_chat_evaluation.topic_tagger.cli import main
 from govuk_chat_evaluation.topic_tagger.evaluate import EvaluationResult, TopicStatus
+from tests.conftest import stream_generated
 
 
 @pytest.fixture(autouse=True)
@@ -48,7 +49,7 @@ def mock_data_generation(mocker):
 
     return mocker.patch(
         "govuk_chat_evaluation.topic_tagger.generate.generate_inputs_to_evaluation_results",
-        return_value=return_value,
+        side_effect=stream_generated(return_value),
     )
 
 